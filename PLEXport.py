@@ -1,36 +1,357 @@
+from __future__ import annotations
+
+import time
+
+# Startzeitpunkt für die Messung bis zum ersten gezeichneten Fenster
+STARTUP_T0 = time.perf_counter()
+
+import importlib
+import importlib.util
+import collections
+import itertools
+import json
+import multiprocessing
 import os
+import pathlib
+import queue
+import re
+import shutil
 import sqlite3
-import pandas as pd
+import sys
+import tempfile
+import threading
 import datetime
+import hashlib
 import logging
-from typing import List
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from typing import Callable, List, Optional
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from tkinter.scrolledtext import ScrolledText
 
-try:
-    from plexapi.server import PlexServer
 
-    PLEXAPI_AVAILABLE = True
-except ImportError:
-    PLEXAPI_AVAILABLE = False
+class LazyModule:
+    # Platzhalter für schwere Module (pandas, numpy, pyarrow, requests): der
+    # Import passiert erst beim ersten Attributzugriff, damit das Fenster
+    # ohne Wartezeit erscheint. Danach verhält er sich wie das Modul.
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+
+def module_available(name: str) -> bool:
+    # Prüft nur, ob das Paket installiert ist, ohne es zu importieren
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+REQUESTS_AVAILABLE = module_available("requests")
+requests = LazyModule("requests")
+
+PYARROW_AVAILABLE = module_available("pyarrow")
+pa = LazyModule("pyarrow")
+feather = LazyModule("pyarrow.feather")
+pa_ipc = LazyModule("pyarrow.ipc")
+pa_parquet = LazyModule("pyarrow.parquet")
+
+# Werden nach dem ersten Zeichnen des Fensters im Hintergrund vorgeladen
+WARM_UP_MODULES = ("numpy", "pandas", "openpyxl", "pyarrow", "requests")
+# Zielwert: Sekunden vom Programmstart bis zum gezeichneten Hauptfenster
+STARTUP_BUDGET_SECONDS = 1.0
 
 
 # ---------------------------------------------------------------------------
 # Verzeichnisse & Logging-Konfiguration
 # ---------------------------------------------------------------------------
 BASE_DIR = r"C:\PLEXport"
-if not os.path.exists(BASE_DIR):
-    os.makedirs(BASE_DIR)
 
 log_file = os.path.join(BASE_DIR, "plex_gui.log")
 
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-logging.basicConfig(filename=log_file, level=logging.INFO, format=LOG_FORMAT)
 logger = logging.getLogger("plex_gui")
 
 
+def ensure_base_dir() -> str:
+    if not os.path.exists(BASE_DIR):
+        os.makedirs(BASE_DIR, exist_ok=True)
+    return BASE_DIR
+
+
+def setup_environment():
+    # Erst beim Programmstart (nicht beim Import): Verzeichnis, Log-Datei und
+    # Zeitmessung. Als Modul importiert (Benchmark, Worker) bleibt alles aus.
+    ensure_base_dir()
+    logging.basicConfig(filename=log_file, level=logging.INFO, format=LOG_FORMAT)
+    enable_timing(True)
+
+
+def warm_up_imports(modules=WARM_UP_MODULES) -> threading.Thread:
+    # Lädt die Module in einem Hintergrund-Thread, damit der erste Export nicht
+    # auf den Import wartet. Greift die GUI vorher zu, wartet sie nur auf den
+    # laufenden Import (Import-Lock), nicht doppelt.
+    def run():
+        started = time.perf_counter()
+        loaded = []
+        for name in modules:
+            if not module_available(name.split(".")[0]):
+                continue
+            try:
+                importlib.import_module(name)
+                loaded.append(name)
+            except Exception as e:
+                logger.warning(f"Vorladen von {name} fehlgeschlagen: {e}")
+        record_timing("warm_up", time.perf_counter() - started, modules=loaded)
+
+    thread = threading.Thread(target=run, name="plexport-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+# ---------------------------------------------------------------------------
+# Zeitmessung (Phasen als JSON-Zeilen) & Profiling
+# ---------------------------------------------------------------------------
+TIMING_LOG_FILE = os.path.join(BASE_DIR, "timings.jsonl")
+# Größere Dateien werden beim ersten Schreiben nach *.1 verschoben
+TIMING_LOG_MAX_BYTES = 10 * 1024 * 1024
+_timing_lock = threading.Lock()
+_timing_state = {"rotated": False, "enabled": False}
+# Job-Name des aktuellen Worker-Threads und offene Phasen (für "parent")
+_timing_context = threading.local()
+
+
+def _peak_memory_mb() -> Optional[float]:
+    # Bisheriger Höchststand des Arbeitsspeichers (RSS) des Prozesses
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:
+        pass
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t)
+                for name in (
+                    "PeakWorkingSetSize",
+                    "WorkingSetSize",
+                    "QuotaPeakPagedPoolUsage",
+                    "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage",
+                    "QuotaNonPagedPoolUsage",
+                    "PagefileUsage",
+                    "PeakPagefileUsage",
+                )
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+        )
+        return round(counters.PeakWorkingSetSize / (1024 * 1024), 1)
+    except Exception:
+        return None
+
+
+def enable_timing(enabled: bool = True):
+    _timing_state["enabled"] = enabled
+
+
+def timing_enabled() -> bool:
+    return _timing_state["enabled"]
+
+
+def current_timing_job() -> Optional[str]:
+    return getattr(_timing_context, "job", None)
+
+
+def set_timing_job(name: Optional[str]):
+    _timing_context.job = name
+
+
+def record_timing(phase: str, seconds: float, rows: int = None, job: str = None, **fields):
+    # Eine Zeile je Phase; Fehler beim Schreiben dürfen den Job nicht stören
+    if not _timing_state["enabled"]:
+        return
+    record = {
+        "ts": datetime.datetime.now().isoformat(timespec="milliseconds"),
+        "job": job or current_timing_job(),
+        "phase": phase,
+        "seconds": round(seconds, 4),
+    }
+    stack = getattr(_timing_context, "stack", None)
+    if stack:
+        record["parent"] = stack[-1]
+    if rows is not None:
+        record["rows"] = int(rows)
+    record["peak_mb"] = _peak_memory_mb()
+    if tracemalloc_active():
+        record["py_peak_mb"] = round(_tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+    record.update(fields)
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    try:
+        with _timing_lock:
+            if not _timing_state["rotated"]:
+                _timing_state["rotated"] = True
+                if (
+                    os.path.exists(TIMING_LOG_FILE)
+                    and os.path.getsize(TIMING_LOG_FILE) > TIMING_LOG_MAX_BYTES
+                ):
+                    os.replace(TIMING_LOG_FILE, TIMING_LOG_FILE + ".1")
+            with open(TIMING_LOG_FILE, "a", encoding="utf-8") as f:
+                f.write(line)
+    except OSError as e:
+        logger.debug(f"Zeitmessung nicht geschrieben: {e}")
+
+
+class TimingSpan:
+    # Misst eine Phase (connect, query, fetch_page, format, write, backup ...)
+    # und schreibt beim Verlassen eine Zeile nach TIMING_LOG_FILE. Zeilen
+    # können während der Phase über span.rows gesetzt werden.
+    def __init__(self, phase: str, rows: int = None, job: str = None, **fields):
+        self.phase = phase
+        self.rows = rows
+        self.job = job
+        self.fields = fields
+
+    def __enter__(self):
+        if not hasattr(_timing_context, "stack"):
+            _timing_context.stack = []
+        _timing_context.stack.append(self.phase)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        _timing_context.stack.pop()
+        if exc_type is not None:
+            self.fields["error"] = exc_type.__name__
+        record_timing(self.phase, seconds, self.rows, self.job, **self.fields)
+        return False
+
+
+class PhaseTimer:
+    # Summiert verschachtelt laufende Teilphasen (z. B. Lesen und Formatieren
+    # je Block eines Generators) und schreibt sie am Ende als je eine Zeile
+    def __init__(self, **fields):
+        self.fields = fields
+        self.seconds = {}
+        self.rows = {}
+
+    def add(self, phase: str, seconds: float, rows: int = 0):
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+        self.rows[phase] = self.rows.get(phase, 0) + rows
+
+    def flush(self):
+        for phase, seconds in self.seconds.items():
+            record_timing(phase, seconds, self.rows[phase], **self.fields)
+        self.seconds.clear()
+        self.rows.clear()
+
+
+_tracemalloc = None
+# Profilierte Jobs laufen nacheinander: cProfile erlaubt ab Python 3.12 (über
+# sys.monitoring) nur einen aktiven Profiler, und tracemalloc ist prozessweit
+_profile_lock = threading.Lock()
+
+
+def tracemalloc_active() -> bool:
+    return _tracemalloc is not None and _tracemalloc.is_tracing()
+
+
+def profile_filename(job_id: int, name: str) -> str:
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe = re.sub(r"[^\w\-]+", "_", name).strip("_")[:60]
+    return os.path.join(ensure_base_dir(), f"profile_{stamp}_job{job_id}_{safe}")
+
+
+def run_profiled(job_id: int, name: str, func: Callable, *args):
+    # cProfile erfasst nur den Job-Thread (nicht die Seiten-Threads des
+    # Live-Abrufs), tracemalloc die Python-Allokationen des ganzen Prozesses.
+    # Ein zweiter profilierter Job wartet, bis der erste fertig ist.
+    # Bericht als Text plus .prof (pstats) in BASE_DIR.
+    global _tracemalloc
+    import cProfile
+    import tracemalloc
+
+    if not _profile_lock.acquire(blocking=False):
+        logger.info(f"Job {job_id} wartet auf einen anderen profilierten Job.")
+        _profile_lock.acquire()
+    try:
+        tracemalloc.start()
+        _tracemalloc = tracemalloc
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            return func(*args)
+        finally:
+            profiler.disable()
+            seconds = time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            _write_profile(job_id, name, profiler, seconds, current, peak, snapshot)
+    finally:
+        _profile_lock.release()
+
+
+def _write_profile(
+    job_id: int, name: str, profiler, seconds: float, current: int, peak: int, snapshot
+):
+    import io
+    import pstats
+
+    base = profile_filename(job_id, name)
+    stream = io.StringIO()
+    stream.write(f"Job {job_id}: {name}\n")
+    stream.write(f"Laufzeit: {seconds:.3f}s\n")
+    # Beide Speicherwerte gelten für den ganzen Prozess, also einschließlich
+    # gleichzeitig laufender (nicht profilierter) Jobs
+    stream.write(
+        f"Python-Speicher (prozessweit, alle Threads): aktuell {current / 2**20:.1f} MB, "
+        f"Spitze {peak / 2**20:.1f} MB\n"
+    )
+    stream.write(f"Prozess-Spitze (RSS, seit Programmstart): {_peak_memory_mb()} MB\n\n")
+    stream.write("=== cProfile (kumulativ, Top 40) ===\n")
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats("cumulative").print_stats(40)
+    stream.write("=== tracemalloc (Top 25 nach Zeile) ===\n")
+    for stat in snapshot.statistics("lineno")[:25]:
+        stream.write(f"{stat}\n")
+    try:
+        stats.dump_stats(base + ".prof")
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(stream.getvalue())
+        logger.info(f"Profil für Job {job_id} gespeichert: {base}.txt")
+    except OSError as e:
+        logger.error(f"Profil für Job {job_id} nicht gespeichert: {e}")
+
+
 # ---------------------------------------------------------------------------
 # Hilfsfunktionen
 # ---------------------------------------------------------------------------
@@ -53,37 +374,558 @@ def unix_to_datetime_str(timestamp: int) -> str:
         return ""
 
 
+def scaled_progress(progress: Optional[Callable], start: float, end: float):
+    # Bildet den Fortschritt 0-100 einer Teilaufgabe auf den Bereich start-end ab
+    if progress is None:
+        return None
+
+    def report(percent: float, message: str = None):
+        progress(start + (end - start) * percent / 100, message)
+
+    return report
+
+
 # ---------------------------------------------------------------------------
-# Funktionen für Plex Server-Verbindung (Live)
+# Hintergrund-Jobs (Worker-Pool mit Fortschritt und Abbruch)
 # ---------------------------------------------------------------------------
-def get_plex_server(baseurl: str, token: str):
-    logger.info("Versuche, Verbindung zum Plex-Server aufzubauen.")
-    if not PLEXAPI_AVAILABLE:
-        messagebox.showerror(
-            "Fehler",
-            "plexapi ist nicht installiert. Bitte installieren Sie plexapi zuerst.",
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, job_id: int, name: str, func: Callable, events: queue.Queue):
+        self.job_id = job_id
+        self.name = name
+        self.func = func
+        self.events = events
+        self.state = "wartend"  # "wartend", "läuft", "fertig"
+        self.cancel_event = threading.Event()
+        self.future = None
+        self.on_done = None
+        self.on_error = None
+        self.profile = False
+
+    def progress(self, percent: float, message: str = None):
+        # Wird im Worker aufgerufen; bricht bei Abbruchwunsch an dieser Stelle ab
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+        self.events.put(("progress", self, (percent, message)))
+
+    def cancel(self):
+        self.cancel_event.set()
+        # Noch wartende Jobs werden gar nicht erst gestartet
+        if self.future is not None and self.future.cancel():
+            self.state = "fertig"
+            self.events.put(("cancelled", self, None))
+
+
+class JobManager:
+    # Führt Jobs in einem Thread-Pool aus. Ergebnisse, Fehler und Fortschritt
+    # landen in einer Queue, die von der GUI per after() abgefragt wird.
+    def __init__(self, max_workers: int = 2):
+        self.events = queue.Queue()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="plexport-job"
         )
-        logger.error("Fehler: plexapi nicht verfügbar.")
+        self.jobs: List[Job] = []
+        self._next_id = 1
+        # Bei True wird für neu eingereihte Jobs ein Profil gespeichert
+        self.profile = False
+
+    def submit(
+        self,
+        name: str,
+        func: Callable,
+        on_done: Callable = None,
+        on_error: Callable = None,
+    ) -> Job:
+        job = Job(self._next_id, name, func, self.events)
+        job.on_done = on_done
+        job.on_error = on_error
+        job.profile = self.profile
+        self._next_id += 1
+        self.jobs.append(job)
+        job.future = self.executor.submit(self._run, job)
+        logger.info(f"Job {job.job_id} eingereiht: {name}")
+        return job
+
+    def _run(self, job: Job):
+        if job.cancel_event.is_set():
+            job.state = "fertig"
+            self.events.put(("cancelled", job, None))
+            return
+        job.state = "läuft"
+        self.events.put(("started", job, None))
+        set_timing_job(f"{job.job_id}:{job.name}")
+        try:
+            with TimingSpan("job"):
+                if job.profile:
+                    result = run_profiled(job.job_id, job.name, job.func, job.progress)
+                else:
+                    result = job.func(job.progress)
+        except JobCancelled:
+            logger.info(f"Job {job.job_id} abgebrochen: {job.name}")
+            job.state = "fertig"
+            self.events.put(("cancelled", job, None))
+            return
+        except Exception as e:
+            logger.exception(f"Fehler in Job {job.job_id} ({job.name}): {e}")
+            job.state = "fertig"
+            self.events.put(("error", job, e))
+            return
+        finally:
+            set_timing_job(None)
+        job.state = "fertig"
+        logger.info(f"Job {job.job_id} abgeschlossen: {job.name}")
+        self.events.put(("done", job, result))
+
+    def running(self) -> List[Job]:
+        return [j for j in self.jobs if j.state == "läuft"]
+
+    def pending(self) -> List[Job]:
+        return [j for j in self.jobs if j.state == "wartend"]
+
+    def poll(self) -> list:
+        # Liefert alle seit dem letzten Aufruf angefallenen Ereignisse
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        self.jobs = [j for j in self.jobs if j.state != "fertig"]
+        return events
+
+    def cancel_all(self):
+        for job in self.jobs:
+            job.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------------------------------------------------------------------------
+# Funktionen für Plex Server-Verbindung (Live)
+# ---------------------------------------------------------------------------
+# Elemente, die der Export nicht braucht und die Plex weglassen soll
+LIVE_EXCLUDE_ELEMENTS = (
+    "Media,Role,Writer,Producer,Collection,Label,Field,Similar,Image,"
+    "Guid,Rating,Chapter,Marker,Extras,UltraBlurColors"
+)
+# Für die Statistik reichen die Attribute der Einträge selbst
+LIVE_STATS_EXCLUDE_ELEMENTS = LIVE_EXCLUDE_ELEMENTS + ",Genre,Director,Country,Location"
+LIVE_PAGE_SIZE = 500
+LIVE_MAX_WORKERS = 4
+# Wiederholungen bei Verbindungsfehlern, Zeitüberschreitung und diesen
+# Statuscodes; Wartezeit LIVE_RETRY_BACKOFF * 2^Versuch (oder Retry-After)
+LIVE_RETRIES = 3
+LIVE_RETRY_BACKOFF = 0.5
+LIVE_RETRY_STATUS = (429, 500, 502, 503, 504)
+# Antwortzeiten der letzten Anfragen für die Zusammenfassung
+LIVE_LATENCY_SAMPLES = 1000
+# Kopfzeilen jeder Anfrage an die Plex-API (plus X-Plex-Token)
+PLEX_HEADERS = {
+    "X-Plex-Product": "PLEXport",
+    "X-Plex-Client-Identifier": "plexport",
+    "Accept": "application/xml",
+}
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
         return None
+
+
+def _float_or_none(value):
     try:
-        plex = PlexServer(baseurl, token)
-        logger.info("Verbindung zum Plex-Server hergestellt.")
-        return plex
-    except Exception as e:
-        messagebox.showerror(
-            "Fehler", f"Verbindung zum Plex-Server fehlgeschlagen:\n{e}"
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_live_items(container: ET.Element) -> List[dict]:
+    # Liest die Export-Felder direkt aus dem XML der Section-Liste
+    rows = []
+    for element in container:
+        rating_key = element.get("ratingKey")
+        if rating_key is None:
+            continue
+        tags = {"Genre": [], "Director": [], "Country": []}
+        for child in element:
+            if child.tag in tags:
+                tags[child.tag].append(child.get("tag", ""))
+        added_at = _int_or_none(element.get("addedAt"))
+        rows.append(
+            {
+                "id": int(rating_key),
+                "title": element.get("title"),
+                "studio": element.get("studio"),
+                "summary": element.get("summary", ""),
+                "duration": _int_or_none(element.get("duration")) or None,
+                "tags_genre": "|".join(tags["Genre"]),
+                "tags_director": "|".join(tags["Director"]),
+                "year": _int_or_none(element.get("year")),
+                # addedAt in lokaler Zeit, wie früher über plexapi
+                "added_at": (
+                    datetime.datetime.fromtimestamp(added_at) if added_at else None
+                ),
+                "tags_country": "|".join(tags["Country"]),
+                "audience_rating": _float_or_none(element.get("audienceRating")) or None,
+                "guid": element.get("guid"),
+                "updated_at": _int_or_none(element.get("updatedAt")),
+            }
+        )
+    return rows
+
+
+def parse_live_episodes(container: ET.Element) -> List[dict]:
+    # Episoden mit Verweisen auf Staffel (parent) und Serie (grandparent)
+    rows = []
+    for element in container:
+        rating_key = element.get("ratingKey")
+        if rating_key is None:
+            continue
+        rows.append(
+            {
+                "id": int(rating_key),
+                "show_id": _int_or_none(element.get("grandparentRatingKey")),
+                "show_title": element.get("grandparentTitle"),
+                "season_id": _int_or_none(element.get("parentRatingKey")),
+                "season_index": _int_or_none(element.get("parentIndex")),
+                "season_title": element.get("parentTitle"),
+                "duration": _int_or_none(element.get("duration")),
+                "added_at": _int_or_none(element.get("addedAt")),
+            }
+        )
+    return rows
+
+
+def section_page_params(plex_type: int, start: int, size: int, filters: dict = None) -> dict:
+    params = {
+        "type": plex_type,
+        "excludeElements": LIVE_EXCLUDE_ELEMENTS,
+        "X-Plex-Container-Start": start,
+        "X-Plex-Container-Size": size,
+    }
+    params.update(filters or {})
+    return params
+
+
+class PlexHttpClient:
+    # Zugriff auf die Plex-API als XML-Elemente statt plexapi-Objekten, damit
+    # keine Nachladeanfragen pro Eintrag entstehen. Alle Anfragen einer
+    # Verbindung laufen über eine requests-Session: Keep-Alive-Pool mit
+    # höchstens max_workers Verbindungen (weitere Anfragen warten auf eine
+    # freie), Zeitlimit je Anfrage und Wiederholung mit Backoff über
+    # urllib3-Retry (Statuscodes aus LIVE_RETRY_STATUS, Verbindungsfehler,
+    # Retry-After). Proxy-Einstellungen (HTTP(S)_PROXY) und Weiterleitungen
+    # übernimmt requests.
+    def __init__(
+        self,
+        baseurl: str,
+        token: str,
+        max_workers: int = LIVE_MAX_WORKERS,
+        timeout: float = 30,
+        retries: int = LIVE_RETRIES,
+        backoff: float = LIVE_RETRY_BACKOFF,
+    ):
+        if not REQUESTS_AVAILABLE:
+            raise RuntimeError("requests ist nicht installiert (pip install requests).")
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.baseurl = baseurl.rstrip("/")
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._server_id = None
+        self._sections = None
+        retry = Retry(
+            total=retries,
+            status_forcelist=LIVE_RETRY_STATUS,
+            backoff_factor=backoff,
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,  # letzte Antwort an raise_for_status geben
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=max_workers, pool_block=True, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        self.session.headers.update(dict(PLEX_HEADERS, **{"X-Plex-Token": token}))
+        self.stats = collections.Counter()
+        self.latencies = collections.deque(maxlen=LIVE_LATENCY_SAMPLES)
+        self._stats_lock = threading.Lock()
+
+    def _get(self, path: str, params: dict = None, stream: bool = False):
+        started = time.perf_counter()
+        response = self.session.get(
+            f"{self.baseurl}{path}", params=params, timeout=self.timeout, stream=stream
+        )
+        # Bei stream=True bis zu den Kopfzeilen
+        self.latencies.append(time.perf_counter() - started)
+        retries = getattr(response.raw, "retries", None)
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            self.stats["retries"] += len(retries.history) if retries else 0
+        return response
+
+    def get_xml(self, path: str, params: dict = None) -> ET.Element:
+        response = self._get(path, params)
+        response.raise_for_status()
+        return ET.fromstring(response.content)
+
+    def open_stream(self, path: str, params: dict = None):
+        # Antwort streamen, ohne sie ganz zu laden: response.raw ist das
+        # Datei-Objekt für ET.iterparse. response.close() gibt die
+        # Verbindung an den Pool zurück (auch vor dem Ende der Antwort).
+        response = self._get(path, params, stream=True)
+        if not response.ok:
+            response.close()
+            response.raise_for_status()
+        response.raw.decode_content = True
+        return response
+
+    def connections(self) -> int:
+        # Bisher geöffnete Verbindungen (ohne Proxy)
+        pools = self.adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def summary(self) -> str:
+        latencies = sorted(self.latencies)
+        text = (
+            f"{self.stats['requests']} Anfragen, {self.stats['retries']} Wiederholungen, "
+            f"{self.connections()} Verbindungen"
         )
-        logger.error(f"Fehler bei Verbindung zum Plex-Server: {e}")
+        if latencies:
+            p50 = latencies[len(latencies) // 2]
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            text += f", Antwortzeit p50 {p50 * 1000:.0f} ms / p95 {p95 * 1000:.0f} ms"
+        return text
+
+    def close(self):
+        self.session.close()
+
+    def sections(self, refresh: bool = False) -> List[dict]:
+        # Attribute aller Mediatheken (/library/sections); für die Sitzung
+        # gemerkt, refresh=True fragt den Server erneut
+        if self._sections is None or refresh:
+            self._sections = [
+                dict(directory.attrib)
+                for directory in self.get_xml("/library/sections").iter("Directory")
+            ]
+        return self._sections
+
+    def server_id(self) -> str:
+        # machineIdentifier als Schlüssel für den lokalen Cache
+        if self._server_id is None:
+            identity = self.get_xml("/identity")
+            self._server_id = identity.get("machineIdentifier") or self.baseurl
+        return self._server_id
+
+    def section_page(
+        self, section_key, plex_type: int, start: int, size: int, filters: dict = None
+    ) -> ET.Element:
+        params = section_page_params(plex_type, start, size, filters)
+        with TimingSpan("fetch_page", section=section_key, start=start) as span:
+            page = self.get_xml(f"/library/sections/{section_key}/all", params)
+            span.rows = _int_or_none(page.get("size"))
+        return page
+
+    def server_name(self) -> str:
+        # Anzeigename (friendlyName) für den Gesamtkatalog
+        return self.get_xml("/").get("friendlyName") or self.baseurl
+
+    def section_version(self, section_key) -> Optional[tuple]:
+        # Änderungsstand der Mediathek laut /library/sections (Einstellungen,
+        # Inhalt, letzter Scan); None, wenn der Server sie nicht kennt. Fragt
+        # immer neu und aktualisiert dabei die gemerkten Mediatheken.
+        for section in self.sections(refresh=True):
+            if section.get("key") == str(section_key):
+                return (
+                    section.get("updatedAt"),
+                    section.get("contentChangedAt"),
+                    section.get("scannedAt"),
+                )
         return None
 
+    def section_total(self, section_key, metadata_type: int) -> int:
+        # Leere Seite: nur totalSize, keine Einträge
+        plex_type = 1 if metadata_type == 1 else 2
+        page = self.section_page(section_key, plex_type, 0, 0)
+        return _int_or_none(page.get("totalSize")) or 0
+
+    def fetch_section_items(
+        self,
+        section_key,
+        metadata_type: int,
+        progress: Optional[Callable] = None,
+        page_size: int = LIVE_PAGE_SIZE,
+        filters: dict = None,
+        plex_type: int = None,
+        parse: Callable = parse_live_items,
+    ) -> List[dict]:
+        # Erste Seite liefert totalSize, die übrigen Seiten werden parallel geladen
+        if plex_type is None:
+            plex_type = 1 if metadata_type == 1 else 2  # wie bisher: Serien = Shows
+        timer = PhaseTimer(section=section_key)
+
+        def parse_page(page: ET.Element) -> List[dict]:
+            started = time.perf_counter()
+            rows = parse(page)
+            timer.add("parse", time.perf_counter() - started, len(rows))
+            return rows
+
+        first = self.section_page(section_key, plex_type, 0, page_size, filters)
+        total = _int_or_none(first.get("totalSize")) or _int_or_none(first.get("size")) or 0
+        pages = {0: parse_page(first)}
+        if progress:
+            progress(100 * min(page_size, total) / total if total else 100,
+                     f"{min(page_size, total)}/{total} Einträge geladen")
+
+        starts = list(range(page_size, total, page_size))
+        for start, page in self.iter_pages(section_key, plex_type, starts, page_size, filters):
+            pages[start] = parse_page(page)
+            if progress:
+                loaded = min(len(pages) * page_size, total)
+                progress(100 * loaded / total, f"{loaded}/{total} Einträge geladen")
+        timer.flush()
+        rows = []
+        for start in sorted(pages):
+            rows.extend(pages[start])
+        return rows
+
+    def iter_pages(self, section_key, plex_type: int, starts: list, page_size: int, filters: dict = None):
+        # Liefert (start, Seite) in Ankunftsreihenfolge; bis zu max_workers
+        # Seiten gleichzeitig unterwegs
+        if not starts:
+            return
+        job = current_timing_job()
+
+        def fetch_page(start: int) -> ET.Element:
+            set_timing_job(job)  # Seiten-Threads schreiben unter dem Job-Namen
+            return self.section_page(section_key, plex_type, start, page_size, filters)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(fetch_page, start): start for start in starts}
+            try:
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def iter_section_attributes(
+        self, section_key, metadata_type: int, progress: Optional[Callable] = None
+    ):
+        # Eine Anfrage ohne Unterelemente; die Antwort wird gestreamt und
+        # inkrementell geparst, pro Eintrag bleiben nur die Attribute übrig
+        plex_type = 1 if metadata_type == 1 else 2
+        response = self.open_stream(
+            f"/library/sections/{section_key}/all",
+            {"type": plex_type, "excludeElements": LIVE_STATS_EXCLUDE_ELEMENTS},
+        )
+        try:
+            total = None
+            seen = 0
+            root = None
+            for event, element in ET.iterparse(response.raw, events=("start", "end")):
+                if event == "start":
+                    if root is None:
+                        root = element
+                        total = _int_or_none(element.get("totalSize")) or _int_or_none(
+                            element.get("size")
+                        )
+                    continue
+                if element.get("ratingKey") is None:
+                    continue
+                seen += 1
+                yield element.attrib
+                root.clear()
+                if progress and seen % 1000 == 0:
+                    progress(100 * seen / total if total else 0, f"{seen} Einträge gelesen")
+        finally:
+            response.close()
+
+    def section_stats(
+        self, section_key, metadata_type: int, progress: Optional[Callable] = None
+    ) -> dict:
+        # Es bleiben nur Summen im Speicher
+        count = 0
+        total_duration = 0
+        rating_sum = 0.0
+        rating_count = 0
+        for attrs in self.iter_section_attributes(section_key, metadata_type, progress):
+            count += 1
+            total_duration += _int_or_none(attrs.get("duration")) or 0
+            rating = _float_or_none(attrs.get("audienceRating"))
+            if rating:  # 0 gilt wie im Detail-Export als "kein Rating"
+                rating_sum += rating
+                rating_count += 1
+        return {
+            "count": count,
+            "total_duration": total_duration,
+            "avg_rating": rating_sum / rating_count if rating_count else None,
+        }
+
+    def section_ids(
+        self, section_key, metadata_type: int, progress: Optional[Callable] = None
+    ) -> set:
+        return {
+            int(attrs["ratingKey"])
+            for attrs in self.iter_section_attributes(section_key, metadata_type, progress)
+        }
+
 
 # ---------------------------------------------------------------------------
 # Funktionen für lokale SQLite-Datenbank
 # ---------------------------------------------------------------------------
+# Lesezugriff auf die Backup-DB: Seiten per mmap statt read(), großer
+# Seiten-Cache, temporäre Sortierungen im Speicher. SQLite kürzt mmap_size
+# stillschweigend auf das Build-Maximum (Standard knapp 2 GiB); die ganze
+# Datei abzudecken bringt am meisten.
+SQLITE_MMAP_SIZE = 1 << 36
+SQLITE_CACHE_KIB = 64 * 1024
+_memory_db_counter = itertools.count(1)
+
+
+def sqlite_readonly_uri(db_path: str) -> str:
+    # immutable=1: SQLite sperrt nicht und legt kein Journal an; die Backup-DB
+    # wird während der Auswertung nicht verändert
+    return pathlib.Path(db_path).resolve().as_uri() + "?mode=ro&immutable=1"
+
+
+def tune_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_KIB}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
+def open_db(db_path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+    # Wie connect_to_db, aber ohne Dialoge; für Hintergrund-Jobs mit eigener
+    # Verbindung. Dateien werden nur lesend geöffnet, "file:"-URIs (RAM-Kopie)
+    # unverändert übernommen.
+    if db_path.startswith("file:"):
+        uri = db_path
+    else:
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"DB-Datei nicht gefunden: {db_path}")
+        uri = sqlite_readonly_uri(db_path)
+    with TimingSpan("connect", source="ram" if db_path.startswith("file:") else "db"):
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
+        return tune_connection(conn)
+
+
 def connect_to_db(db_path: str) -> sqlite3.Connection:
     logger.info(f"Stelle Verbindung zur lokalen DB her: {db_path}")
     try:
-        conn = sqlite3.connect(db_path)
+        conn = open_db(db_path)
         logger.info("Verbindung zur lokalen SQLite-Datenbank erfolgreich.")
         return conn
     except Exception as e:
@@ -101,7 +943,8 @@ def list_tables(conn: sqlite3.Connection) -> List[str]:
 
 def load_table_as_dataframe(conn: sqlite3.Connection, table_name: str) -> pd.DataFrame:
     logger.debug(f"Lade ersten 10 Datensätze aus Tabelle {table_name}")
-    query = f"SELECT * FROM {table_name} LIMIT 10"
+    quoted = '"' + table_name.replace('"', '""') + '"'
+    query = f"SELECT * FROM {quoted} LIMIT 10"
     return pd.read_sql_query(query, conn)
 
 
@@ -111,13 +954,16 @@ def list_libraries(conn: sqlite3.Connection) -> pd.DataFrame:
     return pd.read_sql_query(query, conn)
 
 
-def get_library_details(
-    conn: sqlite3.Connection, library_id: int, metadata_type: int
-) -> pd.DataFrame:
-    logger.debug(
-        f"Lade Details für Mediathek-ID {library_id} mit metadata_type {metadata_type}"
-    )
-    query = f"""
+READ_CHUNK_SIZE = 5000
+
+
+# Nur diese Tag-Typen landen im Export: 1 = Genre, 4 = Regie, 5 = Land
+EXPORT_TAG_TYPES = (1, 4, 5)
+
+# Zusatzindex, der nur in einer Arbeitskopie der DB angelegt wird
+SCRATCH_INDEX_NAME = "plexport_taggings_item_tag"
+
+LEGACY_LIBRARY_DETAILS_QUERY = """
     SELECT
         mi.id,
         mi.title,
@@ -133,155 +979,2945 @@ def get_library_details(
     FROM metadata_items mi
     LEFT JOIN taggings tg ON mi.id = tg.metadata_item_id
     LEFT JOIN tags t ON tg.tag_id = t.id
-    WHERE mi.library_section_id = {library_id}
-      AND mi.metadata_type = {metadata_type}
+    WHERE mi.library_section_id = :library_id
+      AND mi.metadata_type = :metadata_type
     GROUP BY mi.id
     """
 
-    df = pd.read_sql_query(query, conn)
+
+def library_params(library_id: int, metadata_type: int) -> dict:
+    return {"library_id": int(library_id), "metadata_type": int(metadata_type)}
+
+
+def section_filter(alias: str, section_count: int = None) -> str:
+    # Bedingung auf metadata_items für eine Mediathek (:library_id) oder
+    # mehrere (:section_0, :section_1, ... siehe sections_params)
+    prefix = f"{alias}." if alias else ""
+    if section_count is None:
+        sections = f"{prefix}library_section_id = :library_id"
+    else:
+        names = ", ".join(f":section_{i}" for i in range(section_count))
+        sections = f"{prefix}library_section_id IN ({names})"
+    return f"{sections}\n              AND {prefix}metadata_type = :metadata_type"
+
+
+def sections_params(library_ids: List[int], metadata_type: int) -> dict:
+    params = {f"section_{i}": int(lib) for i, lib in enumerate(library_ids)}
+    params["metadata_type"] = int(metadata_type)
+    return params
+
+
+def tag_rows_query(
+    item_driven: bool = False,
+    section_count: int = None,
+    columns: str = "tg.metadata_item_id AS item_id, t.tag_type, t.tag",
+) -> str:
+    # Taggings der relevanten Tags (CTE relevant_tags) für eine oder mehrere
+    # Mediatheken, je Eintrag in Plex-Reihenfolge
+    if item_driven:
+        # Mit Zusatzindex (metadata_item_id, tag_id): pro Eintrag nur den Index lesen
+        # und gegen die kleine Menge relevanter Tags prüfen
+        return f"""
+            SELECT {columns}
+            FROM metadata_items m
+            CROSS JOIN taggings tg ON tg.metadata_item_id = m.id
+            CROSS JOIN relevant_tags t ON t.id = tg.tag_id
+            WHERE {section_filter("m", section_count)}
+            ORDER BY tg.metadata_item_id, tg.id"""
+    # Ohne Zusatzindex: von den wenigen relevanten Tags über den tag_id-Index
+    # zu den Taggings. Das "+" verhindert, dass SQLite dafür den Index auf
+    # metadata_item_id nimmt (eine Abfrage je Tag und Eintrag).
+    return f"""
+            SELECT {columns}
+            FROM relevant_tags t
+            CROSS JOIN taggings tg ON tg.tag_id = t.id
+            WHERE +tg.metadata_item_id IN (
+                SELECT id FROM metadata_items
+                WHERE {section_filter("", section_count)}
+            )
+            ORDER BY tg.metadata_item_id, tg.id"""
+
+
+def tag_aggregation_ctes(item_driven: bool = False, section_count: int = None) -> str:
+    # Tags werden vor dem Join mit metadata_items gefiltert (nur Genre/Regie/Land)
+    # und je Eintrag und Tag-Typ vorab aggregiert. Dadurch wird nicht jeder Film
+    # mit sämtlichen Taggings (z. B. Darstellern) multipliziert.
+    tag_types = ", ".join(str(t) for t in EXPORT_TAG_TYPES)
+    return f"""relevant_tags AS (
+        SELECT id, tag_type, tag FROM tags WHERE tag_type IN ({tag_types})
+    ),
+    tag_agg AS (
+        SELECT
+            item_id,
+            GROUP_CONCAT(CASE WHEN tag_type=1 THEN tag END, '|') AS tags_genre,
+            GROUP_CONCAT(CASE WHEN tag_type=4 THEN tag END, '|') AS tags_director,
+            GROUP_CONCAT(CASE WHEN tag_type=5 THEN tag END, '|') AS tags_country
+        FROM ({tag_rows_query(item_driven, section_count)}
+        )
+        GROUP BY item_id
+    )"""
+
+
+def details_select(tag_table: str) -> str:
+    return f"""
+    SELECT
+        mi.id,
+        mi.title,
+        mi.studio,
+        mi.summary,
+        CAST(mi.duration as INTEGER) as duration,
+        ta.tags_genre,
+        ta.tags_director,
+        mi.year,
+        mi.added_at,
+        ta.tags_country,
+        mi.audience_rating
+    FROM metadata_items mi
+    LEFT JOIN {tag_table} ta ON ta.item_id = mi.id
+    WHERE {section_filter("mi")}
+    ORDER BY mi.id
+    """
+
+
+def library_details_query(item_driven: bool = False) -> str:
+    # Mediathek und Typ werden gebunden (library_params), der Text bleibt
+    # gleich und wird von sqlite3 als vorbereitete Anweisung wiederverwendet.
+    return f"""
+    WITH {tag_aggregation_ctes(item_driven)}{details_select("tag_agg")}"""
+
+
+def has_scratch_index(conn: sqlite3.Connection) -> bool:
+    cursor = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='index' AND name=?",
+        (SCRATCH_INDEX_NAME,),
+    )
+    return cursor.fetchone() is not None
+
+
+def explain_query_plan(
+    conn: sqlite3.Connection, query: str, params: dict = None
+) -> List[str]:
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params or {})]
+
+
+def check_query_plan(plan: List[str]) -> List[str]:
+    # Liefert die Planschritte, die taggings komplett durchlaufen oder
+    # taggings pro Tag und Eintrag einzeln abfragen
+    return [
+        step
+        for step in plan
+        if step.startswith(("SCAN tg", "SCAN taggings"))
+        or "metadata_item_id=? AND tag_id=?" in step
+    ]
+
+
+def build_library_details_query(
+    conn: sqlite3.Connection, library_id: int, metadata_type: int
+) -> str:
+    query = library_details_query(item_driven=has_scratch_index(conn))
+    plan = explain_query_plan(conn, query, library_params(library_id, metadata_type))
+    logger.debug("Abfrageplan Mediathek-Details:\n" + "\n".join(plan))
+    problems = check_query_plan(plan)
+    if problems:
+        logger.warning(f"Ungünstiger Abfrageplan für Mediathek-Details: {problems}")
+    return query
+
+
+def _copy_database(
+    src: sqlite3.Connection,
+    dst: sqlite3.Connection,
+    progress: Optional[Callable] = None,
+    create_index: bool = True,
+):
+    # Backup-API seitenweise (mit Fortschritt), danach optional Zusatzindex auf
+    # taggings(metadata_item_id, tag_id)
+    copy_end = 80 if create_index else 100
+
+    def on_pages(status, remaining, total):
+        if progress and total:
+            progress(copy_end * (total - remaining) / total, "Kopiere Datenbank ...")
+
+    src.backup(dst, pages=4096, progress=on_pages)
+    if create_index:
+        if progress:
+            progress(80, "Lege Zusatzindex an ...")
+        dst.execute(
+            f"CREATE INDEX IF NOT EXISTS {SCRATCH_INDEX_NAME} "
+            "ON taggings(metadata_item_id, tag_id)"
+        )
+        dst.commit()
+
+
+def create_scratch_copy(
+    db_path: str, target_path: str = None, progress: Optional[Callable] = None
+) -> str:
+    # Kopiert die (unveränderliche) Backup-DB in eine Arbeitskopie und legt dort
+    # den Zusatzindex an
+    if target_path is None:
+        fd, target_path = tempfile.mkstemp(prefix="plexport_", suffix=".db")
+        os.close(fd)
+    logger.info(f"Erstelle Arbeitskopie {target_path} von {db_path}")
+    src = open_db(db_path)
+    dst = sqlite3.connect(target_path)
+    try:
+        _copy_database(src, dst, progress)
+    except BaseException:
+        dst.close()
+        os.remove(target_path)
+        raise
+    finally:
+        src.close()
+    dst.close()
+    return target_path
+
+
+def copy_db_to_memory(
+    db_path: str, create_index: bool = False, progress: Optional[Callable] = None
+):
+    # Lädt die DB in eine benannte In-Memory-DB (shared cache), die weitere
+    # Verbindungen über die URI öffnen können. Sie lebt, solange die
+    # zurückgegebene Verbindung offen ist. Liefert (uri, Verbindung).
+    uri = f"file:plexport_ram_{next(_memory_db_counter)}?mode=memory&cache=shared"
+    logger.info(f"Lade {db_path} in den Arbeitsspeicher ({uri})")
+    keeper = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    src = open_db(db_path)
+    try:
+        _copy_database(src, keeper, progress, create_index)
+    except BaseException:
+        keeper.close()
+        raise
+    finally:
+        src.close()
+    return uri, keeper
+
+
+def benchmark_library_query(
+    conn: sqlite3.Connection, library_id: int, metadata_type: int, repeat: int = 3
+) -> dict:
+    # Vergleicht die bisherige Abfrage mit der aktuellen (beste von `repeat` Läufen)
+    queries = {
+        "legacy": LEGACY_LIBRARY_DETAILS_QUERY,
+        "current": build_library_details_query(conn, library_id, metadata_type),
+    }
+    results = {}
+    for name, query in queries.items():
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = conn.execute(query, library_params(library_id, metadata_type)).fetchall()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = {"seconds": best, "rows": len(rows)}
+    results["speedup"] = results["legacy"]["seconds"] / max(
+        results["current"]["seconds"], 1e-9
+    )
+    logger.info(f"Benchmark Mediathek-Abfrage {library_id}/{metadata_type}: {results}")
+    return results
+
+
+def format_duration_hhmm(ms: pd.Series) -> pd.Series:
+    # Vektorisiert wie convert_ms_to_hhmm; fehlende Werte werden zu ""
+    ms = pd.to_numeric(ms, errors="coerce")
+    valid = ms.notna()
+    out = pd.Series("", index=ms.index, dtype=object)
+    if valid.any():
+        total_minutes = (ms[valid] // 60000).astype("int64")
+        hours = (total_minutes // 60).astype(str).str.zfill(2)
+        minutes = (total_minutes % 60).astype(str).str.zfill(2)
+        out[valid] = hours + ":" + minutes
+    return out
+
+
+# Byte-Positionen, um "JJJJ-MM-TTThh:mm:ss" nach "TT.MM.JJJJ hh:mm:ss" umzustellen
+_ISO_TO_DE = [8, 9, 4, 5, 6, 7, 0, 1, 2, 3, 10, 11, 12, 13, 14, 15, 16, 17, 18]
+# Nur für vierstellige Jahre (1000-01-01 bis 9999-12-31) hat der ISO-Text
+# genau 19 Zeichen; als Unix-Sekunden
+_ISO_MIN_SECONDS = -30610224000
+_ISO_MAX_SECONDS = 253402300799
+
+
+def format_datetime_de(values: pd.Series) -> pd.Series:
+    # Unix-Zeitstempel (lokale DB) oder datetime (Live) als "TT.MM.JJJJ hh:mm:ss".
+    # Statt strftime pro Wert wird der ISO-Text von NumPy byteweise umgestellt;
+    # liegt ein Wert außerhalb der Jahre 1000-9999, formatiert strftime.
+    if pd.api.types.is_datetime64_any_dtype(values):
+        dt = values
+        if getattr(dt.dt, "tz", None) is not None:
+            dt = dt.dt.tz_localize(None)
+    else:
+        dt = pd.to_datetime(pd.to_numeric(values, errors="coerce"), unit="s", errors="coerce")
+    valid = dt.notna()
+    out = pd.Series("", index=values.index, dtype=object)
+    if valid.any():
+        seconds = dt[valid].to_numpy().astype("datetime64[s]")
+        unix = seconds.astype("int64")
+        if unix.min() < _ISO_MIN_SECONDS or unix.max() > _ISO_MAX_SECONDS:
+            out[valid] = dt[valid].dt.strftime("%d.%m.%Y %H:%M:%S")
+            return out
+        iso = seconds.astype("S19")
+        chars = iso.view(np.uint8).reshape(-1, 19)[:, _ISO_TO_DE]
+        chars[:, [2, 5]] = ord(".")
+        chars[:, 10] = ord(" ")
+        out[valid] = np.ascontiguousarray(chars).view("S19").ravel().astype(str)
+    return out
+
+
+def format_decimal_comma(values: pd.Series) -> pd.Series:
+    # Eine Nachkommastelle mit Komma; np.char.mod rundet exakt wie f"{r:.1f}"
+    numbers = pd.to_numeric(values, errors="coerce")
+    valid = numbers.notna()
+    out = pd.Series("", index=numbers.index, dtype=object)
+    if valid.any():
+        text = np.char.mod("%.1f", numbers[valid].to_numpy(dtype=float))
+        out[valid] = np.char.replace(text, ".", ",")
+    return out
+
+
+def format_library_details(df: pd.DataFrame) -> pd.DataFrame:
+    # Gemeinsame Formatierung für lokale und Live-Daten. Der übergebene
+    # typisierte Frame bleibt unverändert (z. B. für Statistiken).
+    df = df.copy()
 
     # Dauer in HH:MM umwandeln
     if "duration" in df.columns:
-        df["duration"] = df["duration"].apply(
-            lambda ms: convert_ms_to_hhmm(ms) if pd.notnull(ms) else ""
-        )
+        df["duration"] = format_duration_hhmm(df["duration"])
 
     # added_at konvertieren
     if "added_at" in df.columns:
-        df["added_at"] = df["added_at"].apply(
-            lambda x: unix_to_datetime_str(x) if pd.notnull(x) else ""
-        )
+        df["added_at"] = format_datetime_de(df["added_at"])
 
     # audience_rating formatieren: Komma anstatt Punkt
     if "audience_rating" in df.columns:
-        df["audience_rating"] = df["audience_rating"].apply(
-            lambda r: f"{r:.1f}".replace(".", ",") if pd.notnull(r) else ""
-        )
+        df["audience_rating"] = format_decimal_comma(df["audience_rating"])
 
     return df
 
 
-def count_items_in_library(
-    conn: sqlite3.Connection, library_id: int, metadata_type: int
-) -> int:
-    logger.debug(
-        f"Zähle Inhalte für Mediathek-ID {library_id} mit metadata_type {metadata_type}"
+# ---------------------------------------------------------------------------
+# Kompaktes Datenmodell für geladene Mediatheken
+# ---------------------------------------------------------------------------
+# Spalten der Mediathek-Details in Export-Reihenfolge
+DETAIL_COLUMNS = [
+    "id",
+    "title",
+    "studio",
+    "summary",
+    "duration",
+    "tags_genre",
+    "tags_director",
+    "year",
+    "added_at",
+    "tags_country",
+    "audience_rating",
+]
+# Export-Spalte je Plex-tag_type (siehe EXPORT_TAG_TYPES)
+TAG_COLUMNS = {1: "tags_genre", 4: "tags_director", 5: "tags_country"}
+# Wenige verschiedene Werte je Mediathek: als Kategorie (Codes + Verzeichnis)
+CATEGORY_COLUMNS = ("studio",)
+# Nullable Ganzzahlen statt float64/object; Jahr passt in 16 Bit
+INTEGER_COLUMNS = {"duration": "Int64", "year": "Int16", "added_at": "Int64"}
+# Freitext: mit pyarrow als Arrow-Strings statt einzelner Python-Objekte
+# (pandas 3 macht das bereits von sich aus)
+TEXT_COLUMNS = ("title", "summary")
+
+DETAIL_ITEMS_QUERY = f"""
+    SELECT
+        mi.id,
+        mi.title,
+        mi.studio,
+        mi.summary,
+        CAST(mi.duration as INTEGER) as duration,
+        mi.year,
+        mi.added_at,
+        mi.audience_rating
+    FROM metadata_items mi
+    WHERE {section_filter("mi")}
+    ORDER BY mi.id
+    """
+
+
+class LibraryDetails:
+    # Typisierte Details einer Mediathek in kompakter Form:
+    #   items      eine Zeile je Eintrag, ohne Tag-Spalten; Kategorien und
+    #              nullable Ganzzahlen (siehe compact_items)
+    #   item_tags  Zuordnung (item_id, tag_id) in Plex-Reihenfolge
+    #   tags       Tag-Verzeichnis mit Index tag_id: tag_type, tag
+    # Die "|"-verbundenen Tag-Spalten entstehen erst an der Export-Grenze
+    # (frames / to_frame), blockweise und nur für den jeweiligen Block.
+    def __init__(
+        self,
+        items: pd.DataFrame,
+        item_tags: pd.DataFrame,
+        tags: pd.DataFrame,
+        columns: List[str],
+        tag_fill: Optional[str] = None,
+    ):
+        self.items = items
+        self.item_tags = item_tags
+        self.tags = tags
+        self.columns = columns
+        # Wert für Einträge ohne Tags: None (DB) bzw. "" (Live-Daten)
+        self.tag_fill = tag_fill
+        self.empty = items.empty
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def memory_bytes(self) -> int:
+        return int(
+            sum(
+                frame.memory_usage(index=True, deep=True).sum()
+                for frame in (self.items, self.item_tags, self.tags)
+            )
+        )
+
+    def frames(self, chunksize: int = READ_CHUNK_SIZE):
+        # Export-Grenze: liefert Blöcke im bisherigen Format (Spalten wie
+        # DETAIL_COLUMNS, Tags "|"-verbunden, Studio als Text)
+        if self.empty:
+            return
+        positions = pd.Index(self.items["id"]).get_indexer(self.item_tags["item_id"])
+        keep = positions >= 0
+        order = np.argsort(positions[keep], kind="stable")
+        positions = positions[keep][order]
+        tag_rows = self.tags.index.get_indexer(self.item_tags["tag_id"].to_numpy()[keep][order])
+        tag_types = self.tags["tag_type"].to_numpy()[tag_rows]
+        tag_names = self.tags["tag"].to_numpy()[tag_rows]
+
+        for start in range(0, len(self.items), chunksize):
+            stop = min(start + chunksize, len(self.items))
+            lo, hi = np.searchsorted(positions, [start, stop])
+            chunk = self.items.iloc[start:stop].reset_index(drop=True)
+            for tag_type, column in TAG_COLUMNS.items():
+                if column not in self.columns:
+                    continue
+                mask = tag_types[lo:hi] == tag_type
+                chunk[column] = pd.Series(
+                    join_tag_names(
+                        positions[lo:hi][mask] - start,
+                        tag_names[lo:hi][mask],
+                        stop - start,
+                        self.tag_fill,
+                    )
+                )
+            for column in chunk.columns:
+                # Kategorien und Arrow-Strings (compact_items) zurück zu Text
+                if isinstance(chunk[column].dtype, pd.CategoricalDtype) or (
+                    chunk[column].dtype == "string[pyarrow]"
+                ):
+                    values = chunk[column].to_numpy(dtype=object)
+                    values[pd.isna(values)] = None
+                    chunk[column] = pd.Series(values)
+            if "year" in chunk.columns:
+                # Wie bisher: float nur, wenn Jahre fehlen
+                year = chunk["year"]
+                chunk["year"] = year.astype("float64" if year.hasnans else "int64")
+            yield chunk[self.columns]
+
+    def to_frame(self) -> pd.DataFrame:
+        if self.empty:
+            return pd.DataFrame(columns=self.columns)
+        return pd.concat(self.frames(), ignore_index=True)
+
+
+def join_tag_names(
+    positions: np.ndarray, names: np.ndarray, size: int, fill: Optional[str] = None
+) -> np.ndarray:
+    # Verbindet die Tags je Zeile mit "|" wie GROUP_CONCAT; positions ist
+    # aufsteigend sortiert. Zeilen ohne Tags erhalten fill.
+    out = np.full(size, fill, dtype=object)
+    if len(positions):
+        starts = np.flatnonzero(np.r_[True, positions[1:] != positions[:-1]])
+        ends = np.r_[starts[1:], len(positions)]
+        names = names.tolist()
+        for pos, a, b in zip(positions[starts].tolist(), starts.tolist(), ends.tolist()):
+            out[pos] = "|".join(names[a:b])
+    return out
+
+
+def compact_items(df: pd.DataFrame) -> pd.DataFrame:
+    # Tag-Spalten entfernen, Kategorien und nullable Ganzzahlen setzen
+    items = df.drop(columns=[c for c in TAG_COLUMNS.values() if c in df.columns])
+    for column in CATEGORY_COLUMNS:
+        if column in items.columns:
+            items[column] = items[column].astype("category")
+    if PYARROW_AVAILABLE:
+        for column in TEXT_COLUMNS:
+            if column in items.columns and items[column].dtype == object:
+                items[column] = items[column].astype("string[pyarrow]")
+    for column, dtype in INTEGER_COLUMNS.items():
+        if column in items.columns and not pd.api.types.is_datetime64_any_dtype(items[column]):
+            items[column] = pd.to_numeric(items[column], errors="coerce").round().astype(dtype)
+    return items
+
+
+def normalise_tags(df: pd.DataFrame):
+    # "|"-verbundene Tag-Spalten (Live-Daten, Cache) in (item_tags, tags)
+    # zerlegen; jeder Tag-Text steht danach nur einmal im Verzeichnis
+    parts = []
+    ids = df["id"].to_numpy()
+    for tag_type, column in TAG_COLUMNS.items():
+        if column not in df.columns:
+            continue
+        values = df[column].reset_index(drop=True)
+        values = values[values.notna() & (values != "")]
+        exploded = values.str.split("|").explode()
+        parts.append(
+            pd.DataFrame(
+                {
+                    "item_id": ids[exploded.index.to_numpy()],
+                    "tag_type": tag_type,
+                    "tag": exploded.to_numpy(dtype=object),
+                }
+            )
+        )
+    if not parts:
+        return empty_item_tags(), empty_tags()
+    pairs = pd.concat(parts, ignore_index=True)
+    codes, uniques = pd.MultiIndex.from_frame(pairs[["tag_type", "tag"]]).factorize()
+    tags = pd.DataFrame(
+        {
+            "tag_type": uniques.get_level_values(0).to_numpy(dtype="int8"),
+            "tag": uniques.get_level_values(1).to_numpy(dtype=object),
+        },
+        index=pd.RangeIndex(len(uniques), name="tag_id"),
+    )
+    item_tags = pd.DataFrame({"item_id": pairs["item_id"], "tag_id": codes})
+    return downcast_ids(item_tags), tags
+
+
+def downcast_ids(item_tags: pd.DataFrame) -> pd.DataFrame:
+    # Kleinster Ganzzahltyp, in den alle IDs passen (meist uint32 statt int64)
+    return item_tags.apply(pd.to_numeric, downcast="unsigned")
+
+
+def empty_item_tags() -> pd.DataFrame:
+    return pd.DataFrame({"item_id": np.array([], dtype="int64"), "tag_id": np.array([], dtype="int64")})
+
+
+def empty_tags() -> pd.DataFrame:
+    return pd.DataFrame(
+        {"tag_type": np.array([], dtype="int8"), "tag": np.array([], dtype=object)},
+        index=pd.Index([], dtype="int64", name="tag_id"),
+    )
+
+
+def details_from_frame(df: pd.DataFrame) -> LibraryDetails:
+    # Für Frames mit "|"-verbundenen Tags (Live-Abruf, Live-Cache)
+    if df.empty:
+        return LibraryDetails(df, empty_item_tags(), empty_tags(), list(df.columns))
+    item_tags, tags = normalise_tags(df)
+    tag_columns = [c for c in TAG_COLUMNS.values() if c in df.columns]
+    tag_fill = "" if (df[tag_columns] == "").any().any() else None
+    return LibraryDetails(compact_items(df), item_tags, tags, list(df.columns), tag_fill)
+
+
+def load_item_tags(conn: sqlite3.Connection, library_id: int, metadata_type: int):
+    # Tags einer Mediathek direkt normalisiert: Paare (item_id, tag_id) als
+    # reine Ganzzahlen, dazu nur die verwendeten Einträge aus tags
+    query = f"""
+    WITH relevant_tags AS (
+        SELECT id, tag_type, tag FROM tags
+        WHERE tag_type IN ({", ".join(str(t) for t in EXPORT_TAG_TYPES)})
+    )
+    {tag_rows_query(has_scratch_index(conn), columns="tg.metadata_item_id AS item_id, tg.tag_id")}
+    """
+    params = library_params(library_id, metadata_type)
+    item_tags = downcast_ids(
+        pd.read_sql_query(query, conn, params=params, dtype={"item_id": "int64", "tag_id": "int64"})
+    )
+    tags = pd.read_sql_query(
+        f"""
+        SELECT id AS tag_id, tag_type, tag FROM tags
+        WHERE tag_type IN ({", ".join(str(t) for t in EXPORT_TAG_TYPES)})
+        """,
+        conn,
+        index_col="tag_id",
+    )
+    tags = tags[tags.index.isin(item_tags["tag_id"].unique())]
+    return item_tags, tags.astype({"tag_type": "int8"})
+
+
+def load_library_details(
+    conn: sqlite3.Connection,
+    library_id: int,
+    metadata_type: int,
+    progress: Optional[Callable] = None,
+) -> LibraryDetails:
+    # Typisierte Rohdaten in kompakter Form (siehe LibraryDetails): duration
+    # in ms, added_at als Unix-Zeit, Rating als float, Tags normalisiert
+    logger.debug(
+        f"Lade Details für Mediathek-ID {library_id} mit metadata_type {metadata_type}"
+    )
+    params = library_params(library_id, metadata_type)
+    with TimingSpan("query", library=library_id, metadata_type=metadata_type) as span:
+        # Blockweise lesen und sofort verdichten; Fortschritt und Abbruch je Block
+        total = count_items_in_library(conn, library_id, metadata_type) if progress else 0
+        chunks = []
+        read = 0
+        for chunk in pd.read_sql_query(
+            DETAIL_ITEMS_QUERY, conn, params=params, chunksize=READ_CHUNK_SIZE
+        ):
+            chunks.append(compact_items(chunk))
+            read += len(chunk)
+            if progress:
+                progress(
+                    90 * read / total if total else 90, f"{read}/{total} Einträge gelesen"
+                )
+        if not chunks:
+            span.rows = 0
+            return details_from_frame(pd.DataFrame())
+        items = pd.concat(chunks, ignore_index=True)
+        # Kategorien der einzelnen Blöcke vereinheitlichen
+        for column in CATEGORY_COLUMNS:
+            items[column] = items[column].astype("category")
+        if progress:
+            progress(90, "Lese Tags ...")
+        item_tags, tags = load_item_tags(conn, library_id, metadata_type)
+        span.rows = len(items)
+    details = LibraryDetails(items, item_tags, tags, DETAIL_COLUMNS)
+    logger.debug(
+        f"Mediathek-ID {library_id}: {len(items)} Einträge, "
+        f"{details.memory_bytes() / 1e6:.1f} MB im Speicher"
+    )
+    return details
+
+
+def get_library_details(
+    conn: sqlite3.Connection,
+    library_id: int,
+    metadata_type: int,
+    progress: Optional[Callable] = None,
+) -> pd.DataFrame:
+    details = load_library_details(
+        conn, library_id, metadata_type, scaled_progress(progress, 0, 90)
+    )
+    if progress:
+        progress(90, "Formatiere Daten ...")
+    with TimingSpan("format", rows=len(details)):
+        return format_library_details(details.to_frame())
+
+
+def iter_library_details(
+    conn: sqlite3.Connection,
+    library_id: int,
+    metadata_type: int,
+    chunksize: int = READ_CHUNK_SIZE,
+    query: str = None,
+):
+    # Liefert die formatierten Details blockweise; es liegt immer nur ein
+    # Block im Speicher (Cursor + fetchmany statt read_sql_query)
+    if query is None:
+        query = build_library_details_query(conn, library_id, metadata_type)
+    # Lesen und Formatieren werden je Block summiert, die Zeit des Verbrauchers
+    # (z. B. openpyxl) zwischen den Blöcken zählt nicht mit
+    timer = PhaseTimer(library=library_id, metadata_type=metadata_type)
+    cursor = conn.cursor()
+    try:
+        started = time.perf_counter()
+        cursor.execute(query, library_params(library_id, metadata_type))
+        columns = [d[0] for d in cursor.description]
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            timer.add("query", time.perf_counter() - started, len(rows))
+            if not rows:
+                break
+            started = time.perf_counter()
+            chunk = format_library_details(pd.DataFrame.from_records(rows, columns=columns))
+            timer.add("format", time.perf_counter() - started, len(chunk))
+            yield chunk
+            started = time.perf_counter()
+    finally:
+        cursor.close()
+        timer.flush()
+
+
+def export_library_details_streaming(
+    conn: sqlite3.Connection,
+    library_id: int,
+    metadata_type: int,
+    path: str,
+    progress: Optional[Callable] = None,
+    extra_sheets: Optional[dict] = None,
+    fmt: str = None,
+) -> int:
+    # Exportiert eine Mediathek mit konstantem Speicherbedarf direkt in die
+    # Datei; das Format folgt fmt bzw. der Endung (siehe EXPORT_FORMATS).
+    # Liefert die Anzahl geschriebener Zeilen (0 = nichts exportiert).
+    total = count_items_in_library(conn, library_id, metadata_type)
+    if total == 0:
+        return 0
+    logger.info(f"Streaming-Export von {total} Einträgen nach {path}")
+    chunks = iter_library_details(conn, library_id, metadata_type)
+    return write_export(path, chunks, total, progress, extra_sheets=extra_sheets, fmt=fmt)
+
+
+def count_items_in_library(
+    conn: sqlite3.Connection, library_id: int, metadata_type: int
+) -> int:
+    logger.debug(
+        f"Zähle Inhalte für Mediathek-ID {library_id} mit metadata_type {metadata_type}"
+    )
+    query = """
+    SELECT COUNT(*) as cnt
+    FROM metadata_items
+    WHERE library_section_id = :library_id AND metadata_type = :metadata_type
+    """
+    df = pd.read_sql_query(query, conn, params=library_params(library_id, metadata_type))
+    return df["cnt"].iloc[0] if not df.empty else 0
+
+
+# ---------------------------------------------------------------------------
+# Eintrags-Browser (Keyset-Paginierung über metadata_items)
+# ---------------------------------------------------------------------------
+BROWSER_COLUMNS = ["id", "title", "year", "added_at", "duration", "audience_rating", "studio"]
+BROWSER_SORT_KEYS = {
+    "title": "mi.title COLLATE NOCASE",
+    "year": "mi.year",
+    "added_at": "mi.added_at",
+}
+BROWSER_PAGE_SIZE = 200
+# Höchstens so viele Zeilen hält der Browser im Speicher
+BROWSER_BUFFER_ROWS = 1000
+
+
+class KeysetPager:
+    # Blättert durch die Einträge einer Mediathek, ohne sie komplett zu laden.
+    # Ein Keyset direkt auf (Wert, id) müsste pro Seite die ganze Mediathek
+    # sortieren: metadata_items hat keinen Index über (Mediathek, Typ, Spalte),
+    # und die DB ist nur lesend geöffnet. Deshalb wird die Reihenfolge einmal je
+    # Sortierung als (pos, id) in einer TEMP-Tabelle der Verbindung abgelegt
+    # (nur Zahlen, außerhalb des Python-Speichers). Jede Seite ist dann ein
+    # Keyset-Zugriff "pos > Schlüssel" über deren Primärschlüssel und kostet
+    # unabhängig von der Position dasselbe.
+    def __init__(self, conn: sqlite3.Connection, library_id: int, metadata_type: int):
+        self.conn = conn
+        self.params = library_params(library_id, metadata_type)
+        self.sort = None
+        self.descending = False
+        self.total = 0
+
+    def sort_by(self, sort: str = "title", descending: bool = False) -> int:
+        # Baut die Reihenfolge neu auf; darf im Hintergrund laufen, solange
+        # die Verbindung währenddessen nicht anderweitig benutzt wird
+        if sort not in BROWSER_SORT_KEYS:
+            raise ValueError(f"Unbekannte Sortierung: {sort}")
+        direction = "DESC" if descending else "ASC"
+        with TimingSpan("query", step="browse_order", sort=sort) as span:
+            self.conn.execute("DROP TABLE IF EXISTS temp.browse_order")
+            self.conn.execute(
+                "CREATE TEMP TABLE browse_order (pos INTEGER PRIMARY KEY, id INTEGER NOT NULL)"
+            )
+            # pos wird in Einfügereihenfolge vergeben, also gemäß ORDER BY
+            self.conn.execute(
+                f"""
+                INSERT INTO temp.browse_order (id)
+                SELECT mi.id FROM metadata_items mi
+                WHERE mi.library_section_id = :library_id
+                  AND mi.metadata_type = :metadata_type
+                ORDER BY {BROWSER_SORT_KEYS[sort]} {direction}, mi.id {direction}
+                """,
+                self.params,
+            )
+            self.total = self.conn.execute(
+                "SELECT COALESCE(MAX(pos), 0) FROM temp.browse_order"
+            ).fetchone()[0]
+            span.rows = self.total
+        self.sort = sort
+        self.descending = descending
+        return self.total
+
+    def _fetch(self, condition: str, order: str, key: int, limit: int) -> List[tuple]:
+        # Liefert Zeilen (pos, id, title, ...), pos ist der Schlüssel der Zeile
+        columns = ", ".join(f"mi.{c}" for c in BROWSER_COLUMNS)
+        with TimingSpan("query", step="browse_page", sort=self.sort) as span:
+            rows = self.conn.execute(
+                f"""
+                SELECT b.pos, {columns}
+                FROM temp.browse_order b
+                JOIN metadata_items mi ON mi.id = b.id
+                WHERE b.pos {condition} ?
+                ORDER BY b.pos {order}
+                LIMIT ?
+                """,
+                (int(key), int(limit)),
+            ).fetchall()
+            span.rows = len(rows)
+        return rows
+
+    def page_after(self, key: int = 0, limit: int = BROWSER_PAGE_SIZE) -> List[tuple]:
+        # Die nächsten `limit` Zeilen hinter Schlüssel key (0 = ab Anfang)
+        return self._fetch(">", "ASC", key, limit)
+
+    def page_before(self, key: int, limit: int = BROWSER_PAGE_SIZE) -> List[tuple]:
+        # Die `limit` Zeilen vor Schlüssel key, in Anzeige-Reihenfolge
+        return self._fetch("<", "DESC", key, limit)[::-1]
+
+    def page_at(self, position: int, limit: int = BROWSER_PAGE_SIZE) -> List[tuple]:
+        # Sprung per Scrollbalken: Zeilen ab Position (0-basiert)
+        position = max(0, min(int(position), self.total - limit))
+        return self.page_after(position, limit)
+
+
+def format_browser_row(row: tuple) -> tuple:
+    # Anzeige wie im Excel-Export (Dauer HH:MM, Datum deutsch, Rating mit Komma);
+    # erwartet Zeilen aus KeysetPager, also mit pos an erster Stelle
+    values = dict(zip(BROWSER_COLUMNS, row[1:]))
+    rating = values["audience_rating"]
+    return (
+        values["id"],
+        values["title"] or "",
+        values["year"] or "",
+        unix_to_datetime_str(values["added_at"]) if values["added_at"] is not None else "",
+        convert_ms_to_hhmm(values["duration"]) if values["duration"] is not None else "",
+        f"{rating:.1f}".replace(".", ",") if rating is not None else "",
+        values["studio"] or "",
+    )
+
+
+# ---------------------------------------------------------------------------
+# Statistik-Engine (alle Mediatheken in einem SQL-Durchlauf)
+# ---------------------------------------------------------------------------
+METADATA_TYPE_NAMES = {
+    1: "Film",
+    2: "Serie",
+    3: "Staffel",
+    4: "Episode",
+    8: "Interpret",
+    9: "Album",
+    10: "Titel",
+    12: "Clip",
+    13: "Foto",
+}
+
+
+def get_library_statistics(conn: sqlite3.Connection):
+    # Ein gruppierter Durchlauf über metadata_items je Mediathek, Typ und
+    # Tag (Ganzzahl-Division ist deutlich billiger als strftime pro Zeile);
+    # Monate und Summen je Mediathek/Typ werden daraus in pandas gebildet.
+    # Ein Rating von 0 zählt wie im Detail-Export als "kein Rating";
+    # Einträge ohne Zeile in library_sections bleiben erhalten.
+    # Liefert (summary, monthly).
+    logger.debug("Berechne Statistik für alle Mediatheken.")
+    query = """
+    SELECT
+        mi.library_section_id,
+        COALESCE(ls.name, '(ohne Mediathek)') AS library_name,
+        mi.metadata_type,
+        CAST(mi.added_at / 86400 AS INTEGER) AS added_day,
+        COUNT(*) AS count,
+        SUM(CAST(mi.duration as INTEGER)) AS total_duration,
+        SUM(NULLIF(mi.audience_rating, 0)) AS rating_sum,
+        COUNT(NULLIF(mi.audience_rating, 0)) AS rating_count
+    FROM metadata_items mi
+    LEFT JOIN library_sections ls ON ls.id = mi.library_section_id
+    GROUP BY mi.library_section_id, mi.metadata_type, added_day
+    """
+    with TimingSpan("query", step="statistics") as span:
+        daily = pd.read_sql_query(query, conn)
+        span.rows = len(daily)
+    keys = ["library_section_id", "library_name", "metadata_type"]
+    summary = (
+        daily.groupby(keys, as_index=False, dropna=False)[
+            ["count", "total_duration", "rating_sum", "rating_count"]
+        ]
+        .sum(min_count=1)
+        .astype({"count": "int64"})
+    )
+    summary["total_duration"] = summary["total_duration"].fillna(0)
+    summary["avg_duration"] = summary["total_duration"] / summary["count"]
+    summary["avg_rating"] = summary["rating_sum"] / summary["rating_count"].where(
+        summary["rating_count"] > 0
+    )
+    summary = summary.drop(columns=["rating_sum", "rating_count"])
+
+    days = pd.to_numeric(daily["added_day"], errors="coerce")
+    daily["month"] = pd.to_datetime(days * 86400, unit="s", errors="coerce").dt.strftime(
+        "%Y-%m"
+    )
+    monthly = (
+        daily.dropna(subset=["month"])
+        .groupby(keys + ["month"], as_index=False, dropna=False)["count"]
+        .sum()
+    )
+    return summary, monthly
+
+
+def format_stats_text(
+    lib_name: str, count: int, total_duration: float, avg_rating: Optional[float]
+) -> str:
+    avg_duration = total_duration / count if count > 0 else 0
+    avg_duration_str = convert_ms_to_hhmm(avg_duration) if avg_duration > 0 else ""
+    total_h, total_m = divmod((total_duration // 1000) // 60, 60)
+    stats_text = f"Mediathek: {lib_name}\n"
+    stats_text += f"Anzahl Inhalte: {count}\n"
+    stats_text += f"Gesamtdauer: {int(total_h)}h {int(total_m)}m\n"
+    stats_text += f"Durchschnittliche Dauer: {avg_duration_str}\n"
+    if avg_rating is not None and pd.notnull(avg_rating):
+        stats_text += f"Durchschnittliches Rating: {avg_rating:.2f}\n"
+    return stats_text
+
+
+# ---------------------------------------------------------------------------
+# Serien-Rollup (Episode -> Staffel -> Serie)
+# ---------------------------------------------------------------------------
+PLEX_TYPE_EPISODE = 4
+
+# Sammelgruppen für Episoden ohne vorhandene Staffel bzw. Serie
+ORPHAN_SEASON_TITLE = "(ohne Staffel)"
+ORPHAN_SHOW_TITLE = "(ohne Serie)"
+
+# Ein Durchlauf über die Episoden der Mediathek; Staffel und Serie kommen
+# per Primärschlüssel über parent_id dazu (Episode -> Staffel -> Serie).
+# Episoden, deren Staffel fehlt, bilden zusammen eine Gruppe (se.id NULL).
+SEASON_ROLLUP_QUERY = """
+    SELECT
+        sh.id AS show_id,
+        sh.title AS show_title,
+        se.id AS season_id,
+        se."index" AS season_index,
+        se.title AS season_title,
+        COUNT(*) AS episodes,
+        SUM(CAST(ep.duration AS INTEGER)) AS total_duration,
+        MAX(ep.added_at) AS last_added
+    FROM metadata_items ep
+    LEFT JOIN metadata_items se ON se.id = ep.parent_id
+    LEFT JOIN metadata_items sh ON sh.id = se.parent_id
+    WHERE ep.library_section_id = :library_id
+      AND ep.metadata_type = 4
+    GROUP BY se.id
+    """
+
+SEASON_COLUMNS = [
+    "show_id",
+    "show_title",
+    "season_id",
+    "season_index",
+    "season_title",
+    "episodes",
+    "total_duration",
+    "last_added",
+]
+
+
+def label_orphans(seasons: pd.DataFrame) -> pd.DataFrame:
+    seasons["season_title"] = seasons["season_title"].mask(
+        seasons["season_id"].isna(), ORPHAN_SEASON_TITLE
+    )
+    seasons["show_title"] = seasons["show_title"].mask(
+        seasons["show_id"].isna(), ORPHAN_SHOW_TITLE
+    )
+    return seasons
+
+
+def rollup_shows(seasons: pd.DataFrame) -> pd.DataFrame:
+    # Verdichtet die Staffel-Summen je Serie
+    shows = (
+        seasons.groupby(["show_id", "show_title"], as_index=False, dropna=False)
+        .agg(
+            seasons=("season_id", "count"),
+            episodes=("episodes", "sum"),
+            total_duration=("total_duration", "sum"),
+            last_added=("last_added", "max"),
+        )
+        .sort_values(["show_title", "show_id"], kind="stable")
+        .reset_index(drop=True)
+    )
+    return shows
+
+
+def get_series_rollup(conn: sqlite3.Connection, library_id: int):
+    # Liefert (shows, seasons) mit Episodenzahl, Gesamtdauer (ms) und zuletzt
+    # hinzugefügter Episode (Unix-Zeit)
+    logger.debug(f"Berechne Serien-Rollup für Mediathek-ID {library_id}")
+    with TimingSpan("query", step="series_rollup", library=library_id) as span:
+        seasons = pd.read_sql_query(
+            SEASON_ROLLUP_QUERY, conn, params={"library_id": int(library_id)}
+        )
+        span.rows = len(seasons)
+    seasons = label_orphans(seasons).sort_values(
+        ["show_title", "season_index"], kind="stable"
+    ).reset_index(drop=True)
+    return rollup_shows(seasons), seasons
+
+
+def get_series_rollup_live(
+    client: PlexHttpClient, library_id: int, progress: Optional[Callable] = None
+):
+    # Alle Episoden der Section in parallel geladenen Seiten (statt einer
+    # Anfrage je Serie oder Staffel), dann dieselbe Verdichtung wie lokal
+    rows = client.fetch_section_items(
+        library_id,
+        PLEX_TYPE_EPISODE,
+        progress,
+        plex_type=PLEX_TYPE_EPISODE,
+        parse=parse_live_episodes,
+    )
+    episodes = pd.DataFrame.from_records(
+        rows,
+        columns=[
+            "id",
+            "show_id",
+            "show_title",
+            "season_id",
+            "season_index",
+            "season_title",
+            "duration",
+            "added_at",
+        ],
+    )
+    seasons = label_orphans(
+        episodes.groupby("season_id", as_index=False, sort=False, dropna=False)
+        .agg(
+            show_id=("show_id", "first"),
+            show_title=("show_title", "first"),
+            season_index=("season_index", "first"),
+            season_title=("season_title", "first"),
+            episodes=("id", "count"),
+            total_duration=("duration", "sum"),
+            last_added=("added_at", "max"),
+        )[SEASON_COLUMNS]
+    )
+    seasons = seasons.sort_values(["show_title", "season_index"], kind="stable").reset_index(
+        drop=True
+    )
+    return rollup_shows(seasons), seasons
+
+
+def format_series_rollup(shows: pd.DataFrame, seasons: pd.DataFrame):
+    # Für den Export: Dauern als HH:MM, Datum deutsch, Ø Dauer je Episode
+    def fmt(df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        avg = df["total_duration"] / df["episodes"].where(df["episodes"] > 0)
+        df["avg_duration"] = format_duration_hhmm(avg)
+        df["total_duration"] = format_duration_hhmm(df["total_duration"])
+        df["last_added"] = format_datetime_de(df["last_added"])
+        return df
+
+    return fmt(shows), fmt(seasons)
+
+
+def format_series_stats_text(
+    lib_name: str, shows: pd.DataFrame, seasons: pd.DataFrame
+) -> str:
+    episodes = int(shows["episodes"].sum())
+    total_duration = shows["total_duration"].sum()
+    avg_duration = total_duration / episodes if episodes else 0
+    total_h, total_m = divmod(int(total_duration // 1000) // 60, 60)
+    stats_text = f"Mediathek: {lib_name}\n"
+    stats_text += f"Serien: {len(shows)}\n"
+    stats_text += f"Staffeln: {len(seasons)}\n"
+    stats_text += f"Episoden: {episodes}\n"
+    stats_text += f"Gesamtdauer: {total_h}h {total_m}m\n"
+    if avg_duration > 0:
+        stats_text += f"Durchschnittliche Episodendauer: {convert_ms_to_hhmm(avg_duration)}\n"
+    if shows["last_added"].notna().any():
+        latest = shows.loc[shows["last_added"].idxmax()]
+        stats_text += (
+            f"Zuletzt hinzugefügt: {format_datetime_de(pd.Series([latest['last_added']])).iloc[0]}"
+            f" ({latest['show_title']})\n"
+        )
+    return stats_text
+
+
+# ---------------------------------------------------------------------------
+# Speicher-Analyse (media_items / media_parts)
+# ---------------------------------------------------------------------------
+STORAGE_TABLES = ("media_items", "media_parts")
+STORAGE_TOP_FILES = 100
+# Ausreißer: Bitrate weicht um mehr als so viele Standardabweichungen vom
+# Mittel ihrer Auflösung ab
+STORAGE_OUTLIER_SIGMA = 3
+
+# Auflösungsklasse über Breite oder Höhe (Kinoformate sind bei voller
+# Breite niedriger als 16:9)
+STORAGE_RESOLUTION_EXPR = """CASE
+            WHEN mi.width >= 3200 OR mi.height >= 1800 THEN '4K'
+            WHEN mi.width >= 1700 OR mi.height >= 1000 THEN '1080p'
+            WHEN mi.width >= 1200 OR mi.height >= 700 THEN '720p'
+            WHEN mi.width > 0 THEN 'SD'
+            ELSE 'unbekannt'
+        END"""
+
+# Alle Abfragen laufen über die Dateien (media_parts) der Mediathek; die
+# Version (media_items) liefert Auflösung, Codecs und Bitrate (kbit/s)
+STORAGE_PARTS_FILTER = """
+    WHERE mi.library_section_id = :library_id
+      AND mi.deleted_at IS NULL
+      AND mp.deleted_at IS NULL"""
+
+STORAGE_GROUP_QUERY = f"""
+    SELECT
+        {STORAGE_RESOLUTION_EXPR} AS resolution,
+        COALESCE(mi.video_codec, 'unbekannt') AS video_codec,
+        COUNT(*) AS files,
+        SUM(mp.size) AS total_bytes,
+        SUM(CAST(mp.duration AS INTEGER)) AS total_duration,
+        AVG(NULLIF(mi.bitrate, 0)) AS avg_bitrate
+    FROM media_parts mp
+    JOIN media_items mi ON mi.id = mp.media_item_id
+    {STORAGE_PARTS_FILTER}
+    GROUP BY resolution, video_codec
+    """
+
+STORAGE_FILE_COLUMNS = f"""
+        md.title,
+        md.year,
+        {STORAGE_RESOLUTION_EXPR} AS resolution,
+        mi.width,
+        mi.height,
+        mi.video_codec,
+        mi.audio_codec,
+        mi.container,
+        mi.bitrate,
+        mp.size,
+        mp.duration,
+        mp.file"""
+
+# Mit LIMIT hält SQLite beim Sortieren nur die größten N Zeilen vor
+STORAGE_LARGEST_QUERY = f"""
+    SELECT {STORAGE_FILE_COLUMNS}
+    FROM media_parts mp
+    JOIN media_items mi ON mi.id = mp.media_item_id
+    JOIN metadata_items md ON md.id = mi.metadata_item_id
+    {STORAGE_PARTS_FILTER}
+    ORDER BY mp.size DESC
+    LIMIT :limit
+    """
+
+# Mittel und Varianz der Bitrate je Auflösung aus einem gruppierten
+# Durchlauf, danach ein zweiter Durchlauf gegen diese wenigen Zeilen.
+# Ohne Wurzelfunktion: (b - Mittel)^2 > k^2 * Varianz, sortiert nach z^2.
+STORAGE_OUTLIER_QUERY = f"""
+    WITH stats AS (
+        SELECT
+            {STORAGE_RESOLUTION_EXPR} AS resolution,
+            AVG(mi.bitrate) AS mean,
+            AVG(CAST(mi.bitrate AS REAL) * mi.bitrate)
+                - AVG(mi.bitrate) * AVG(mi.bitrate) AS var
+        FROM media_parts mp
+        JOIN media_items mi ON mi.id = mp.media_item_id
+        {STORAGE_PARTS_FILTER}
+          AND mi.bitrate > 0
+        GROUP BY resolution
+    )
+    SELECT {STORAGE_FILE_COLUMNS},
+        s.mean AS resolution_avg_bitrate,
+        (mi.bitrate - s.mean) * (mi.bitrate - s.mean) / s.var AS z2
+    FROM media_parts mp
+    JOIN media_items mi ON mi.id = mp.media_item_id
+    JOIN metadata_items md ON md.id = mi.metadata_item_id
+    JOIN stats s ON s.resolution = {STORAGE_RESOLUTION_EXPR}
+    {STORAGE_PARTS_FILTER}
+      AND mi.bitrate > 0
+      AND s.var > 0
+      AND (mi.bitrate - s.mean) * (mi.bitrate - s.mean) > :sigma2 * s.var
+    ORDER BY z2 DESC
+    LIMIT :limit
+    """
+
+
+def has_storage_tables(conn: sqlite3.Connection) -> bool:
+    return set(STORAGE_TABLES) <= set(list_tables(conn))
+
+
+def _storage_rollup(groups: pd.DataFrame, key: str, total_bytes: float) -> pd.DataFrame:
+    # Verdichtet die Gruppen (Auflösung x Codec) auf eine Dimension; die
+    # mittlere Bitrate wird mit der Dateianzahl gewichtet
+    df = groups.assign(bitrate_weight=groups["avg_bitrate"] * groups["files"])
+    df = (
+        df.groupby(key, as_index=False)[
+            ["files", "total_bytes", "total_duration", "bitrate_weight"]
+        ]
+        .sum(min_count=1)
+        .sort_values("total_bytes", ascending=False)
+        .reset_index(drop=True)
+    )
+    df["avg_bitrate"] = df.pop("bitrate_weight") / df["files"]
+    df["share"] = df["total_bytes"] / total_bytes if total_bytes else np.nan
+    return df
+
+
+def get_storage_report(
+    conn: sqlite3.Connection,
+    library_id: int,
+    top_files: int = STORAGE_TOP_FILES,
+    sigma: float = STORAGE_OUTLIER_SIGMA,
+    progress: Optional[Callable] = None,
+) -> dict:
+    # Gruppierte Summen laufen komplett in SQLite; nach pandas kommen nur die
+    # wenigen Gruppen und die Top-N-Listen
+    logger.debug(f"Berechne Speicher-Analyse für Mediathek-ID {library_id}")
+    params = {"library_id": int(library_id)}
+    if progress:
+        progress(0, "Summen je Auflösung/Codec ...")
+    with TimingSpan("query", step="storage_groups", library=library_id) as span:
+        groups = pd.read_sql_query(STORAGE_GROUP_QUERY, conn, params=params)
+        span.rows = len(groups)
+    groups = groups.sort_values("total_bytes", ascending=False).reset_index(drop=True)
+    total_bytes = groups["total_bytes"].sum()
+    groups["share"] = groups["total_bytes"] / total_bytes if total_bytes else np.nan
+    if progress:
+        progress(40, "Größte Dateien ...")
+    with TimingSpan("query", step="storage_largest", library=library_id):
+        largest = pd.read_sql_query(
+            STORAGE_LARGEST_QUERY, conn, params={**params, "limit": int(top_files)}
+        )
+    if progress:
+        progress(60, "Bitrate-Ausreißer ...")
+    with TimingSpan("query", step="storage_outliers", library=library_id):
+        outliers = pd.read_sql_query(
+            STORAGE_OUTLIER_QUERY,
+            conn,
+            params={**params, "limit": int(top_files), "sigma2": float(sigma) ** 2},
+        )
+    outliers["sigma"] = np.sqrt(outliers.pop("z2")) * np.sign(
+        outliers["bitrate"] - outliers["resolution_avg_bitrate"]
+    )
+    if progress:
+        progress(100, "Speicher-Analyse fertig")
+    return {
+        "files": int(groups["files"].sum()),
+        "total_bytes": int(total_bytes),
+        "total_duration": groups["total_duration"].sum(),
+        "groups": groups,
+        "by_resolution": _storage_rollup(groups, "resolution", total_bytes),
+        "by_codec": _storage_rollup(groups, "video_codec", total_bytes),
+        "largest": largest,
+        "outliers": outliers,
+    }
+
+
+def format_bytes(num: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(num) < 1024:
+            return f"{num:.1f} {unit}".replace(".", ",")
+        num /= 1024
+    return f"{num:.2f} TB".replace(".", ",")
+
+
+def format_storage_sheets(report: dict) -> dict:
+    # Blätter für den Export: Bytes bleiben als Zahl erhalten (zum Rechnen),
+    # daneben GB, Anteil in Prozent und Dauer als HH:MM
+    def fmt(df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        bytes_col = "total_bytes" if "total_bytes" in df else "size"
+        df.insert(
+            df.columns.get_loc(bytes_col) + 1, "size_gb", (df[bytes_col] / 1024**3).round(2)
+        )
+        for col in ("total_duration", "duration"):
+            if col in df:
+                df[col] = format_duration_hhmm(df[col])
+        if "share" in df:
+            df["share"] = (df["share"] * 100).round(1)
+        for col in ("avg_bitrate", "resolution_avg_bitrate", "sigma"):
+            if col in df:
+                df[col] = df[col].round(1)
+        return df
+
+    return {
+        "Aufloesung": fmt(report["by_resolution"]),
+        "Codecs": fmt(report["by_codec"]),
+        "Aufloesung_Codec": fmt(report["groups"]),
+        "Groesste Dateien": fmt(report["largest"]),
+        "Bitrate-Ausreisser": fmt(report["outliers"]),
+    }
+
+
+def format_storage_text(lib_name: str, report: dict) -> str:
+    total_h, total_m = divmod(int(report["total_duration"] or 0) // 60000, 60)
+    stats_text = f"Speicher-Analyse: {lib_name}\n"
+    stats_text += f"Dateien: {report['files']}\n"
+    stats_text += f"Gesamtgröße: {format_bytes(report['total_bytes'])}\n"
+    stats_text += f"Gesamtdauer: {total_h}h {total_m}m\n"
+    for _, row in report["by_resolution"].iterrows():
+        share = f"{row['share'] * 100:.1f}".replace(".", ",")
+        stats_text += (
+            f"  {row['resolution']}: {int(row['files'])} Dateien, "
+            f"{format_bytes(row['total_bytes'] or 0)} ({share} %)\n"
+        )
+    stats_text += f"Bitrate-Ausreißer: {len(report['outliers'])}\n"
+    return stats_text
+
+
+# ---------------------------------------------------------------------------
+# Volltextsuche (FTS5-Nebenindex über Titel, Inhalt und Tags)
+# ---------------------------------------------------------------------------
+SEARCH_INDEX_FILE = os.path.join(BASE_DIR, "search_index.db")
+# Staffeln (3) haben nur Titel wie "Staffel 1" und bleiben außen vor
+SEARCH_METADATA_TYPES = (1, 2, 4, 8, 9, 10)
+SEARCH_RESULT_LIMIT = 200
+# Bis zu dieser Trefferzahl wird nach Relevanz sortiert
+SEARCH_RANK_MAX_HITS = 10000
+SEARCH_BATCH_SIZE = 5000
+# Gewichte für bm25 in Spaltenreihenfolge title, summary, tags
+SEARCH_RANK = "bm25(10.0, 1.0, 3.0)"
+
+# Tags je Eintrag als Text, vorab in eine TEMP-Tabelle mit item_id als
+# Primärschlüssel; der Join darauf ist damit unabhängig vom Abfrageplaner
+# immer ein Schlüsselzugriff
+SEARCH_TAGS_QUERY = f"""
+    INSERT INTO temp.search_tags (item_id, tags)
+    SELECT tg.metadata_item_id, GROUP_CONCAT(t.tag, ' ')
+    FROM tags t
+    CROSS JOIN taggings tg ON tg.tag_id = t.id
+    WHERE t.tag_type IN ({", ".join(str(t) for t in EXPORT_TAG_TYPES)})
+    GROUP BY tg.metadata_item_id
+    """
+
+SEARCH_SOURCE_QUERY = f"""
+    SELECT
+        mi.id,
+        mi.library_section_id,
+        ls.name,
+        mi.metadata_type,
+        mi.title,
+        mi.year,
+        mi.summary,
+        st.tags
+    FROM metadata_items mi
+    LEFT JOIN library_sections ls ON ls.id = mi.library_section_id
+    LEFT JOIN temp.search_tags st ON st.item_id = mi.id
+    WHERE mi.library_section_id IS NOT NULL
+      AND mi.metadata_type IN ({", ".join(str(t) for t in SEARCH_METADATA_TYPES)})
+      AND mi.title IS NOT NULL AND mi.title != ''
+    """
+
+
+def source_fingerprint(db_path: str) -> str:
+    # Größe und Änderungszeit der DB (samt WAL, falls vorhanden); ändert sich
+    # einer der Werte, wird der Index neu aufgebaut
+    parts = [os.path.abspath(db_path)]
+    for path in (db_path, db_path + "-wal"):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            parts.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+    return "|".join(parts)
+
+
+def search_index_current(db_path: str, index_path: str = SEARCH_INDEX_FILE) -> bool:
+    if not os.path.exists(index_path):
+        return False
+    try:
+        conn = sqlite3.connect(index_path)
+        try:
+            row = conn.execute(
+                "SELECT value FROM search_meta WHERE key = 'source'"
+            ).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+    return row is not None and row[0] == source_fingerprint(db_path)
+
+
+def build_search_index(
+    db_path: str,
+    index_path: str = SEARCH_INDEX_FILE,
+    progress: Optional[Callable] = None,
+) -> bool:
+    # Baut den Index in eine temporäre Datei und ersetzt den alten erst danach;
+    # laufende Suchen sehen so immer einen vollständigen Index. Liefert False,
+    # wenn der vorhandene Index noch zur DB passt.
+    if search_index_current(db_path, index_path):
+        logger.info("Suchindex ist aktuell.")
+        return False
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    fingerprint = source_fingerprint(db_path)
+    tmp_path = index_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    logger.info(f"Baue Suchindex für {db_path} ...")
+    src = open_db(db_path)
+    dst = sqlite3.connect(tmp_path)
+    try:
+        # Inhaltslose FTS5-Tabelle (content=''): nur der invertierte Index,
+        # Anzeigewerte liegen in search_items unter derselben rowid
+        dst.executescript(
+            f"""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE search_meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE search_items (
+                id INTEGER PRIMARY KEY,
+                library_section_id INTEGER,
+                library_name TEXT,
+                metadata_type INTEGER,
+                title TEXT,
+                year INTEGER
+            );
+            CREATE VIRTUAL TABLE search_fts USING fts5(
+                title, summary, tags,
+                content = '',
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            );
+            INSERT INTO search_fts (search_fts, rank) VALUES ('rank', '{SEARCH_RANK}');
+            INSERT INTO search_fts (search_fts, rank) VALUES ('automerge', 0);
+            """
+        )
+        total = src.execute(
+            f"""
+            SELECT COUNT(*) FROM metadata_items
+            WHERE library_section_id IS NOT NULL
+              AND metadata_type IN ({", ".join(str(t) for t in SEARCH_METADATA_TYPES)})
+            """
+        ).fetchone()[0]
+        done = 0
+        with TimingSpan("query", step="search_index") as span:
+            src.execute(
+                "CREATE TEMP TABLE search_tags (item_id INTEGER PRIMARY KEY, tags TEXT)"
+            )
+            src.execute(SEARCH_TAGS_QUERY)
+            cursor = src.execute(SEARCH_SOURCE_QUERY)
+            while True:
+                rows = cursor.fetchmany(SEARCH_BATCH_SIZE)
+                if not rows:
+                    break
+                dst.executemany(
+                    "INSERT INTO search_items VALUES (?, ?, ?, ?, ?, ?)",
+                    (row[:6] for row in rows),
+                )
+                dst.executemany(
+                    "INSERT INTO search_fts (rowid, title, summary, tags) VALUES (?, ?, ?, ?)",
+                    ((row[0], row[4], row[6], row[7]) for row in rows),
+                )
+                done += len(rows)
+                if progress and total:
+                    progress(min(95, 95 * done / total), f"Suchindex: {done:,} Einträge".replace(",", "."))
+            span.rows = done
+            # Beim Einfügen wird nicht laufend zusammengeführt (automerge 0),
+            # sondern einmal am Ende: ein b-tree je Suchbegriff
+            dst.execute("INSERT INTO search_fts (search_fts) VALUES ('optimize')")
+            dst.executemany(
+                "INSERT INTO search_meta VALUES (?, ?)",
+                [
+                    ("source", fingerprint),
+                    ("items", str(done)),
+                    ("built_at", datetime.datetime.now().isoformat(timespec="seconds")),
+                ],
+            )
+            dst.commit()
+    except BaseException:
+        dst.close()
+        os.remove(tmp_path)
+        raise
+    finally:
+        src.close()
+    dst.close()
+    os.replace(tmp_path, index_path)
+    logger.info(f"Suchindex gebaut: {done} Einträge in {index_path}")
+    if progress:
+        progress(100, "Suchindex fertig")
+    return True
+
+
+def make_search_query(text: str) -> str:
+    # Freitext in eine FTS5-Abfrage übersetzen: alle Wörter müssen vorkommen,
+    # ab zwei Zeichen auch als Wortanfang. Einzelne Zeichen als Präfix würden
+    # auf einen Großteil des Wortschatzes passen. Jedes Wort wird in
+    # Anführungszeichen gesetzt, damit Eingaben wie "AND", "-" oder ":" keine
+    # FTS5-Syntax auslösen.
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{w}"*' if len(w) > 1 else f'"{w}"' for w in words)
+
+
+def search_catalogue(
+    text: str,
+    index_path: str = SEARCH_INDEX_FILE,
+    limit: int = SEARCH_RESULT_LIMIT,
+) -> tuple:
+    # Treffer über alle Mediatheken. Liefert (Anzahl Treffer, Zeilen) mit
+    # Zeilen (id, Mediathek-ID, Mediathek, metadata_type, Titel, Jahr).
+    query = make_search_query(text)
+    if not query:
+        return 0, []
+    conn = sqlite3.connect(index_path)
+    try:
+        with TimingSpan("query", step="search") as span:
+            total = conn.execute(
+                "SELECT COUNT(*) FROM search_fts WHERE search_fts MATCH ?", (query,)
+            ).fetchone()[0]
+            # bm25 bewertet jeden Treffer einzeln (ca. 2 µs je Treffer); bei
+            # sehr allgemeinen Suchbegriffen stattdessen die neuesten zuerst
+            order = "rank" if total <= SEARCH_RANK_MAX_HITS else "rowid DESC"
+            rows = conn.execute(
+                f"""
+                SELECT i.id, i.library_section_id, i.library_name, i.metadata_type, i.title, i.year
+                FROM (
+                    SELECT rowid, rank FROM search_fts
+                    WHERE search_fts MATCH ?
+                    ORDER BY {order}
+                    LIMIT ?
+                ) hits
+                JOIN search_items i ON i.id = hits.rowid
+                ORDER BY hits.{order}
+                """,
+                (query, int(limit)),
+            ).fetchall()
+            span.rows = len(rows)
+    finally:
+        conn.close()
+    return total, rows
+
+
+# ---------------------------------------------------------------------------
+# Funktionen für Live-Bibliothek
+# ---------------------------------------------------------------------------
+LIVE_DETAIL_COLUMNS = DETAIL_COLUMNS
+
+
+def load_library_details_live(
+    client: PlexHttpClient,
+    library_id: int,
+    metadata_type: int,
+    progress: Optional[Callable] = None,
+) -> LibraryDetails:
+    # Typisierte Rohdaten wie load_library_details; Formatierung erfolgt gemeinsam
+    logger.debug(
+        f"Lade Live-Details für Mediathek-ID {library_id}, Typ {metadata_type}"
+    )
+    rows = client.fetch_section_items(library_id, metadata_type, progress)
+    if not rows:
+        logger.warning("Keine Einträge in der Live-Mediathek gefunden.")
+        return details_from_frame(pd.DataFrame())
+    df = pd.DataFrame.from_records(rows, columns=LIVE_DETAIL_COLUMNS)
+    del rows
+    df["duration"] = pd.to_numeric(df["duration"], errors="coerce")
+    df["added_at"] = pd.to_datetime(df["added_at"], errors="coerce")
+    df["audience_rating"] = pd.to_numeric(df["audience_rating"], errors="coerce")
+    return details_from_frame(df)
+
+
+def get_library_details_live(
+    client: PlexHttpClient,
+    library_id: int,
+    metadata_type: int,
+    progress: Optional[Callable] = None,
+) -> pd.DataFrame:
+    details = load_library_details_live(client, library_id, metadata_type, progress)
+    with TimingSpan("format", rows=len(details)):
+        return format_library_details(details.to_frame())
+
+
+# ---------------------------------------------------------------------------
+# Gesamtkatalog mehrerer Plex-Server
+# ---------------------------------------------------------------------------
+# Mediathekstyp je metadata_type (Serien wie im Live-Export als Shows)
+SECTION_TYPES = {1: "movie", 4: "show"}
+MULTI_SERVER_MAX_WORKERS = 4
+# guid statt der je Server vergebenen id, dazu die Herkunft je Eintrag
+CATALOGUE_COLUMNS = ["guid"] + DETAIL_COLUMNS[1:] + ["servers", "server_count", "sources"]
+
+
+def parse_server_list(text: str) -> List[tuple]:
+    # Eine Zeile je Server: "URL Token [Name]"; leere Zeilen und # werden übersprungen
+    servers = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split(None, 2)
+        if len(parts) < 2:
+            raise ValueError(f"Zeile {number}: URL und Token erwartet")
+        servers.append((parts[0], parts[1], parts[2] if len(parts) > 2 else None))
+    return servers
+
+
+def catalogue_keys(guids: pd.Series, sources: pd.Series) -> pd.Series:
+    # Abgleich über die guid ohne "?lang=..." der alten Agenten. Einträge mit
+    # local://- oder ohne guid gibt es nur einmal: Schlüssel ist ihre Fundstelle.
+    keys = guids.fillna("").astype(str).str.split("?", n=1).str[0]
+    local = (keys == "") | keys.str.startswith("local://")
+    return keys.where(~local, "#" + sources)
+
+
+def fetch_server_catalogue(
+    client: PlexHttpClient,
+    name: str,
+    metadata_type: int,
+    progress: Optional[Callable] = None,
+) -> pd.DataFrame:
+    # Alle Mediatheken des passenden Typs eines Servers, gleichzeitig
+    # geladen; die Seiten jeder Mediathek lädt fetch_section_items parallel.
+    # Wie viele Anfragen insgesamt laufen, begrenzt der Verbindungspool des
+    # Clients (max_workers je Server).
+    sections = [
+        (section.get("key"), section.get("title"))
+        for section in client.sections()
+        if section.get("type") == SECTION_TYPES[metadata_type]
+    ]
+    job = current_timing_job()
+    percents = [0.0] * len(sections)
+    lock = threading.Lock()
+
+    def fetch(index: int, key: str, title: str) -> List[dict]:
+        set_timing_job(job)
+
+        def report(percent: float, message: str = None):
+            with lock:
+                percents[index] = percent
+                total = sum(percents) / len(percents)
+            if progress:
+                progress(total, f"{title}: {message}" if message else None)
+
+        rows = client.fetch_section_items(key, metadata_type, report)
+        logger.info(f"{name}: Mediathek {key} - {title}: {len(rows)} Einträge")
+        return rows
+
+    frames = {}
+    if sections:
+        with ThreadPoolExecutor(max_workers=min(len(sections), client.max_workers)) as pool:
+            futures = {
+                pool.submit(fetch, index, key, title): (index, key)
+                for index, (key, title) in enumerate(sections)
+            }
+            try:
+                for future in as_completed(futures):
+                    index, key = futures[future]
+                    rows = future.result()
+                    if rows:
+                        df = pd.DataFrame.from_records(rows, columns=DETAIL_COLUMNS + ["guid"])
+                        df["source"] = f"{name}:{key}/" + df["id"].astype(str)
+                        frames[index] = df
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    if not frames:
+        return pd.DataFrame(columns=DETAIL_COLUMNS + ["guid", "source"])
+    # Reihenfolge der Mediatheken wie auf dem Server
+    df = pd.concat([frames[index] for index in sorted(frames)], ignore_index=True)
+    df["server"] = name
+    df["key"] = catalogue_keys(df["guid"], df["source"])
+    return df
+
+
+def merge_catalogues(frames: List[pd.DataFrame], names: List[str]) -> pd.DataFrame:
+    # Ein Eintrag je Schlüssel; die Felder kommen vom ersten Server in der
+    # Liste, der ihn hat. servers/sources nennen alle Fundstellen ("|"-getrennt).
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame(columns=CATALOGUE_COLUMNS)
+    df = pd.concat(frames, ignore_index=True)
+    merged = df.drop_duplicates("key").set_index("key")
+    servers = pd.Series("", index=merged.index, dtype=object)
+    sources = pd.Series("", index=merged.index, dtype=object)
+    count = pd.Series(0, index=merged.index, dtype="int64")
+    # Wenige Server: je Server eine vektorisierte Spalte statt join je Gruppe
+    for name in names:
+        rows = df[df["server"] == name]
+        # Mehrfach auf einem Server (z. B. in zwei Mediatheken) ist die Ausnahme
+        repeated = rows["key"].duplicated(keep=False)
+        on_server = rows.loc[~repeated].set_index("key")["source"]
+        if repeated.any():
+            on_server = pd.concat(
+                [on_server, rows.loc[repeated].groupby("key", sort=False)["source"].agg("|".join)]
+            )
+        found = on_server.reindex(merged.index)
+        present = found.notna()
+        servers = servers.where(~present, servers + name + "|")
+        sources = sources.where(~present, sources + found.fillna("") + "|")
+        count += present.astype("int64")
+    merged["servers"] = servers.str[:-1]
+    merged["sources"] = sources.str[:-1]
+    merged["server_count"] = count
+    merged = merged.reset_index(drop=True)
+    merged["duration"] = pd.to_numeric(merged["duration"], errors="coerce")
+    merged["added_at"] = pd.to_datetime(merged["added_at"], errors="coerce")
+    merged["audience_rating"] = pd.to_numeric(merged["audience_rating"], errors="coerce")
+    return merged[CATALOGUE_COLUMNS]
+
+
+def build_multi_server_catalogue(
+    servers: List[tuple],
+    metadata_type: int,
+    progress: Optional[Callable] = None,
+    max_workers: int = MULTI_SERVER_MAX_WORKERS,
+) -> tuple:
+    # servers: Liste aus (URL, Token, Name oder None). Die Server werden
+    # gleichzeitig abgefragt, jeder über einen eigenen PlexHttpClient.
+    # Liefert (Katalog, Zusammenfassung je Server); ein nicht erreichbarer
+    # Server fehlt im Katalog und steht mit Fehler in der Zusammenfassung.
+    start = time.perf_counter()
+    job = current_timing_job()
+    percents = [0.0] * len(servers)
+    lock = threading.Lock()
+
+    def server_progress(index: int, name: str):
+        def report(percent: float, message: str = None):
+            with lock:
+                percents[index] = percent
+                total = sum(percents) / len(percents)
+            if progress:
+                progress(90 * total / 100, f"{name}: {message}" if message else None)
+
+        return report
+
+    def fetch(index: int, url: str, token: str, name: Optional[str]) -> dict:
+        set_timing_job(job)
+        started = time.perf_counter()
+        client = PlexHttpClient(url, token)
+        try:
+            name = name or client.server_name()
+            with TimingSpan("fetch_server", server=name) as span:
+                df = fetch_server_catalogue(
+                    client, name, metadata_type, server_progress(index, name)
+                )
+                span.rows = len(df)
+        finally:
+            client.close()
+        return {"name": name, "url": url, "frame": df, "seconds": time.perf_counter() - started}
+
+    results = [None] * len(servers)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(servers)))) as pool:
+        futures = {
+            pool.submit(fetch, index, url, token, name): index
+            for index, (url, token, name) in enumerate(servers)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            url, _, name = servers[index]
+            try:
+                results[index] = future.result()
+            except JobCancelled:
+                for other in futures:
+                    other.cancel()
+                raise
+            except Exception as e:
+                logger.error(f"Server {name or url} nicht abrufbar: {e}")
+                results[index] = {"name": name or url, "url": url, "frame": None, "error": str(e)}
+    fetched = [r for r in results if r["frame"] is not None]
+    if not fetched:
+        raise RuntimeError("Keiner der Server war erreichbar.")
+    names = [r["name"] for r in fetched]
+    if len(set(names)) != len(names):
+        raise ValueError("Servernamen müssen eindeutig sein (Name in der Serverliste angeben).")
+    if progress:
+        progress(90, "Führe Kataloge zusammen ...")
+    with TimingSpan("merge", servers=len(fetched)) as span:
+        catalogue = merge_catalogues([r["frame"] for r in fetched], names)
+        span.rows = len(catalogue)
+    summary = [
+        {
+            "name": r["name"],
+            "url": r["url"],
+            "rows": len(r["frame"]) if r["frame"] is not None else 0,
+            "seconds": r.get("seconds"),
+            "error": r.get("error"),
+        }
+        for r in results
+    ]
+    logger.info(
+        f"Gesamtkatalog: {len(catalogue)} Einträge von {len(fetched)} Servern "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return catalogue, summary
+
+
+def format_catalogue_summary(catalogue: pd.DataFrame, summary: List[dict]) -> str:
+    lines = ["Gesamtkatalog:"]
+    for s in summary:
+        if s["error"]:
+            lines.append(f"  {s['name']}: FEHLER {s['error']}")
+        else:
+            lines.append(f"  {s['name']}: {s['rows']} Einträge, {s['seconds']:.1f}s")
+    shared = int((catalogue["server_count"] > 1).sum()) if len(catalogue) else 0
+    lines.append(
+        f"Zusammengeführt: {len(catalogue)} Einträge, davon {shared} auf mehreren Servern"
+    )
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Lokaler Cache für Live-Bibliotheken (inkrementeller Abgleich)
+# ---------------------------------------------------------------------------
+LIVE_CACHE_FILE = os.path.join(BASE_DIR, "live_cache.db")
+LIVE_CACHE_COLUMNS = LIVE_DETAIL_COLUMNS + ["guid", "updated_at"]
+
+
+def open_live_cache(cache_path: str = LIVE_CACHE_FILE) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+    conn = sqlite3.connect(cache_path, timeout=30)
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS live_items (
+            server TEXT NOT NULL,
+            section INTEGER NOT NULL,
+            metadata_type INTEGER NOT NULL,
+            id INTEGER NOT NULL,
+            title TEXT,
+            studio TEXT,
+            summary TEXT,
+            duration INTEGER,
+            tags_genre TEXT,
+            tags_director TEXT,
+            year INTEGER,
+            added_at TEXT,
+            tags_country TEXT,
+            audience_rating REAL,
+            guid TEXT,
+            updated_at INTEGER,
+            PRIMARY KEY (server, section, metadata_type, id)
+        );
+        CREATE TABLE IF NOT EXISTS live_sync (
+            server TEXT NOT NULL,
+            section INTEGER NOT NULL,
+            metadata_type INTEGER NOT NULL,
+            watermark INTEGER,
+            synced_at TEXT,
+            PRIMARY KEY (server, section, metadata_type)
+        );
+        """
+    )
+    return conn
+
+
+def _cache_row(key: tuple, row: dict) -> tuple:
+    added_at = row["added_at"]
+    return key + tuple(
+        added_at.isoformat(sep=" ") if col == "added_at" and added_at else row[col]
+        for col in LIVE_CACHE_COLUMNS
+    )
+
+
+def sync_live_section(
+    client: PlexHttpClient,
+    library_id: int,
+    metadata_type: int,
+    cache_path: str = LIVE_CACHE_FILE,
+    progress: Optional[Callable] = None,
+) -> dict:
+    # Erster Lauf lädt die Mediathek komplett. Danach werden nur Einträge mit
+    # updatedAt nach dem letzten Stand geholt; Löschungen erkennt ein Abgleich
+    # der Anzahl mit totalSize, erst bei Abweichung folgt die ID-Liste.
+    key = (client.server_id(), int(library_id), int(metadata_type))
+    conn = open_live_cache(cache_path)
+    try:
+        state = conn.execute(
+            "SELECT watermark FROM live_sync WHERE server = ? AND section = ? AND metadata_type = ?",
+            key,
+        ).fetchone()
+        full = state is None or state[0] is None
+        filters = None
+        if not full:
+            # Plex filtert mit ">>" auf "größer als"; eine Sekunde Überlappung
+            # fängt Änderungen in derselben Sekunde wie der letzte Stand ab
+            filters = {"updatedAt>>": state[0] - 1}
+        rows = client.fetch_section_items(
+            library_id,
+            metadata_type,
+            scaled_progress(progress, 0, 80),
+            filters=filters,
+        )
+        placeholders = ",".join("?" * (3 + len(LIVE_CACHE_COLUMNS)))
+        where = "server = ? AND section = ? AND metadata_type = ?"
+        with conn:
+            if full:
+                conn.execute(f"DELETE FROM live_items WHERE {where}", key)
+            conn.executemany(
+                f"INSERT OR REPLACE INTO live_items VALUES ({placeholders})",
+                (_cache_row(key, row) for row in rows),
+            )
+
+        deleted = 0
+        if not full:
+            if progress:
+                progress(85, "Prüfe auf gelöschte Einträge ...")
+            cached = conn.execute(
+                f"SELECT COUNT(*) FROM live_items WHERE {where}", key
+            ).fetchone()[0]
+            if cached != client.section_total(library_id, metadata_type):
+                live_ids = client.section_ids(library_id, metadata_type)
+                cached_ids = [
+                    r[0]
+                    for r in conn.execute(f"SELECT id FROM live_items WHERE {where}", key)
+                ]
+                stale = [(i,) for i in cached_ids if i not in live_ids]
+                with conn:
+                    conn.executemany(
+                        f"DELETE FROM live_items WHERE {where} AND id = ?",
+                        (key + i for i in stale),
+                    )
+                deleted = len(stale)
+                if len(live_ids) > len(cached_ids) - deleted:
+                    # Einträge fehlen trotz Abgleich: Stand verwerfen, komplett neu laden
+                    logger.warning("Live-Cache unvollständig, lade Mediathek komplett neu.")
+                    with conn:
+                        conn.execute(f"DELETE FROM live_sync WHERE {where}", key)
+                    conn.close()
+                    conn = None
+                    return sync_live_section(
+                        client, library_id, metadata_type, cache_path, progress
+                    )
+
+        with conn:
+            conn.execute(
+                f"""
+                INSERT OR REPLACE INTO live_sync
+                SELECT ?, ?, ?, MAX(updated_at), ? FROM live_items WHERE {where}
+                """,
+                key + (datetime.datetime.now().isoformat(sep=" ", timespec="seconds"),) + key,
+            )
+        logger.info(
+            f"Live-Cache {'neu aufgebaut' if full else 'aktualisiert'}: "
+            f"{len(rows)} geladen, {deleted} gelöscht (Mediathek {library_id})"
+        )
+        return {"full": full, "fetched": len(rows), "deleted": deleted}
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def load_library_details_cached(
+    client: PlexHttpClient,
+    library_id: int,
+    metadata_type: int,
+    cache_path: str = LIVE_CACHE_FILE,
+    progress: Optional[Callable] = None,
+) -> LibraryDetails:
+    # Wie load_library_details_live, aber aus dem abgeglichenen Cache
+    with TimingSpan("sync", library=library_id, metadata_type=metadata_type):
+        sync_live_section(
+            client, library_id, metadata_type, cache_path, scaled_progress(progress, 0, 90)
+        )
+    conn = open_live_cache(cache_path)
+    try:
+        with TimingSpan("query", step="cache", library=library_id) as span:
+            df = pd.read_sql_query(
+                f"""
+                SELECT {", ".join(LIVE_DETAIL_COLUMNS)} FROM live_items
+                WHERE server = ? AND section = ? AND metadata_type = ?
+                ORDER BY id
+                """,
+                conn,
+                params=(client.server_id(), int(library_id), int(metadata_type)),
+            )
+            span.rows = len(df)
+    finally:
+        conn.close()
+    if progress:
+        progress(100)
+    if df.empty:
+        logger.warning("Keine Einträge in der Live-Mediathek gefunden.")
+        return details_from_frame(pd.DataFrame())
+    df["added_at"] = pd.to_datetime(df["added_at"], errors="coerce")
+    return details_from_frame(df)
+
+
+# ---------------------------------------------------------------------------
+# Excel-Export (streamend, konstanter Speicherbedarf)
+# ---------------------------------------------------------------------------
+def _excel_value(value):
+    # NaN/None bleiben leere Zellen, NumPy-Skalare werden zu Python-Werten
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+        if isinstance(value, float) and value != value:
+            return None
+    return value
+
+
+def pandas_styled_header() -> bool:
+    # pandas < 3 formatiert die Kopfzeile (fett, Rahmen, zentriert), pandas 3 nicht
+    return int(pd.__version__.split(".")[0]) < 3
+
+
+def _append_sheet(
+    wb, sheet_name: str, chunks, total: int = None, progress: Optional[Callable] = None
+) -> int:
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    ws = wb.create_sheet(sheet_name)
+    thin = Side(style="thin")
+    header_font = Font(bold=True)
+    header_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    header_alignment = Alignment(horizontal="center", vertical="top")
+    styled_header = pandas_styled_header()
+
+    written = 0
+    header_done = False
+    seconds = 0.0
+    for chunk in chunks:
+        started = time.perf_counter()
+        if not header_done:
+            header = []
+            for col in chunk.columns:
+                cell = WriteOnlyCell(ws, value=str(col))
+                if styled_header:
+                    cell.font = header_font
+                    cell.border = header_border
+                    cell.alignment = header_alignment
+                header.append(cell)
+            ws.append(header)
+            header_done = True
+        for row in chunk.itertuples(index=False, name=None):
+            ws.append([_excel_value(v) for v in row])
+        written += len(chunk)
+        seconds += time.perf_counter() - started
+        if progress:
+            percent = 100 * written / total if total else 0
+            progress(min(percent, 100), f"{written}/{total or '?'} Zeilen geschrieben")
+    record_timing("write", seconds, written, sheet=sheet_name)
+    return written
+
+
+def write_excel_chunks(
+    path: str,
+    chunks,
+    total: int = None,
+    progress: Optional[Callable] = None,
+    sheet_name: str = "Sheet1",
+    extra_sheets: Optional[dict] = None,
+) -> int:
+    # Schreibt DataFrame-Blöcke in ein write-only Workbook. Das Ergebnis
+    # entspricht df.to_excel(path, index=False) inkl. Kopfzeilen-Format.
+    # extra_sheets (Name -> DataFrame) werden als weitere Blätter angehängt.
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    written = _append_sheet(wb, sheet_name, chunks, total, progress)
+    for name, df in (extra_sheets or {}).items():
+        _append_sheet(wb, name, [df], len(df), None)
+    with TimingSpan("write", step="save", file=os.path.basename(path)):
+        wb.save(path)
+    return written
+
+
+def write_excel_sheets(path: str, sheets: dict, progress: Optional[Callable] = None) -> int:
+    # Mehrere DataFrames als Blätter, wie pd.ExcelWriter + to_excel je Blatt
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    total = sum(len(df) for df in sheets.values())
+    written = 0
+    for name, df in sheets.items():
+        chunks = [
+            df.iloc[i : i + READ_CHUNK_SIZE] for i in range(0, max(len(df), 1), READ_CHUNK_SIZE)
+        ]
+        written += _append_sheet(
+            wb,
+            name,
+            chunks,
+            len(df),
+            scaled_progress(progress, 100 * written / total, 100 * (written + len(df)) / total)
+            if total
+            else None,
+        )
+    with TimingSpan("write", step="save", file=os.path.basename(path)):
+        wb.save(path)
+    return written
+
+
+# ---------------------------------------------------------------------------
+# Spalten-Snapshot (Arrow/Feather) neben dem Excel-Export
+# ---------------------------------------------------------------------------
+def snapshot_sidecar_path(excel_path: str) -> str:
+    return os.path.splitext(excel_path)[0] + ".feather"
+
+
+def _sidecar_schema(df: pd.DataFrame):
+    fields = []
+    for col, dtype in df.dtypes.items():
+        if pd.api.types.is_integer_dtype(dtype):
+            fields.append(pa.field(col, pa.int64()))
+        elif pd.api.types.is_float_dtype(dtype):
+            fields.append(pa.field(col, pa.float64()))
+        else:
+            fields.append(pa.field(col, pa.string()))
+    return pa.schema(fields)
+
+
+class SnapshotSidecar:
+    # Schreibt die Export-Blöcke nebenbei als unkomprimierte Arrow-IPC-Datei
+    # (Feather v2, per mmap lesbar). Die Datei wird erst beim Verlassen des
+    # with-Blocks fertiggestellt, also nach dem Speichern der Excel-Datei;
+    # bei einem Fehler wird sie verworfen.
+    def __init__(self, excel_path: str):
+        self.path = snapshot_sidecar_path(excel_path)
+        self.tmp_path = self.path + ".tmp"
+        self.writer = None
+        self.schema = None
+        self.failed = not PYARROW_AVAILABLE
+        self.seconds = 0.0
+        self.rows = 0
+
+    def tee(self, chunks):
+        for chunk in chunks:
+            if not self.failed:
+                self.write(chunk)
+            yield chunk
+
+    def write(self, chunk: pd.DataFrame):
+        started = time.perf_counter()
+        try:
+            if self.writer is None:
+                self.schema = _sidecar_schema(chunk)
+                self.writer = pa_ipc.new_file(self.tmp_path, self.schema)
+            # Als Tabelle: pandas-Spalten aus mehrteiligen Arrow-Arrays (z. B.
+            # Ausschnitte aus read_snapshot) gehen nicht in einen RecordBatch
+            self.writer.write_table(
+                pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False)
+            )
+            self.rows += len(chunk)
+        except (pa.ArrowException, ValueError, TypeError) as e:
+            # Excel-Export nicht am Snapshot scheitern lassen
+            logger.warning(f"Snapshot {self.path} wird nicht geschrieben: {e}")
+            self.failed = True
+        finally:
+            self.seconds += time.perf_counter() - started
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.writer is None:
+            return False
+        self.writer.close()
+        if exc_type is None and not self.failed:
+            os.replace(self.tmp_path, self.path)
+            record_timing("write", self.seconds, self.rows, step="sidecar")
+            logger.info(f"Snapshot geschrieben: {self.path}")
+        else:
+            os.remove(self.tmp_path)
+        return False
+
+
+def read_snapshot(path: str) -> pd.DataFrame:
+    # Liest einen Export bevorzugt aus dem Arrow-Snapshot daneben; die Excel-
+    # Datei wird nur gelesen, wenn es keinen aktuellen Snapshot gibt
+    sidecar = path if path.endswith(".feather") else snapshot_sidecar_path(path)
+    if (
+        PYARROW_AVAILABLE
+        and os.path.exists(sidecar)
+        and (sidecar == path or os.path.getmtime(sidecar) >= os.path.getmtime(path))
+    ):
+        logger.debug(f"Lese Snapshot {sidecar}")
+        with TimingSpan("read", source="feather", file=os.path.basename(sidecar)) as span:
+            df = feather.read_table(sidecar, memory_map=True).to_pandas()
+            span.rows = len(df)
+        return df
+    with TimingSpan("read", source="xlsx", file=os.path.basename(path)) as span:
+        df = pd.read_excel(path)
+        span.rows = len(df)
+    return df
+
+
+# ---------------------------------------------------------------------------
+# Sicherungskopien in C:\PLEXport (inhaltsadressiert, ohne Duplikate)
+# ---------------------------------------------------------------------------
+# Je Sicherung eine JSON-Zeile: Inhalts-Hash -> Datei in BASE_DIR
+BACKUP_INDEX_FILE = os.path.join(BASE_DIR, "backup_index.jsonl")
+# openpyxl schreibt die Speicherzeit in die Dokument-Eigenschaften; sonst
+# sind zwei Exporte mit gleichen Daten byte-gleich
+XLSX_VOLATILE_MEMBERS = ("docProps/core.xml",)
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def _hash_stream(digest, f) -> None:
+    while True:
+        block = f.read(HASH_BLOCK_SIZE)
+        if not block:
+            break
+        digest.update(block)
+
+
+def export_content_hash(path: str) -> str:
+    # SHA-256 über den Inhalt; bei .xlsx über die entpackten Blätter ohne
+    # Zeitstempel, damit unveränderte Mediatheken denselben Hash ergeben
+    digest = hashlib.sha256()
+    if path.lower().endswith(".xlsx") and zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for name in sorted(zf.namelist()):
+                if name in XLSX_VOLATILE_MEMBERS:
+                    continue
+                digest.update(name.encode("utf-8") + b"\0")
+                with zf.open(name) as f:
+                    _hash_stream(digest, f)
+    else:
+        with open(path, "rb") as f:
+            _hash_stream(digest, f)
+    return digest.hexdigest()
+
+
+def load_backup_index(index_path: str = BACKUP_INDEX_FILE) -> dict:
+    # Hash -> Dateiname der jüngsten noch vorhandenen Sicherung
+    index = {}
+    if not os.path.exists(index_path):
+        return index
+    base_dir = os.path.dirname(index_path)
+    with open(index_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if os.path.exists(os.path.join(base_dir, entry["file"])):
+                index[entry["hash"]] = entry["file"]
+    return index
+
+
+def _store_backup(source: str, target: str, digest: str, index: dict, entries: list) -> str:
+    # Gleicher Inhalt schon gesichert: Hardlink auf die vorhandene Datei (kein
+    # zusätzlicher Platz); geht das nicht (z. B. FAT), wird die alte Datei
+    # weiterverwendet. Sonst eine Kopie - nie ein Link auf die Datei des
+    # Benutzers, die er danach noch bearbeiten könnte.
+    base_dir = os.path.dirname(target)
+    existing = index.get(digest)
+    if existing:
+        try:
+            os.link(os.path.join(base_dir, existing), target)
+            mode = "link"
+        except OSError:
+            target = os.path.join(base_dir, existing)
+            mode = "reuse"
+    else:
+        shutil.copy2(source, target)
+        mode = "copy"
+        index[digest] = os.path.basename(target)
+    entries.append(
+        {
+            "hash": digest,
+            "file": os.path.basename(target),
+            "source": source,
+            "mode": mode,
+            "bytes": os.path.getsize(target),
+            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        }
+    )
+    return target
+
+
+def backup_to_base_dir(path: str, extra_paths=(), index_path: str = BACKUP_INDEX_FILE) -> str:
+    # Sicherung mit Datum/Zeit-Prefix in C:\PLEXport\, inkl. Snapshot daneben.
+    # extra_paths: weitere Dateien desselben Exports (z. B. Serien-Blätter als CSV).
+    # Die fertige Datei wird nur kopiert, nicht neu geschrieben; identische
+    # Inhalte landen per Hash-Index nur einmal auf der Platte.
+    now_str = datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+    base_dir = os.path.dirname(index_path)
+    os.makedirs(base_dir, exist_ok=True)
+    index = load_backup_index(index_path)
+    entries = []
+    with TimingSpan("backup", file=os.path.basename(path)):
+        digest = export_content_hash(path)
+        backup_path = _store_backup(
+            path, os.path.join(base_dir, f"{now_str}_{os.path.basename(path)}"), digest, index, entries
+        )
+        sidecar = snapshot_sidecar_path(path)
+        # Der Snapshot gehört zum Namen der Sicherung (siehe read_snapshot) und
+        # nur zu Excel-Exporten; eine weiterverwendete Sicherung hat ihn schon
+        if (
+            export_format(path) == ".xlsx"
+            and os.path.exists(sidecar)
+            and not os.path.exists(snapshot_sidecar_path(backup_path))
+        ):
+            _store_backup(
+                sidecar,
+                snapshot_sidecar_path(backup_path),
+                export_content_hash(sidecar),
+                index,
+                entries,
+            )
+        for extra in extra_paths:
+            _store_backup(
+                extra,
+                os.path.join(base_dir, f"{now_str}_{os.path.basename(extra)}"),
+                export_content_hash(extra),
+                index,
+                entries,
+            )
+    with open(index_path, "a", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    if entries[0]["mode"] != "copy":
+        logger.info(f"Inhalt unverändert seit {index[digest]}, keine neue Kopie angelegt")
+    return backup_path
+
+
+# ---------------------------------------------------------------------------
+# Export-Formate (Excel, CSV, JSON Lines, Parquet)
+# ---------------------------------------------------------------------------
+# Standard bleibt Excel. Die anderen Formate schreiben die gleichen
+# (formatierten) Spalten ohne openpyxl und ohne Zeilengrenze.
+DEFAULT_EXPORT_FORMAT = ".xlsx"
+# Zeilen je Excel-Blatt inkl. Kopfzeile
+EXCEL_MAX_ROWS = 1_048_576
+# Deutsche CSV-Konventionen wie beim Öffnen in Excel: Semikolon, Dezimalkomma,
+# UTF-8 mit BOM (sonst zeigt Excel Umlaute falsch an)
+CSV_SEPARATOR = ";"
+CSV_DECIMAL = ","
+CSV_ENCODING = "utf-8-sig"
+
+
+def _integral_floats(chunk: pd.DataFrame) -> pd.DataFrame:
+    # Ganzzahlige float-Spalten (z. B. year mit Lücken) als Int64, damit
+    # CSV/JSON "2001" statt "2001,0" bzw. 2001.0 enthalten - wie in Excel
+    converted = {}
+    for col, dtype in chunk.dtypes.items():
+        if pd.api.types.is_float_dtype(dtype):
+            values = chunk[col].dropna()
+            if (values == values.round()).all():
+                converted[col] = chunk[col].astype("Int64")
+    return chunk.assign(**converted) if converted else chunk
+
+
+def _stream_chunks(chunks, total: int, progress: Optional[Callable], write, fmt: str) -> int:
+    # Gemeinsame Schleife der Text-/Parquet-Writer: write(chunk, first)
+    written = 0
+    first = True
+    seconds = 0.0
+    for chunk in chunks:
+        started = time.perf_counter()
+        write(_integral_floats(chunk), first)
+        first = False
+        written += len(chunk)
+        seconds += time.perf_counter() - started
+        if progress:
+            percent = 100 * written / total if total else 0
+            progress(min(percent, 100), f"{written}/{total or '?'} Zeilen geschrieben")
+    record_timing("write", seconds, written, format=fmt)
+    return written
+
+
+def extra_sheet_path(path: str, name: str) -> str:
+    # Zusatzblätter (Serien/Staffeln) werden außerhalb von Excel eigene Dateien
+    stem, ext = os.path.splitext(path)
+    return f"{stem}_{name}{ext}"
+
+
+def _write_extra_files(path: str, extra_sheets: Optional[dict], writer) -> None:
+    for name, df in (extra_sheets or {}).items():
+        writer(extra_sheet_path(path, name), [df], len(df))
+
+
+def write_csv_chunks(
+    path: str,
+    chunks,
+    total: int = None,
+    progress: Optional[Callable] = None,
+    extra_sheets: Optional[dict] = None,
+) -> int:
+    with open(path, "w", encoding=CSV_ENCODING, newline="") as f:
+
+        def write(chunk, first):
+            chunk.to_csv(
+                f, sep=CSV_SEPARATOR, decimal=CSV_DECIMAL, index=False, header=first
+            )
+
+        written = _stream_chunks(chunks, total, progress, write, "csv")
+    _write_extra_files(path, extra_sheets, write_csv_chunks)
+    return written
+
+
+def write_jsonl_chunks(
+    path: str,
+    chunks,
+    total: int = None,
+    progress: Optional[Callable] = None,
+    extra_sheets: Optional[dict] = None,
+) -> int:
+    # Ein JSON-Objekt je Zeile, fehlende Werte als null
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+
+        def write(chunk, first):
+            text = chunk.to_json(orient="records", lines=True, force_ascii=False)
+            f.write(text if text.endswith("\n") else text + "\n")
+
+        written = _stream_chunks(chunks, total, progress, write, "jsonl")
+    _write_extra_files(path, extra_sheets, write_jsonl_chunks)
+    return written
+
+
+def write_parquet_chunks(
+    path: str,
+    chunks,
+    total: int = None,
+    progress: Optional[Callable] = None,
+    extra_sheets: Optional[dict] = None,
+) -> int:
+    # Eine Row Group je Block; Schema (int64/float64/string) aus dem ersten Block
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("Für den Parquet-Export wird pyarrow benötigt (pip install pyarrow).")
+    writer = None
+    schema = None
+
+    def write(chunk, first):
+        nonlocal writer, schema
+        if writer is None:
+            schema = _sidecar_schema(chunk)
+            writer = pa_parquet.ParquetWriter(path, schema)
+        writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+    try:
+        written = _stream_chunks(chunks, total, progress, write, "parquet")
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        # Keine Blöcke: trotzdem eine gültige (leere) Datei hinterlassen
+        pa_parquet.write_table(pa.table({}), path)
+    _write_extra_files(path, extra_sheets, write_parquet_chunks)
+    return written
+
+
+# Dateiendung -> (Beschriftung, Writer). Alle Writer haben die Signatur von
+# write_excel_chunks und bekommen bereits formatierte Blöcke.
+EXPORT_FORMATS = {
+    ".xlsx": ("Excel", write_excel_chunks),
+    ".csv": ("CSV (Semikolon)", write_csv_chunks),
+    ".jsonl": ("JSON Lines", write_jsonl_chunks),
+    ".parquet": ("Parquet", write_parquet_chunks),
+}
+
+
+def available_export_formats() -> List[str]:
+    return [ext for ext in EXPORT_FORMATS if ext != ".parquet" or PYARROW_AVAILABLE]
+
+
+def export_format(path: str, default: str = DEFAULT_EXPORT_FORMAT) -> str:
+    # Das Format folgt der Dateiendung, sonst der Voreinstellung
+    ext = os.path.splitext(path)[1].lower()
+    return ext if ext in EXPORT_FORMATS else default
+
+
+def export_filetypes(preferred: str = DEFAULT_EXPORT_FORMAT) -> list:
+    # Für asksaveasfilename: gewähltes Format zuerst
+    formats = sorted(available_export_formats(), key=lambda ext: ext != preferred)
+    return [(EXPORT_FORMATS[ext][0], f"*{ext}") for ext in formats] + [
+        ("All Files", "*.*")
+    ]
+
+
+def export_extra_paths(path: str, extra_sheets: Optional[dict], fmt: str = None) -> List[str]:
+    # Dateien, die write_export für die Zusatzblätter anlegt (Excel: keine)
+    if (fmt or export_format(path)) == ".xlsx":
+        return []
+    return [extra_sheet_path(path, name) for name in (extra_sheets or {})]
+
+
+def write_export(
+    path: str,
+    chunks,
+    total: int = None,
+    progress: Optional[Callable] = None,
+    extra_sheets: Optional[dict] = None,
+    fmt: str = None,
+) -> int:
+    # Schreibt formatierte Blöcke im Format der Dateiendung (bzw. fmt).
+    # Nur Excel bekommt den Arrow-Snapshot für den schnellen Vergleich.
+    fmt = fmt or export_format(path)
+    if fmt == ".xlsx" and total and total >= EXCEL_MAX_ROWS:
+        raise ValueError(
+            f"{total} Zeilen passen nicht in ein Excel-Blatt (max. {EXCEL_MAX_ROWS - 1}). "
+            "Bitte als CSV, JSONL oder Parquet exportieren."
+        )
+    writer = EXPORT_FORMATS[fmt][1]
+    logger.debug(f"Schreibe {os.path.basename(path)} als {EXPORT_FORMATS[fmt][0]}")
+    if fmt != ".xlsx":
+        return writer(path, chunks, total, progress, extra_sheets=extra_sheets)
+    with SnapshotSidecar(path) as sidecar:
+        return writer(path, sidecar.tee(chunks), total, progress, extra_sheets=extra_sheets)
+
+
+# ---------------------------------------------------------------------------
+# Sammel-Export mehrerer Mediatheken (Prozess-Pool)
+# ---------------------------------------------------------------------------
+BULK_MAX_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+BULK_TAG_TABLE = "bulk.bulk_tags"
+# So oft prüft der Sammel-Export auf Abbruch, während Mediatheken laufen
+BULK_POLL_SECONDS = 0.5
+
+# Verbindung und Abbruch-Event des jeweiligen Worker-Prozesses (siehe _bulk_worker_init)
+_bulk_conn = None
+_bulk_cancel = None
+
+
+def build_bulk_tag_table(
+    db_path: str, library_ids: List[int], metadata_type: int, target_path: str = None
+) -> str:
+    # Aggregiert die Tags aller gewählten Mediatheken in einem Durchlauf in
+    # eine temporäre DB (Tabelle bulk_tags). Die Worker hängen sie an, statt
+    # die Taggings je Mediathek erneut zu lesen.
+    if target_path is None:
+        fd, target_path = tempfile.mkstemp(prefix="plexport_tags_", suffix=".db")
+        os.close(fd)
+    src = open_db(db_path)
+    try:
+        item_driven = has_scratch_index(src)
+    finally:
+        src.close()
+    conn = sqlite3.connect(pathlib.Path(target_path).resolve().as_uri(), uri=True)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("ATTACH DATABASE ? AS src", (sqlite_readonly_uri(db_path),))
+        tune_connection(conn)
+        conn.execute(
+            "CREATE TABLE bulk_tags (item_id INTEGER PRIMARY KEY, "
+            "tags_genre TEXT, tags_director TEXT, tags_country TEXT)"
+        )
+        # Tabellen ohne Schema-Prefix werden in src gefunden (main enthält nur bulk_tags)
+        with TimingSpan("query", step="bulk_tags", libraries=len(library_ids)) as span:
+            conn.execute(
+                f"""
+                WITH {tag_aggregation_ctes(item_driven, len(library_ids))}
+                INSERT INTO bulk_tags
+                SELECT item_id, tags_genre, tags_director, tags_country FROM tag_agg
+                """,
+                sections_params(library_ids, metadata_type),
+            )
+            # rowcount bleibt bei WITH ... INSERT auf -1
+            span.rows = conn.total_changes
+            conn.commit()
+    except BaseException:
+        conn.close()
+        os.remove(target_path)
+        raise
+    conn.close()
+    return target_path
+
+
+def _bulk_worker_init(
+    db_path: str, tags_path: str, cancel=None, job: str = None, timing: bool = False
+):
+    # Eine lesende Verbindung je Worker-Prozess für alle seine Mediatheken
+    global _bulk_conn, _bulk_cancel
+    enable_timing(timing)
+    set_timing_job(job)
+    _bulk_cancel = cancel
+    _bulk_conn = open_db(db_path)
+    _bulk_conn.execute("ATTACH DATABASE ? AS bulk", (sqlite_readonly_uri(tags_path),))
+
+
+def _bulk_check_cancel():
+    if _bulk_cancel is not None and _bulk_cancel.is_set():
+        raise JobCancelled()
+
+
+def _bulk_chunks(chunks):
+    # Zwischen den Blöcken auf Abbruch prüfen
+    for chunk in chunks:
+        _bulk_check_cancel()
+        yield chunk
+
+
+def _bulk_export_section(library_id: int, metadata_type: int, path: str) -> dict:
+    _bulk_check_cancel()
+    start = time.perf_counter()
+    total = count_items_in_library(_bulk_conn, library_id, metadata_type)
+    written = 0
+    extra_sheets = None
+    if total:
+        if metadata_type == PLEX_TYPE_EPISODE:
+            # Wie der Einzel-Export: Blätter mit Serien- und Staffel-Summen
+            shows, seasons = format_series_rollup(*get_series_rollup(_bulk_conn, library_id))
+            extra_sheets = {"Serien": shows, "Staffeln": seasons}
+        chunks = iter_library_details(
+            _bulk_conn, library_id, metadata_type, query=details_select(BULK_TAG_TABLE)
+        )
+        try:
+            written = write_export(path, _bulk_chunks(chunks), total, extra_sheets=extra_sheets)
+        except JobCancelled:
+            # Halb geschriebene Dateien nicht liegen lassen
+            for partial in [path] + export_extra_paths(path, extra_sheets):
+                if os.path.exists(partial):
+                    os.remove(partial)
+            raise
+    return {
+        "library_id": library_id,
+        "rows": written,
+        "seconds": time.perf_counter() - start,
+        "path": path if written else None,
+        "extra_paths": export_extra_paths(path, extra_sheets) if written else [],
+    }
+
+
+def bulk_export_filename(library_id: int, name: str, fmt: str = DEFAULT_EXPORT_FORMAT) -> str:
+    safe_name = re.sub(r'[<>:"/\\|?*]+', "_", name).strip() or "Mediathek"
+    return f"{library_id}_{safe_name}{fmt}"
+
+
+def export_libraries_bulk(
+    db_path: str,
+    libraries: List[tuple],
+    metadata_type: int,
+    out_dir: str,
+    progress: Optional[Callable] = None,
+    max_workers: int = BULK_MAX_WORKERS,
+    fmt: str = DEFAULT_EXPORT_FORMAT,
+) -> dict:
+    # Exportiert mehrere Mediatheken (Liste aus (id, name)) parallel in je eine
+    # Datei im Format fmt. db_path muss eine Datei sein (keine RAM-Kopie), da
+    # die Worker eigene Prozesse sind.
+    start = time.perf_counter()
+    if progress:
+        progress(0, "Aggregiere Tags für alle Mediatheken ...")
+    tags_path = build_bulk_tag_table(
+        db_path, [lib_id for lib_id, _ in libraries], metadata_type
+    )
+    tag_seconds = time.perf_counter() - start
+    logger.info(f"Tag-Aggregation für {len(libraries)} Mediatheken: {tag_seconds:.1f}s")
+
+    results = []
+    # Bei Abbruch oder Fehler gesetzt; die Worker prüfen es zwischen den Blöcken
+    cancel = multiprocessing.Event()
+    try:
+        pool = ProcessPoolExecutor(
+            max_workers=max(1, min(max_workers, len(libraries))),
+            initializer=_bulk_worker_init,
+            initargs=(db_path, tags_path, cancel, current_timing_job(), timing_enabled()),
+        )
+        try:
+            futures = {
+                pool.submit(
+                    _bulk_export_section,
+                    lib_id,
+                    metadata_type,
+                    os.path.join(out_dir, bulk_export_filename(lib_id, name, fmt)),
+                ): name
+                for lib_id, name in libraries
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(
+                    pending, timeout=BULK_POLL_SECONDS, return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    result = future.result()
+                    result["name"] = futures[future]
+                    results.append(result)
+                    logger.info(
+                        f"Sammel-Export {result['library_id']} - {result['name']}: "
+                        f"{result['rows']} Zeilen in {result['seconds']:.1f}s"
+                    )
+                if progress:  # auch ohne fertige Mediathek, damit Abbrechen greift
+                    progress(
+                        10 + 90 * len(results) / len(futures),
+                        f"{len(results)}/{len(futures)} Mediatheken exportiert",
+                    )
+        except BaseException:
+            # Nicht auf laufende Mediatheken warten: wartende starten nicht
+            # mehr, laufende hören beim nächsten Block auf
+            cancel.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown()
+    finally:
+        try:
+            os.remove(tags_path)
+        except OSError:
+            # Unter Windows noch von abbrechenden Workern geöffnet
+            logger.warning(f"Temporäre Tag-DB {tags_path} konnte nicht gelöscht werden.")
+    results.sort(key=lambda r: r["library_id"])
+    return {
+        "sections": results,
+        "tag_seconds": tag_seconds,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def format_bulk_summary(result: dict) -> str:
+    lines = ["Sammel-Export abgeschlossen:"]
+    for r in result["sections"]:
+        target = os.path.basename(r["path"]) if r["path"] else "keine Daten"
+        lines.append(
+            f"  {r['library_id']} - {r['name']}: {r['rows']} Zeilen, "
+            f"{r['seconds']:.1f}s ({target})"
+        )
+    worker_seconds = sum(r["seconds"] for r in result["sections"])
+    lines.append(f"Tag-Aggregation (einmalig): {result['tag_seconds']:.1f}s")
+    lines.append(
+        f"Gesamt: {result['seconds']:.1f}s (Summe der Mediatheken: {worker_seconds:.1f}s)"
+    )
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Funktion zum Vergleichen von zwei Excel-Exports
+# ---------------------------------------------------------------------------
+DIFF_KEY_COLUMNS = ("id", "guid", "title")
+
+
+def _diff_text(values: pd.Series) -> pd.Series:
+    # Ganzzahlige Floats (z.B. Jahr mit Lücken) wie Ganzzahlen darstellen
+    if pd.api.types.is_numeric_dtype(values):
+        numbers = values.astype("float64")
+        if (numbers.dropna() % 1 == 0).all():
+            values = numbers.astype("Int64")
+    return values.astype("string").fillna("")
+
+
+def _diff_values(left: pd.Series, right: pd.Series):
+    # Beide Seiten gleich typisieren; read_excel liefert je nach Lücken
+    # int/float oder object für dieselbe Spalte
+    if pd.api.types.is_numeric_dtype(left) and pd.api.types.is_numeric_dtype(right):
+        return left.astype("float64"), right.astype("float64")
+    return _diff_text(left), _diff_text(right)
+
+
+def _diff_key(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    duplicates = df[key].duplicated()
+    if duplicates.any():
+        logger.warning(
+            f"{int(duplicates.sum())} doppelte Schlüssel in Spalte {key}; nur der erste Eintrag wird verglichen."
+        )
+        df = df[~duplicates]
+    return df.reset_index(drop=True)
+
+
+def diff_snapshots(df1: pd.DataFrame, df2: pd.DataFrame, key: str = None) -> dict:
+    # Vergleicht zwei Exporte über einen Schlüssel (id, sonst guid, sonst
+    # title). Jede Spalte wird für beide Seiten gemeinsam faktorisiert
+    # (gleicher Wert = gleicher Code), jede Zeile über ihre Codes gehasht.
+    # Die Zuordnung ist ein Hash-Join (merge); nur Zeilen mit abweichendem
+    # Hash werden spaltenweise verglichen.
+    if key is None:
+        key = next((k for k in DIFF_KEY_COLUMNS if k in df1 and k in df2), None)
+        if key is None:
+            raise ValueError("Keine gemeinsame Schlüsselspalte (id, guid oder title) gefunden.")
+    if key == "title":
+        logger.warning("Vergleich nur über title; Änderungen am Titel erscheinen als neu/entfernt.")
+    df1 = _diff_key(df1, key)
+    df2 = _diff_key(df2, key)
+
+    columns = [c for c in df1.columns if c in df2.columns and c != key]
+    keys1, keys2 = _diff_values(df1[key], df2[key])
+    codes1, codes2 = {}, {}
+    for col in columns:
+        left, right = _diff_values(df1[col], df2[col])
+        codes, _ = pd.factorize(pd.concat([left, right], ignore_index=True))
+        codes1[col] = codes[: len(df1)]
+        codes2[col] = codes[len(df1) :]
+    hash1 = pd.util.hash_pandas_object(pd.DataFrame(codes1), index=False).to_numpy()
+    hash2 = pd.util.hash_pandas_object(pd.DataFrame(codes2), index=False).to_numpy()
+
+    joined = pd.merge(
+        pd.DataFrame({"key": keys1, "pos1": np.arange(len(df1)), "hash1": hash1}),
+        pd.DataFrame({"key": keys2, "pos2": np.arange(len(df2)), "hash2": hash2}),
+        on="key",
+        how="outer",
+    )
+    only1 = joined["pos2"].isna()
+    only2 = joined["pos1"].isna()
+    both = joined[~only1 & ~only2]
+    pos1 = both["pos1"].to_numpy(dtype="int64")
+    pos2 = both["pos2"].to_numpy(dtype="int64")
+    changed = both["hash1"].to_numpy() != both["hash2"].to_numpy()
+    ch1, ch2 = pos1[changed], pos2[changed]
+
+    # Spaltenweise Vorher/Nachher nur für geänderte Zeilen
+    parts = []
+    for col in columns:
+        differs = codes1[col][ch1] != codes2[col][ch2]
+        if differs.any():
+            parts.append(
+                pd.DataFrame(
+                    {
+                        "row": ch2[differs],
+                        key: df2[key].to_numpy()[ch2[differs]],
+                        "title": (df2["title"] if "title" in df2 else df2[key]).to_numpy()[
+                            ch2[differs]
+                        ],
+                        "Spalte": col,
+                        "Vorher": df1[col].to_numpy()[ch1[differs]],
+                        "Nachher": df2[col].to_numpy()[ch2[differs]],
+                    }
+                )
+            )
+    if parts:
+        changes = pd.concat(parts, ignore_index=True)
+        changes["order"] = changes["Spalte"].map({c: i for i, c in enumerate(columns)})
+        changes = changes.sort_values(["row", "order"], kind="stable").drop(
+            columns=["row", "order"]
+        )
+    else:
+        changes = pd.DataFrame(columns=[key, "title", "Spalte", "Vorher", "Nachher"])
+
+    return {
+        "removed": df1.iloc[joined.loc[only1, "pos1"].to_numpy(dtype="int64")],
+        "added": df2.iloc[joined.loc[only2, "pos2"].to_numpy(dtype="int64")],
+        "in_both": df1.iloc[np.sort(pos1)],
+        "changed": df2.iloc[np.sort(ch2)],
+        "changes": changes.reset_index(drop=True),
+        "key": key,
+    }
+
+
+def compare_excel_files(
+    file1: str,
+    file2: str,
+    output_file: str,
+    progress: Optional[Callable] = None,
+    cache: Optional[ResultCache] = None,
+):
+    logger.info(
+        f"Vergleiche Excel-Dateien:\nDatei1: {file1}\nDatei2: {file2}\nAusgabe: {output_file}"
+    )
+
+    def load_diff():
+        if progress:
+            progress(0, f"Lese {os.path.basename(file1)} ...")
+        df1 = read_snapshot(file1)
+        if progress:
+            progress(35, f"Lese {os.path.basename(file2)} ...")
+        df2 = read_snapshot(file2)
+        if progress:
+            progress(70, "Vergleiche ...")
+        with TimingSpan("diff", rows=len(df1) + len(df2)):
+            return diff_snapshots(df1, df2)
+
+    if cache is None:
+        diff = load_diff()
+    else:
+        # Gleiche Dateien (Größe/Änderungszeit) ergeben denselben Vergleich;
+        # ist die zuletzt geschriebene Ergebnisdatei unverändert, wird sie kopiert
+        inputs = (source_fingerprint(file1), source_fingerprint(file2))
+        previous = cache.get(("compare_file",) + inputs)
+        if previous and os.path.exists(previous[0]) and source_fingerprint(previous[0]) == previous[1]:
+            if os.path.abspath(previous[0]) != os.path.abspath(output_file):
+                shutil.copy2(previous[0], output_file)
+            logger.info(f"Vergleich unverändert, Ergebnis aus {previous[0]} übernommen.")
+            return
+        diff = cache.load(("diff",) + inputs, load_diff)
+    logger.info(
+        f"Vergleich über {diff['key']}: {len(diff['added'])} neu, "
+        f"{len(diff['removed'])} entfernt, {len(diff['changed'])} geändert"
+    )
+
+    if progress:
+        progress(80, "Schreibe Ergebnis ...")
+    write_excel_sheets(
+        output_file,
+        {
+            "In1NichtIn2": diff["removed"],
+            "In2NichtIn1": diff["added"],
+            "InBeiden": diff["in_both"],
+            "Geaendert": diff["changed"],
+            "Aenderungen": diff["changes"],
+        },
+        scaled_progress(progress, 80, 100),
     )
-    query = f"""
-    SELECT COUNT(*) as cnt
-    FROM metadata_items
-    WHERE library_section_id = {library_id} AND metadata_type = {metadata_type}
-    """
-    df = pd.read_sql_query(query, conn)
-    return df["cnt"].iloc[0] if not df.empty else 0
+    if cache is not None:
+        cache.put(("compare_file",) + inputs, (output_file, source_fingerprint(output_file)))
+
+    logger.info("Vergleich abgeschlossen.")
 
 
 # ---------------------------------------------------------------------------
-# Funktionen für Live-Bibliothek
+# Ergebnis-Cache der Sitzung (LRU, nach Speicherbedarf begrenzt)
 # ---------------------------------------------------------------------------
-def get_library_details_live(plex, library_id: int, metadata_type: int) -> pd.DataFrame:
-    logger.debug(
-        f"Lade Live-Details für Mediathek-ID {library_id}, Typ {metadata_type}"
-    )
-    section = None
-    for s in plex.library.sections():
-        if s.key == library_id:
-            section = s
-            break
+RESULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
 
-    if section is None:
-        logger.warning("Keine entsprechende Live-Mediathek gefunden.")
-        return pd.DataFrame()
-
-    lib_type = "movie" if metadata_type == 1 else "show"
-    items = section.all(libtype=lib_type)
-    data = []
-    for item in items:
-        duration_str = convert_ms_to_hhmm(item.duration) if item.duration else ""
-        audience_rating_str = ""
-        if hasattr(item, "audienceRating") and item.audienceRating:
-            audience_rating_str = f"{item.audienceRating:.1f}".replace(".", ",")
-
-        row = {
-            "id": item.ratingKey,
-            "title": item.title,
-            "studio": item.studio if hasattr(item, "studio") else "",
-            "summary": item.summary if hasattr(item, "summary") else "",
-            "duration": duration_str,
-            "tags_genre": "|".join([g.tag for g in item.genres]) if item.genres else "",
-            "tags_director": (
-                "|".join([d.tag for d in item.directors])
-                if hasattr(item, "directors") and item.directors
-                else ""
-            ),
-            "year": item.year,
-            "added_at": (
-                item.addedAt.strftime("%d.%m.%Y %H:%M:%S") if item.addedAt else ""
-            ),
-            "tags_country": (
-                "|".join([c.tag for c in item.countries])
-                if hasattr(item, "countries") and item.countries
-                else ""
-            ),
-            "audience_rating": audience_rating_str,
-        }
-        data.append(row)
-    df = pd.DataFrame(data)
-    return df
+_MISSING = object()
 
 
-def get_library_details_live_numeric(
-    plex, library_id: int, metadata_type: int
-) -> pd.DataFrame:
-    # Liefert nur duration numerisch für Statistik
-    logger.debug(
-        f"Lade Live-Details (numeric) für Stats: ID {library_id}, Typ {metadata_type}"
-    )
-    section = None
-    for s in plex.library.sections():
-        if s.key == library_id:
-            section = s
-            break
-    if section is None:
-        return pd.DataFrame()
-
-    lib_type = "movie" if metadata_type == 1 else "show"
-    items = section.all(libtype=lib_type)
-    data = []
-    for item in items:
-        data.append({"duration": item.duration if item.duration else None})
-    df = pd.DataFrame(data)
-    return df
+def result_bytes(value) -> int:
+    # Geschätzter Speicherbedarf eines Ergebnisses (Frames inkl. Texten)
+    if value is None:
+        return 0
+    if isinstance(value, LibraryDetails):
+        return value.memory_bytes()
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(result_bytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(result_bytes(v) for v in value)
+    return sys.getsizeof(value)
 
 
-# ---------------------------------------------------------------------------
-# Funktion zum Vergleichen von zwei Excel-Exports
-# ---------------------------------------------------------------------------
-def compare_excel_files(file1: str, file2: str, output_file: str):
-    logger.info(
-        f"Vergleiche Excel-Dateien:\nDatei1: {file1}\nDatei2: {file2}\nAusgabe: {output_file}"
-    )
+class ResultCache:
+    # Merkt sich Ergebnisse (Details, Statistik, Serien, Vergleich) für die
+    # Dauer der Sitzung. Der Schlüssel enthält den Stand der Quelle, geänderte
+    # Daten ergeben also einen neuen Eintrag. Über max_bytes werden die am
+    # längsten nicht benutzten Einträge verworfen. Ergebnisse werden geteilt
+    # und dürfen von den Aufrufern nicht verändert werden.
+    def __init__(self, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = collections.OrderedDict()  # Schlüssel -> (Ergebnis, Bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
 
-    df1 = pd.read_excel(file1)
-    df2 = pd.read_excel(file2)
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
 
-    set1 = set(df1["title"].astype(str))
-    set2 = set(df2["title"].astype(str))
+    def put(self, key, value):
+        size = result_bytes(value)
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if size > self.max_bytes:
+                logger.debug(f"Ergebnis {key[0]} zu groß für den Cache ({size / 1e6:.1f} MB)")
+                return
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, dropped) = self.entries.popitem(last=False)
+                self.bytes -= dropped
+                self.evictions += 1
 
-    in1_not_in2_titles = set1 - set2
-    in2_not_in1_titles = set2 - set1
-    in_both_titles = set1.intersection(set2)
+    def load(self, key, loader: Callable):
+        # Gemerktes Ergebnis oder loader() aufrufen und merken. Geladen wird
+        # außerhalb der Sperre, damit andere Jobs nicht warten müssen.
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            logger.info(f"Ergebnis aus dem Cache: {key[0]} ({self.summary()})")
+            return value
+        with TimingSpan("cache_load", kind=key[0]):
+            value = loader()
+        self.put(key, value)
+        return value
 
-    in1_not_in2 = df1[df1["title"].astype(str).isin(in1_not_in2_titles)]
-    in2_not_in1 = df2[df2["title"].astype(str).isin(in2_not_in1_titles)]
-    in_both = df1[df1["title"].astype(str).isin(in_both_titles)]
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
 
-    with pd.ExcelWriter(output_file) as writer:
-        in1_not_in2.to_excel(writer, sheet_name="In1NichtIn2", index=False)
-        in2_not_in1.to_excel(writer, sheet_name="In2NichtIn1", index=False)
-        in_both.to_excel(writer, sheet_name="InBeiden", index=False)
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def summary(self) -> str:
+        stats = self.stats()
+        return (
+            f"{stats['entries']} Einträge, {stats['bytes'] / 1e6:.1f} MB, "
+            f"{stats['hits']} Treffer, {stats['misses']} Fehlgriffe, "
+            f"{stats['evictions']} verdrängt"
+        )
 
-    logger.info("Vergleich abgeschlossen.")
+
+def result_source_key(db_file: str, client, library_id=None, origins: dict = None):
+    # Stand der Quelle für den Ergebnis-Cache: DB-Datei nach Größe und
+    # Änderungszeit (Arbeits-/RAM-Kopien erben über origins den Stand ihres
+    # Originals), live Server plus Änderungsstand der Mediathek. None heißt:
+    # Stand unbekannt, nicht cachen.
+    if db_file:
+        return (origins or {}).get(db_file) or source_fingerprint(db_file)
+    if client is None or library_id is None:
+        return None
+    version = client.section_version(library_id)
+    if version is None:
+        return None
+    return (client.server_id(), version)
 
 
 # ---------------------------------------------------------------------------
@@ -300,16 +3936,47 @@ class PlexGUI(tk.Tk):
         )
         self.baseurl = tk.StringVar(value="http://192.168.1.2:32400")
         self.token = tk.StringVar(value="rZGHLfs2PqSbZQAAXSfg")
+        self.use_scratch_copy = tk.BooleanVar(value=False)
+        self.use_ram_copy = tk.BooleanVar(value=False)
+        self.use_live_cache = tk.BooleanVar(value=True)
+        # Profil (cProfile/tracemalloc) je Job, auch per PLEXPORT_PROFILE=1
+        self.profile_jobs = tk.BooleanVar(value=os.environ.get("PLEXPORT_PROFILE") == "1")
+        self.scratch_files = []
+        self.memory_dbs = []
+        # Ergebnisse der Sitzung (Statistik, Details, Serien, Vergleich) und
+        # Stand des Originals je Arbeits-/RAM-Kopie (siehe result_source_key)
+        self.results = ResultCache()
+        self.copy_origins = {}
 
         self.conn = None
-        self.plex = None
-        self.libraries_df = pd.DataFrame()
+        self.db_file = None
+        self.db_disk_file = None
+        self.plex_client = None
+        # Alle Live-Clients der Sitzung; laufende Jobs nutzen nach einem
+        # neuen "Verbinden" noch den alten, geschlossen wird beim Beenden
+        self.live_clients = []
+        self.libraries_df = None
+        # DB, für die der Suchindex bereitsteht bzw. gerade aufgebaut wird
+        self.search_source = None
+        self.search_target = None
         self.selected_library = None
         self.metadata_type = tk.IntVar(value=1)  # Standard: Filme
+        # Dateiformat für Export/Sammel-Export (Endung, siehe EXPORT_FORMATS)
+        self.export_format = tk.StringVar(value=DEFAULT_EXPORT_FORMAT)
 
         self.progress_var = tk.IntVar(value=0)
+        self.job_status = tk.StringVar(value="Bereit.")
+        self.jobs = JobManager()
+        self.jobs.profile = self.profile_jobs.get()
+        self.active_job = None
+        self.job_message = ""
+
+        self.startup_seconds = None
 
         self.create_widgets()
+        self.after_idle(self.on_window_ready)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(100, self.poll_jobs)
 
     def create_widgets(self):
         # Frame für Verbindungsauswahl
@@ -329,6 +3996,16 @@ class PlexGUI(tk.Tk):
         tk.Button(connection_frame, text="Browse", command=self.browse_db).grid(
             row=0, column=3, padx=5
         )
+        tk.Checkbutton(
+            connection_frame,
+            text="Arbeitskopie mit Index",
+            variable=self.use_scratch_copy,
+        ).grid(row=0, column=4, sticky="w")
+        tk.Checkbutton(
+            connection_frame,
+            text="In RAM laden",
+            variable=self.use_ram_copy,
+        ).grid(row=0, column=5, sticky="w")
 
         tk.Radiobutton(
             connection_frame,
@@ -340,10 +4017,21 @@ class PlexGUI(tk.Tk):
         tk.Entry(connection_frame, textvariable=self.baseurl, width=40).grid(
             row=1, column=2, padx=5
         )
+        tk.Checkbutton(
+            connection_frame,
+            text="Lokaler Cache",
+            variable=self.use_live_cache,
+        ).grid(row=1, column=4, sticky="w")
         tk.Label(connection_frame, text="Token:").grid(row=2, column=1, sticky="e")
         tk.Entry(connection_frame, textvariable=self.token, width=40).grid(
             row=2, column=2, padx=5
         )
+        tk.Checkbutton(
+            connection_frame,
+            text="Profiling",
+            variable=self.profile_jobs,
+            command=self.toggle_profiling,
+        ).grid(row=2, column=4, sticky="w")
 
         tk.Button(connection_frame, text="Verbinden", command=self.connect_source).grid(
             row=3, column=2, pady=10
@@ -354,7 +4042,7 @@ class PlexGUI(tk.Tk):
         library_frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
 
         # Listbox für Mediatheken
-        self.library_list = tk.Listbox(library_frame, height=10)
+        self.library_list = tk.Listbox(library_frame, height=10, selectmode=tk.EXTENDED)
         self.library_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         # Scrollbar für Mediatheken
@@ -375,22 +4063,48 @@ class PlexGUI(tk.Tk):
         tk.Radiobutton(
             btn_frame, text="Serien (4)", variable=self.metadata_type, value=4
         ).pack(anchor="w")
+        format_frame = tk.Frame(btn_frame)
+        format_frame.pack(pady=(5, 0), anchor="w")
+        tk.Label(format_frame, text="Exportformat:").pack(side=tk.LEFT)
+        tk.OptionMenu(format_frame, self.export_format, *available_export_formats()).pack(
+            side=tk.LEFT
+        )
 
         tk.Button(
             btn_frame,
             text="Mediathek-Statistik anzeigen",
             command=self.show_library_stats,
         ).pack(pady=5)
+        tk.Button(
+            btn_frame,
+            text="Statistik-Dashboard",
+            command=self.show_stats_dashboard,
+        ).pack(pady=5)
+        tk.Button(
+            btn_frame, text="Einträge durchsuchen", command=self.show_item_browser
+        ).pack(pady=5)
+        tk.Button(
+            btn_frame, text="Suche (alle Mediatheken)", command=self.show_search
+        ).pack(pady=5)
         tk.Button(
             btn_frame, text="Mediathek exportieren", command=self.export_library
         ).pack(pady=5)
+        tk.Button(
+            btn_frame, text="Sammel-Export (alle/Auswahl)", command=self.export_libraries_bulk
+        ).pack(pady=5)
+        tk.Button(
+            btn_frame, text="Gesamtkatalog (mehrere Server)", command=self.show_multi_server
+        ).pack(pady=5)
+        tk.Button(
+            btn_frame, text="Speicher-Analyse exportieren", command=self.export_storage_report
+        ).pack(pady=5)
         tk.Button(
             btn_frame,
             text="Excel-Vergleich durchführen",
             command=self.open_compare_dialog,
         ).pack(pady=5)
         tk.Button(btn_frame, text="Hilfe / About", command=self.show_help).pack(pady=5)
-        tk.Button(btn_frame, text="Beenden", command=self.quit).pack(pady=5)
+        tk.Button(btn_frame, text="Beenden", command=self.on_close).pack(pady=5)
 
         # Frame für Text-Output
         text_output_frame = tk.Frame(self)
@@ -408,7 +4122,13 @@ class PlexGUI(tk.Tk):
             mode="determinate",
             variable=self.progress_var,
         )
-        self.progress_bar.pack(fill=tk.X, expand=True)
+        self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        tk.Button(progress_frame, text="Abbrechen", command=self.cancel_job).pack(
+            side=tk.LEFT, padx=(5, 0)
+        )
+        tk.Label(self, textvariable=self.job_status, anchor="w").pack(
+            fill=tk.X, padx=10, pady=(0, 5)
+        )
 
     def browse_db(self):
         db_file = filedialog.askopenfilename(
@@ -424,6 +4144,7 @@ class PlexGUI(tk.Tk):
 
         ctype = self.connection_type.get()
         logger.info(f"Ausgewählte Datenquelle: {ctype}")
+        self.release_memory_dbs()
 
         if ctype == "local":
             dbp = self.db_path.get()
@@ -432,24 +4153,30 @@ class PlexGUI(tk.Tk):
                 logger.warning("Kein DB-Pfad angegeben.")
                 return
             self.conn = connect_to_db(dbp)
-            self.plex = None
+            self.plex_client = None
+            self.db_file = dbp if self.conn else None
+            self.db_disk_file = self.db_file
             if self.conn:
                 self.load_libraries_local()
+                self.start_search_index(dbp)
+                if self.use_ram_copy.get():
+                    self.start_memory_copy(dbp, self.use_scratch_copy.get())
+                elif self.use_scratch_copy.get():
+                    self.start_scratch_copy(dbp)
         else:
-            if not PLEXAPI_AVAILABLE:
-                messagebox.showerror(
-                    "Fehler", "Für die Live-Verbindung ist plexapi erforderlich."
-                )
-                return
             base = self.baseurl.get()
             tok = self.token.get()
             if not base or not tok:
                 messagebox.showwarning("Warnung", "Bitte Base-URL und Token angeben.")
                 logger.warning("Base-URL oder Token fehlen für Live-Verbindung.")
                 return
-            self.plex = get_plex_server(base, tok)
             self.conn = None
-            if self.plex:
+            self.search_source = None
+            self.search_target = None
+            self.db_file = None
+            self.db_disk_file = None
+            self.plex_client = self.connect_live(base, tok)
+            if self.plex_client:
                 self.load_libraries_live()
         self.set_progress(100)
 
@@ -465,10 +4192,163 @@ class PlexGUI(tk.Tk):
             messagebox.showerror("Fehler", f"Konnte Mediatheken nicht laden: {e}")
             logger.error(f"Fehler beim Laden lokaler Mediatheken: {e}")
 
+    def start_scratch_copy(self, dbp: str):
+        # Arbeitskopie im Hintergrund anlegen; bis sie fertig ist, arbeiten
+        # Jobs direkt auf der Backup-DB
+        origin = source_fingerprint(dbp)
+
+        def done(path):
+            self.scratch_files.append(path)
+            self.copy_origins[path] = origin
+            if self.db_disk_file == dbp:
+                self.db_disk_file = path
+            if self.db_file == dbp:
+                self.db_file = path
+                self.text_output.insert(tk.END, "Arbeitskopie mit Index bereit.\n")
+            logger.info(f"Arbeitskopie bereit: {path}")
+
+        self.start_job(
+            "Arbeitskopie erstellen",
+            lambda progress: create_scratch_copy(dbp, progress=progress),
+            done,
+        )
+
+    def start_memory_copy(self, dbp: str, create_index: bool):
+        # DB im Hintergrund in den Arbeitsspeicher laden (bei Bedarf mit
+        # Zusatzindex); bis dahin arbeiten Jobs direkt auf der Datei
+        origin = source_fingerprint(dbp)
+
+        def done(result):
+            uri, keeper = result
+            self.memory_dbs.append(keeper)
+            self.copy_origins[uri] = origin
+            if self.db_file == dbp:
+                self.db_file = uri
+                self.text_output.insert(tk.END, "Datenbank in den Arbeitsspeicher geladen.\n")
+            logger.info(f"RAM-Kopie bereit: {uri}")
+
+        self.start_job(
+            "DB in RAM laden",
+            lambda progress: copy_db_to_memory(dbp, create_index, progress),
+            done,
+        )
+
+    def start_search_index(self, dbp: str):
+        # Index im Hintergrund prüfen bzw. neu aufbauen; nur wenn sich die
+        # DB-Datei geändert hat, wird tatsächlich neu indexiert
+        self.search_source = None
+        self.search_target = dbp
+
+        def done(rebuilt):
+            if self.search_target != dbp:
+                return
+            self.search_source = dbp
+            message = "Suchindex aufgebaut." if rebuilt else "Suchindex ist aktuell."
+            self.text_output.insert(tk.END, message + "\n")
+
+        def failed(e):
+            self.text_output.insert(tk.END, f"Suchindex nicht verfügbar: {e}\n")
+            logger.error(f"Fehler beim Aufbau des Suchindex: {e}")
+
+        self.start_job(
+            "Suchindex aufbauen",
+            lambda progress: build_search_index(dbp, progress=progress),
+            done,
+            failed,
+        )
+
+    def show_search(self):
+        if not self.search_source:
+            messagebox.showinfo(
+                "Info",
+                "Die Suche ist im DB-Modus verfügbar, sobald der Suchindex bereit ist.",
+            )
+            return
+        window = tk.Toplevel(self)
+        window.title("Suche (alle Mediatheken)")
+        window.geometry("850x550")
+
+        query = tk.StringVar()
+        status = tk.StringVar(value="Suchbegriff eingeben (Titel, Inhalt, Genre, Regie, Land).")
+        entry = tk.Entry(window, textvariable=query)
+        entry.pack(fill=tk.X, padx=10, pady=(10, 0))
+        tk.Label(window, textvariable=status, anchor="w").pack(fill=tk.X, padx=10)
+
+        columns = ("library", "type", "title", "year")
+        headings = ("Mediathek", "Typ", "Titel", "Jahr")
+        tree = ttk.Treeview(window, columns=columns, show="headings")
+        for col, heading in zip(columns, headings):
+            tree.heading(col, text=heading)
+            tree.column(col, width=360 if col == "title" else 120, anchor="w")
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        pending = {"after": None}
+
+        def run_search():
+            pending["after"] = None
+            tree.delete(*tree.get_children())
+            text = query.get()
+            if not make_search_query(text):
+                return
+            start = time.perf_counter()
+            try:
+                total, rows = search_catalogue(text)
+            except sqlite3.Error as e:
+                status.set(f"Suche fehlgeschlagen: {e}")
+                logger.error(f"Fehler bei der Suche nach {text!r}: {e}")
+                return
+            elapsed = (time.perf_counter() - start) * 1000
+            for item_id, lib_id, lib_name, mtype, title, year in rows:
+                tree.insert(
+                    "",
+                    tk.END,
+                    values=(
+                        f"{lib_id} - {lib_name}",
+                        METADATA_TYPE_NAMES.get(mtype, str(mtype)),
+                        title,
+                        year or "",
+                    ),
+                )
+            shown = f" (die ersten {len(rows)})" if total > len(rows) else ""
+            ranked = "" if total <= SEARCH_RANK_MAX_HITS else ", neueste zuerst"
+            status.set(f"{total} Treffer{shown}{ranked} in {elapsed:.1f} ms")
+
+        def on_change(*args):
+            # Erst suchen, wenn kurz nicht mehr getippt wurde
+            if pending["after"] is not None:
+                window.after_cancel(pending["after"])
+            pending["after"] = window.after(150, run_search)
+
+        query.trace_add("write", on_change)
+        entry.focus_set()
+
+    def release_memory_dbs(self):
+        # Bereits laufende Jobs behalten ihre eigene Verbindung zur RAM-Kopie
+        for keeper in self.memory_dbs:
+            keeper.close()
+        self.memory_dbs = []
+
+    def connect_live(self, base: str, tok: str) -> Optional[PlexHttpClient]:
+        logger.info("Versuche, Verbindung zum Plex-Server aufzubauen.")
+        client = None
+        try:
+            with TimingSpan("connect", source="live"):
+                client = PlexHttpClient(base, tok)
+                client.server_id()
+        except Exception as e:
+            if client:
+                client.close()
+            messagebox.showerror("Fehler", f"Verbindung zum Plex-Server fehlgeschlagen:\n{e}")
+            logger.error(f"Fehler bei Verbindung zum Plex-Server: {e}")
+            return None
+        self.live_clients.append(client)
+        logger.info("Verbindung zum Plex-Server hergestellt.")
+        return client
+
     def load_libraries_live(self):
         try:
-            sections = self.plex.library.sections()
-            data = [(s.key, s.title) for s in sections]
+            sections = self.plex_client.sections()
+            data = [(s.get("key"), s.get("title")) for s in sections]
             self.libraries_df = pd.DataFrame(data, columns=["id", "name"])
             self.text_output.insert(tk.END, "Mediatheken (Live) geladen.\n")
             for idx, row in self.libraries_df.iterrows():
@@ -478,125 +4358,663 @@ class PlexGUI(tk.Tk):
             messagebox.showerror("Fehler", f"Konnte Live-Mediatheken nicht laden: {e}")
             logger.error(f"Fehler beim Laden von Live-Mediatheken: {e}")
 
-    def show_library_stats(self):
-        self.set_progress(0)
-        self.text_output.delete("1.0", tk.END)
+    def get_selected_library(self):
         selection = self.library_list.curselection()
         if not selection:
+            return None
+        return self.parse_library_item(self.library_list.get(selection[0]))
+
+    def current_source(self):
+        # Quelle zum Zeitpunkt des Klicks festhalten; ein späteres "Verbinden"
+        # darf bereits eingereihte Jobs nicht umlenken
+        cache_path = LIVE_CACHE_FILE if self.use_live_cache.get() else None
+        return self.db_file, self.plex_client, cache_path
+
+    def result_key(self, source, kind: str, lib_id=None, mtype=None):
+        # Schlüssel für self.results; None, wenn der Stand der Quelle unbekannt ist.
+        # Live fragt das den Server, also nur im Worker-Thread aufrufen.
+        db_file, client, _ = source
+        origin = result_source_key(db_file, client, lib_id, self.copy_origins)
+        if origin is None:
+            return None
+        return (kind, origin, lib_id, mtype)
+
+    def cached_result(self, source, kind: str, lib_id, mtype, loader: Callable):
+        key = self.result_key(source, kind, lib_id, mtype)
+        if key is None:
+            return loader()
+        return self.results.load(key, loader)
+
+    def load_details(self, source, lib_id: int, mtype: int, progress: Optional[Callable]):
+        # Läuft im Worker-Thread und liefert die typisierten Rohdaten;
+        # lokale Jobs nutzen eine eigene DB-Verbindung
+        db_file, client, cache_path = source
+
+        def load():
+            if db_file:
+                conn = open_db(db_file)
+                try:
+                    return load_library_details(conn, lib_id, mtype, progress)
+                finally:
+                    conn.close()
+            if cache_path:
+                return load_library_details_cached(
+                    client, lib_id, mtype, cache_path, progress
+                )
+            return load_library_details_live(client, lib_id, mtype, progress)
+
+        return self.cached_result(source, "details", lib_id, mtype, load)
+
+    def load_statistics(self, source):
+        # (summary, monthly) der Statistik-Engine, nur DB-Modus
+        db_file = source[0]
+
+        def load():
+            conn = open_db(db_file)
+            try:
+                return get_library_statistics(conn)
+            finally:
+                conn.close()
+
+        return self.cached_result(source, "statistics", None, None, load)
+
+    def show_library_stats(self):
+        self.text_output.delete("1.0", tk.END)
+        selected = self.get_selected_library()
+        if not selected:
             messagebox.showinfo("Info", "Bitte eine Mediathek auswählen.")
             logger.info("Keine Mediathek ausgewählt.")
             return
-        idx = selection[0]
-        lib_id, lib_name = self.parse_library_item(self.library_list.get(idx))
+        lib_id, lib_name = selected
         self.selected_library = (lib_id, lib_name)
         mtype = self.metadata_type.get()
         logger.info(
             f"Zeige Statistik für Mediathek-ID: {lib_id}, Name: {lib_name}, Typ: {mtype}"
         )
 
-        if self.conn:  # Lokale DB
-            df = get_library_details(self.conn, lib_id, mtype)
-            # Für Statistik noch einmal numeric duration
-            query_for_stats = f"""
-            SELECT CAST(duration as INTEGER) as duration
-            FROM metadata_items
-            WHERE library_section_id = {lib_id}
-              AND metadata_type = {mtype}
-            """
-            df_stats = pd.read_sql_query(query_for_stats, self.conn)
-        else:
-            df = get_library_details_live(self.plex, lib_id, mtype)
-            df_stats = get_library_details_live_numeric(self.plex, lib_id, mtype)
+        source = self.current_source()
+        db_file, client, _ = source
+
+        def work(progress):
+            if mtype == PLEX_TYPE_EPISODE:  # Serien: Rollup über Episoden
+                shows, seasons = self.load_series_rollup(source, lib_id, progress)
+                if shows.empty:
+                    return None
+                return format_series_stats_text(lib_name, shows, seasons)
+            if db_file:  # Lokale DB: Statistik-Engine statt Detail-Join
+                summary, _ = self.load_statistics(source)
+                row = summary[
+                    (summary["library_section_id"] == lib_id)
+                    & (summary["metadata_type"] == mtype)
+                ]
+                if row.empty:
+                    return None
+                row = row.iloc[0]
+                return format_stats_text(
+                    lib_name, int(row["count"]), row["total_duration"], row["avg_rating"]
+                )
+            # Schon geladene Details (z. B. vom Export) weiterverwenden, sonst
+            # reicht ein gestreamtes Listing; der lokale Cache wird dafür
+            # nicht abgeglichen
+            key = self.result_key(source, "details", lib_id, mtype)
+            details = self.results.get(key) if key else None
+            if details is not None:
+                if details.empty:
+                    return None
+                ratings = details.items["audience_rating"]
+                return format_stats_text(
+                    lib_name,
+                    len(details),
+                    details.items["duration"].sum(),
+                    ratings.mean() if ratings.notna().any() else None,
+                )
+            stats = self.cached_result(
+                source,
+                "section_stats",
+                lib_id,
+                mtype,
+                lambda: client.section_stats(lib_id, mtype, progress),
+            )
+            if not stats["count"]:
+                return None
+            return format_stats_text(
+                lib_name, stats["count"], stats["total_duration"], stats["avg_rating"]
+            )
 
-        if df is None or df.empty or df_stats.empty:
-            self.text_output.insert(tk.END, f"Keine Daten für {lib_name}.\n")
-            logger.info("Keine Daten für diese Mediathek gefunden.")
+        def done(stats_text):
+            if stats_text is None:
+                self.text_output.insert(tk.END, f"Keine Daten für {lib_name}.\n")
+                logger.info("Keine Daten für diese Mediathek gefunden.")
+                return
+            self.text_output.insert(tk.END, stats_text)
+
+        self.start_job(f"Statistik {lib_name}", work, done)
+
+    def load_series_rollup(self, source, lib_id, progress):
+        # (shows, seasons) aus der lokalen DB oder per Episoden-Listing live;
+        # Statistik und Export einer Serien-Mediathek teilen sich das Ergebnis
+        db_file, client, _ = source
+
+        def load():
+            if db_file:
+                conn = open_db(db_file)
+                try:
+                    return get_series_rollup(conn, lib_id)
+                finally:
+                    conn.close()
+            return get_series_rollup_live(client, lib_id, progress)
+
+        return self.cached_result(source, "series", lib_id, PLEX_TYPE_EPISODE, load)
+
+    def show_stats_dashboard(self):
+        if not self.db_file:
+            messagebox.showinfo(
+                "Info", "Das Statistik-Dashboard ist nur im DB-Modus verfügbar."
+            )
             return
+        source = self.current_source()
+
+        def work(progress):
+            return self.load_statistics(source)
 
-        df_stats["duration"] = pd.to_numeric(df_stats["duration"], errors="coerce")
-        count = len(df_stats)
-        total_duration = df_stats["duration"].sum()
-        avg_duration = total_duration / count if count > 0 else 0
-        avg_duration_str = convert_ms_to_hhmm(avg_duration) if avg_duration > 0 else ""
-
-        avg_rating = None
-        if "audience_rating" in df.columns and df["audience_rating"].notnull().any():
-            # audience_rating zurück zu float
-            df["audience_rating_num"] = (
-                df["audience_rating"]
-                .str.replace(",", ".")
-                .astype(float, errors="ignore")
+        def done(result):
+            self.open_stats_dashboard(*result)
+
+        self.start_job("Statistik-Dashboard", work, done)
+
+    def open_stats_dashboard(self, summary: pd.DataFrame, monthly: pd.DataFrame):
+        window = tk.Toplevel(self)
+        window.title("Statistik-Dashboard")
+        window.geometry("850x550")
+
+        columns = ("library", "type", "count", "total", "avg", "rating")
+        headings = (
+            "Mediathek",
+            "Typ",
+            "Anzahl",
+            "Gesamtdauer",
+            "Ø Dauer",
+            "Ø Rating",
+        )
+        tree = ttk.Treeview(window, columns=columns, show="headings", height=12)
+        for col, heading in zip(columns, headings):
+            tree.heading(col, text=heading)
+            tree.column(col, width=120, anchor="w" if col == "library" else "e")
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 5))
+
+        rows = {}
+        for _, row in summary.iterrows():
+            total_h, total_m = divmod((int(row["total_duration"]) // 1000) // 60, 60)
+            avg = convert_ms_to_hhmm(row["avg_duration"]) if row["avg_duration"] > 0 else ""
+            rating = f"{row['avg_rating']:.2f}" if pd.notnull(row["avg_rating"]) else ""
+            mtype = int(row["metadata_type"])
+            item = tree.insert(
+                "",
+                tk.END,
+                values=(
+                    f"{row['library_section_id']} - {row['library_name']}",
+                    METADATA_TYPE_NAMES.get(mtype, str(mtype)),
+                    int(row["count"]),
+                    f"{total_h}h {total_m}m",
+                    avg,
+                    rating,
+                ),
             )
-            if df["audience_rating_num"].dtype == float:
-                avg_rating = df["audience_rating_num"].mean()
-
-        total_h, total_m = divmod((total_duration // 1000) // 60, 60)
-        stats_text = f"Mediathek: {lib_name}\n"
-        stats_text += f"Anzahl Inhalte: {count}\n"
-        stats_text += f"Gesamtdauer: {int(total_h)}h {int(total_m)}m\n"
-        stats_text += f"Durchschnittliche Dauer: {avg_duration_str}\n"
-        if avg_rating is not None:
-            stats_text += f"Durchschnittliches Rating: {avg_rating:.2f}\n"
-
-        self.text_output.insert(tk.END, stats_text)
-        self.set_progress(100)
+            rows[item] = (row["library_section_id"], mtype)
+
+        tk.Label(window, text="Neu hinzugefügt pro Monat (Auswahl oben):").pack(
+            anchor="w", padx=10
+        )
+        month_tree = ttk.Treeview(
+            window, columns=("month", "count"), show="headings", height=8
+        )
+        month_tree.heading("month", text="Monat")
+        month_tree.heading("count", text="Hinzugefügt")
+        month_tree.column("count", anchor="e")
+        month_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+
+        def on_select(event):
+            month_tree.delete(*month_tree.get_children())
+            selection = tree.selection()
+            if not selection:
+                return
+            lib_id, mtype = rows[selection[0]]
+            sub = monthly[
+                (monthly["library_section_id"] == lib_id)
+                & (monthly["metadata_type"] == mtype)
+            ].sort_values("month", ascending=False)
+            for _, row in sub.iterrows():
+                month_tree.insert("", tk.END, values=(row["month"], int(row["count"])))
+
+        tree.bind("<<TreeviewSelect>>", on_select)
+
+    def show_item_browser(self):
+        if not self.db_file:
+            messagebox.showinfo("Info", "Der Eintrags-Browser ist nur im DB-Modus verfügbar.")
+            return
+        selected = self.get_selected_library()
+        if not selected:
+            messagebox.showinfo("Info", "Bitte eine Mediathek auswählen.")
+            return
+        lib_id, lib_name = selected
+        self.open_item_browser(lib_id, lib_name, self.metadata_type.get())
+
+    def open_item_browser(self, lib_id: int, lib_name: str, mtype: int):
+        # Virtuelle Liste: der Treeview enthält nur die sichtbaren Zeilen, ein
+        # Puffer von höchstens BROWSER_BUFFER_ROWS Zeilen wird per Keyset
+        # nachgeladen. Eigene Verbindung, da die Sortierung als Job läuft.
+        conn = open_db(self.db_file, check_same_thread=False)
+        pager = KeysetPager(conn, lib_id, mtype)
+        visible = 25
+        state = {"top": 0, "buffer": [], "busy": False, "closed": False}
+
+        window = tk.Toplevel(self)
+        window.title(f"Einträge: {lib_name}")
+        window.geometry("950x600")
+
+        headings = {
+            "id": "ID",
+            "title": "Titel",
+            "year": "Jahr",
+            "added_at": "Hinzugefügt",
+            "duration": "Dauer",
+            "audience_rating": "Rating",
+            "studio": "Studio",
+        }
+        status = tk.StringVar(value="Sortiere ...")
+        tk.Label(window, textvariable=status, anchor="w").pack(fill=tk.X, padx=10, pady=(10, 0))
+        frame = tk.Frame(window)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        tree = ttk.Treeview(
+            frame, columns=BROWSER_COLUMNS, show="headings", height=visible, selectmode="browse"
+        )
+        for col in BROWSER_COLUMNS:
+            tree.heading(col, text=headings[col])
+            tree.column(col, width=320 if col == "title" else 100, anchor="w")
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar = tk.Scrollbar(frame, orient=tk.VERTICAL)
+        scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+
+        def fill(top: int):
+            # Puffer so verschieben, dass er die Zeilen top..top+visible enthält
+            buffer = state["buffer"]
+            buf_lo = buffer[0][0] - 1 if buffer else 0
+            buf_hi = buf_lo + len(buffer)
+            if not buffer or top + visible < buf_lo or top > buf_hi:
+                # Sprung (Scrollbalken, Pos1/Ende): Seite rund um top laden
+                buffer[:] = pager.page_at(top - BROWSER_PAGE_SIZE // 2)
+            while buffer and top < buffer[0][0] - 1:
+                buffer[:0] = pager.page_before(buffer[0][0])
+            while buffer and top + visible > buffer[-1][0] and buffer[-1][0] < pager.total:
+                buffer.extend(pager.page_after(buffer[-1][0]))
+            if len(buffer) > BROWSER_BUFFER_ROWS:
+                # Die vom sichtbaren Bereich weiter entfernte Seite verwerfen
+                if top - (buffer[0][0] - 1) > (buffer[-1][0] - 1) - top:
+                    del buffer[: len(buffer) - BROWSER_BUFFER_ROWS]
+                else:
+                    del buffer[BROWSER_BUFFER_ROWS:]
+
+        def render():
+            tree.delete(*tree.get_children())
+            total = pager.total
+            top = state["top"]
+            if total:
+                fill(top)
+                offset = top - (state["buffer"][0][0] - 1)
+                for row in state["buffer"][offset : offset + visible]:
+                    tree.insert("", tk.END, values=format_browser_row(row))
+                end = min(top + visible, total)
+                scrollbar.set(top / total, end / total)
+                arrow = "▼" if pager.descending else "▲"
+                status.set(
+                    f"Einträge {top + 1:,}–{end:,} von {total:,} | "
+                    f"sortiert nach {headings[pager.sort]} {arrow}".replace(",", ".")
+                )
+            else:
+                scrollbar.set(0, 1)
+                status.set("Keine Einträge.")
+
+        def scroll_to(top: int):
+            if state["busy"] or state["closed"]:
+                return
+            top = max(0, min(int(top), pager.total - visible))
+            if top != state["top"] or not tree.get_children():
+                state["top"] = top
+                render()
+
+        def on_scrollbar(*args):
+            if args[0] == "moveto":
+                scroll_to(float(args[1]) * pager.total)
+            elif args[0] == "scroll":
+                step = visible - 1 if args[2] == "pages" else 1
+                scroll_to(state["top"] + int(args[1]) * step)
+
+        def on_wheel(event):
+            # Windows/macOS liefern delta, X11 Button-4/5
+            if event.num == 4 or event.delta > 0:
+                scroll_to(state["top"] - 3)
+            else:
+                scroll_to(state["top"] + 3)
+            return "break"
+
+        keys = {
+            "<Prior>": lambda: state["top"] - (visible - 1),
+            "<Next>": lambda: state["top"] + (visible - 1),
+            "<Home>": lambda: 0,
+            "<End>": lambda: pager.total,
+        }
+        for key, target in keys.items():
+            window.bind(key, lambda event, target=target: scroll_to(target()))
+        scrollbar.config(command=on_scrollbar)
+        for widget in (tree, scrollbar):
+            widget.bind("<MouseWheel>", on_wheel)
+            widget.bind("<Button-4>", on_wheel)
+            widget.bind("<Button-5>", on_wheel)
+
+        def sort(col: str):
+            if state["busy"] or state["closed"]:
+                return
+            descending = not pager.descending if col == pager.sort else False
+            state["busy"] = True
+            status.set(f"Sortiere nach {headings[col]} ...")
+
+            def work(progress):
+                return pager.sort_by(col, descending)
+
+            def done(total):
+                state["busy"] = False
+                if state["closed"]:
+                    conn.close()
+                    return
+                state["buffer"] = []
+                state["top"] = 0
+                render()
+
+            def failed(e):
+                state["busy"] = False
+                if state["closed"]:
+                    conn.close()
+                    return
+                messagebox.showerror("Fehler", f"Sortierung fehlgeschlagen: {e}", parent=window)
+                logger.error(f"Fehler beim Sortieren im Eintrags-Browser: {e}")
+
+            self.start_job(f"Einträge sortieren ({lib_name})", work, done, failed)
+
+        for col in BROWSER_SORT_KEYS:
+            tree.heading(col, command=lambda col=col: sort(col))
+
+        def close():
+            state["closed"] = True
+            # Läuft noch eine Sortierung, schließt deren Callback die Verbindung
+            if not state["busy"]:
+                conn.close()
+            window.destroy()
+
+        window.protocol("WM_DELETE_WINDOW", close)
+        sort("title")
 
     def export_library(self):
-        self.set_progress(0)
-        selection = self.library_list.curselection()
-        if not selection:
+        selected = self.get_selected_library()
+        if not selected:
             messagebox.showinfo("Info", "Bitte eine Mediathek auswählen.")
             logger.info("Keine Mediathek zum Export ausgewählt.")
             return
-        idx = selection[0]
-        lib_id, lib_name = self.parse_library_item(self.library_list.get(idx))
+        lib_id, lib_name = selected
         mtype = self.metadata_type.get()
         logger.info(
             f"Exportiere Mediathek-ID: {lib_id}, Name: {lib_name}, Typ: {mtype}"
         )
 
-        if self.conn:  # Lokale DB
-            df = get_library_details(self.conn, lib_id, mtype)
-        else:
-            df = get_library_details_live(self.plex, lib_id, mtype)
-
-        if df is None or df.empty:
-            messagebox.showinfo("Info", f"Keine Daten für {lib_name} zum Export.")
-            logger.info("Keine Daten zum Export.")
-            return
-
-        # Benutzer wählt Speicherort
+        # Benutzer wählt Speicherort (vor dem Laden, damit der Job ohne Dialog durchläuft).
+        # Das Format folgt der Endung, ohne bekannte Endung der Voreinstellung.
+        fmt = self.export_format.get()
         save_path = filedialog.asksaveasfilename(
-            title="Speicherort für Excel wählen",
-            defaultextension=".xlsx",
-            filetypes=[("Excel Files", "*.xlsx"), ("All Files", "*.*")],
+            title="Speicherort für Export wählen",
+            defaultextension=fmt,
+            filetypes=export_filetypes(fmt),
         )
 
         if not save_path:
             logger.info("Benutzer hat den Speichern-Dialog abgebrochen.")
             return
+        fmt = export_format(save_path, fmt)
 
-        # Normaler Export
-        try:
-            df.to_excel(save_path, index=False)
-            messagebox.showinfo("Erfolg", f"Export abgeschlossen: {save_path}")
+        source = self.current_source()
+        db_file = source[0]
+
+        def work(progress):
+            extra_sheets = None
+            if mtype == PLEX_TYPE_EPISODE:
+                # Serien-Export: zusätzlich Blätter mit Serien- und Staffel-Summen
+                shows, seasons = self.load_series_rollup(
+                    source, lib_id, scaled_progress(progress, 0, 20)
+                )
+                shows, seasons = format_series_rollup(shows, seasons)
+                extra_sheets = {"Serien": shows, "Staffeln": seasons}
+                progress = scaled_progress(progress, 20, 100)
+            if db_file:
+                # Lokale DB: streamend exportieren, konstanter Speicherbedarf
+                conn = open_db(db_file)
+                try:
+                    written = export_library_details_streaming(
+                        conn,
+                        lib_id,
+                        mtype,
+                        save_path,
+                        scaled_progress(progress, 0, 95),
+                        extra_sheets=extra_sheets,
+                        fmt=fmt,
+                    )
+                finally:
+                    conn.close()
+                if not written:
+                    return None
+            else:
+                raw = self.load_details(
+                    source, lib_id, mtype, scaled_progress(progress, 0, 60)
+                )
+                if raw is None or raw.empty:
+                    return None
+                progress(60, f"Schreibe {os.path.basename(save_path)} ...")
+                # Tags werden erst hier, je Block, wieder zu "|"-Texten
+                chunks = (format_library_details(chunk) for chunk in raw.frames())
+                write_export(
+                    save_path,
+                    chunks,
+                    len(raw),
+                    scaled_progress(progress, 60, 95),
+                    extra_sheets=extra_sheets,
+                    fmt=fmt,
+                )
             logger.info(f"Export erfolgreich: {save_path}")
-        except Exception as e:
+
+            # Zusätzlich in C:\PLEXport\ mit Datum/Zeit Prefix speichern
+            progress(95, "Schreibe Sicherungskopie ...")
+            try:
+                backup_path = backup_to_base_dir(
+                    save_path, export_extra_paths(save_path, extra_sheets, fmt)
+                )
+                logger.info(f"Zusätzlicher Export in {backup_path}")
+            except Exception as e:
+                logger.error(f"Fehler beim Backup-Export: {e}")
+            return save_path
+
+        def done(path):
+            if path is None:
+                messagebox.showinfo("Info", f"Keine Daten für {lib_name} zum Export.")
+                logger.info("Keine Daten zum Export.")
+                return
+            messagebox.showinfo("Erfolg", f"Export abgeschlossen: {path}")
+
+        def failed(e):
             messagebox.showerror("Fehler", f"Fehler beim Export: {e}")
             logger.error(f"Fehler beim Export: {e}")
+
+        self.start_job(f"Export {lib_name}", work, done, failed)
+
+    def export_storage_report(self):
+        if not self.db_file:
+            messagebox.showinfo("Info", "Die Speicher-Analyse ist nur im DB-Modus verfügbar.")
+            return
+        selected = self.get_selected_library()
+        if not selected:
+            messagebox.showinfo("Info", "Bitte eine Mediathek auswählen.")
             return
+        lib_id, lib_name = selected
+        save_path = filedialog.asksaveasfilename(
+            title="Speicherort für die Speicher-Analyse wählen",
+            defaultextension=".xlsx",
+            filetypes=[("Excel Files", "*.xlsx"), ("All Files", "*.*")],
+        )
+        if not save_path:
+            return
+        db_file = self.db_file
+        logger.info(f"Speicher-Analyse für Mediathek-ID: {lib_id}, Name: {lib_name}")
 
-        # Zusätzlich in C:\PLEXport\ mit Datum/Zeit Prefix speichern
-        now_str = datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
-        filename = f"{now_str}_{os.path.basename(save_path)}"
-        backup_path = os.path.join(BASE_DIR, filename)
-        try:
-            df.to_excel(backup_path, index=False)
-            logger.info(f"Zusätzlicher Export in {backup_path}")
-        except Exception as e:
-            logger.error(f"Fehler beim Backup-Export: {e}")
+        def work(progress):
+            conn = open_db(db_file)
+            try:
+                if not has_storage_tables(conn):
+                    return None
+                report = get_storage_report(
+                    conn, lib_id, progress=scaled_progress(progress, 0, 80)
+                )
+            finally:
+                conn.close()
+            if not report["files"]:
+                return None
+            progress(80, f"Schreibe {os.path.basename(save_path)} ...")
+            write_excel_sheets(
+                save_path, format_storage_sheets(report), scaled_progress(progress, 80, 100)
+            )
+            logger.info(f"Speicher-Analyse exportiert: {save_path}")
+            return format_storage_text(lib_name, report)
 
-        self.set_progress(100)
+        def done(stats_text):
+            if stats_text is None:
+                messagebox.showinfo(
+                    "Info", f"Keine Dateiinformationen (media_parts) für {lib_name}."
+                )
+                return
+            self.text_output.insert(tk.END, stats_text)
+            messagebox.showinfo("Erfolg", f"Speicher-Analyse gespeichert: {save_path}")
+
+        def failed(e):
+            messagebox.showerror("Fehler", f"Fehler bei der Speicher-Analyse: {e}")
+            logger.error(f"Fehler bei der Speicher-Analyse: {e}")
+
+        self.start_job(f"Speicher-Analyse {lib_name}", work, done, failed)
+
+    def export_libraries_bulk(self):
+        if not self.db_disk_file:
+            messagebox.showinfo("Info", "Der Sammel-Export ist nur im DB-Modus verfügbar.")
+            return
+        # Auswahl in der Liste, sonst alle Mediatheken
+        indices = self.library_list.curselection() or range(self.library_list.size())
+        libraries = [self.parse_library_item(self.library_list.get(i)) for i in indices]
+        if not libraries:
+            messagebox.showinfo("Info", "Keine Mediatheken geladen.")
+            return
+        out_dir = filedialog.askdirectory(title="Zielordner für den Sammel-Export wählen")
+        if not out_dir:
+            return
+        db_path = self.db_disk_file
+        mtype = self.metadata_type.get()
+        fmt = self.export_format.get()
+        logger.info(
+            f"Sammel-Export von {len(libraries)} Mediatheken (Typ {mtype}, {fmt}) nach {out_dir}"
+        )
+
+        def work(progress):
+            result = export_libraries_bulk(
+                db_path, libraries, mtype, out_dir, scaled_progress(progress, 0, 95), fmt=fmt
+            )
+            progress(95, "Schreibe Sicherungskopien ...")
+            for r in result["sections"]:
+                if r["path"]:
+                    try:
+                        backup_to_base_dir(r["path"], r["extra_paths"])
+                    except Exception as e:
+                        logger.error(f"Fehler beim Backup-Export: {e}")
+            return result
+
+        def done(result):
+            summary = format_bulk_summary(result)
+            self.text_output.insert(tk.END, summary)
+            logger.info(summary)
+
+        self.start_job(f"Sammel-Export ({len(libraries)} Mediatheken)", work, done)
+
+    def show_multi_server(self):
+        window = tk.Toplevel(self)
+        window.title("Gesamtkatalog mehrerer Plex-Server")
+        window.geometry("700x320")
+        tk.Label(
+            window,
+            text=(
+                "Ein Server je Zeile: Base-URL Token [Name]. Der Katalog enthält jeden "
+                "Eintrag (guid) einmal,\nmit den Servern, auf denen er liegt. Mediatyp "
+                "und Exportformat wie im Hauptfenster."
+            ),
+            justify=tk.LEFT,
+            anchor="w",
+        ).pack(fill=tk.X, padx=10, pady=(10, 0))
+        server_text = ScrolledText(window, height=8)
+        server_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        server_text.insert("1.0", f"{self.baseurl.get()} {self.token.get()}\n")
+
+        def export():
+            try:
+                servers = parse_server_list(server_text.get("1.0", tk.END))
+            except ValueError as e:
+                messagebox.showerror("Fehler", str(e), parent=window)
+                return
+            if not servers:
+                messagebox.showinfo("Info", "Bitte mindestens einen Server angeben.", parent=window)
+                return
+            mtype = self.metadata_type.get()
+            fmt = self.export_format.get()
+            save_path = filedialog.asksaveasfilename(
+                parent=window,
+                title="Speicherort für den Gesamtkatalog wählen",
+                defaultextension=fmt,
+                filetypes=export_filetypes(fmt),
+            )
+            if not save_path:
+                return
+            fmt = export_format(save_path, fmt)
+            logger.info(f"Gesamtkatalog von {len(servers)} Servern (Typ {mtype}) nach {save_path}")
+
+            def work(progress):
+                catalogue, summary = build_multi_server_catalogue(
+                    servers, mtype, scaled_progress(progress, 0, 80)
+                )
+                progress(80, f"Schreibe {os.path.basename(save_path)} ...")
+                chunks = (
+                    format_library_details(catalogue.iloc[i : i + READ_CHUNK_SIZE])
+                    for i in range(0, len(catalogue), READ_CHUNK_SIZE)
+                )
+                write_export(
+                    save_path, chunks, len(catalogue), scaled_progress(progress, 80, 95), fmt=fmt
+                )
+                progress(95, "Schreibe Sicherungskopie ...")
+                try:
+                    backup_to_base_dir(save_path)
+                except Exception as e:
+                    logger.error(f"Fehler beim Backup-Export: {e}")
+                return format_catalogue_summary(catalogue, summary)
+
+            def done(text):
+                self.text_output.insert(tk.END, text + f"Gespeichert: {save_path}\n")
+                logger.info(text)
+
+            window.destroy()
+            self.start_job(f"Gesamtkatalog ({len(servers)} Server)", work, done)
+
+        buttons = tk.Frame(window)
+        buttons.pack(pady=(0, 10))
+        tk.Button(buttons, text="Katalog exportieren", command=export).pack(side=tk.LEFT, padx=5)
+        tk.Button(buttons, text="Schließen", command=window.destroy).pack(side=tk.LEFT, padx=5)
 
     def parse_library_item(self, item: str):
         # Format: "id - name"
@@ -606,16 +5024,23 @@ class PlexGUI(tk.Tk):
         return lib_id, lib_name
 
     def open_compare_dialog(self):
-        self.set_progress(0)
         file1 = filedialog.askopenfilename(
             title="Excel-Datei 1 wählen",
-            filetypes=[("Excel Files", "*.xlsx"), ("All Files", "*.*")],
+            filetypes=[
+                ("Excel Files", "*.xlsx"),
+                ("Snapshots", "*.feather"),
+                ("All Files", "*.*"),
+            ],
         )
         if not file1:
             return
         file2 = filedialog.askopenfilename(
             title="Excel-Datei 2 wählen",
-            filetypes=[("Excel Files", "*.xlsx"), ("All Files", "*.*")],
+            filetypes=[
+                ("Excel Files", "*.xlsx"),
+                ("Snapshots", "*.feather"),
+                ("All Files", "*.*"),
+            ],
         )
         if not file2:
             return
@@ -627,29 +5052,118 @@ class PlexGUI(tk.Tk):
         if not output_file:
             return
 
-        compare_excel_files(file1, file2, output_file)
-        messagebox.showinfo(
-            "Fertig", f"Vergleich abgeschlossen.\nErgebnis: {output_file}"
+        def work(progress):
+            compare_excel_files(
+                file1, file2, output_file, scaled_progress(progress, 0, 95), cache=self.results
+            )
+            # Zusätzlich in C:\PLEXport\ mit Datum/Zeit Prefix speichern
+            progress(95, "Schreibe Sicherungskopie ...")
+            try:
+                backup_path = backup_to_base_dir(output_file)
+                logger.info(f"Backup des Vergleichs unter {backup_path}")
+            except Exception as e:
+                logger.error(f"Fehler beim Backup des Vergleichs: {e}")
+            return output_file
+
+        def done(path):
+            messagebox.showinfo("Fertig", f"Vergleich abgeschlossen.\nErgebnis: {path}")
+
+        self.start_job("Excel-Vergleich", work, done)
+
+    # -----------------------------------------------------------------------
+    # Job-Steuerung
+    # -----------------------------------------------------------------------
+    def on_window_ready(self):
+        # Fenster ist gezeichnet: Startzeit gegen das Budget prüfen, danach die
+        # schweren Module im Hintergrund vorladen
+        self.update_idletasks()
+        self.startup_seconds = time.perf_counter() - STARTUP_T0
+        record_timing("startup", self.startup_seconds, budget=STARTUP_BUDGET_SECONDS)
+        message = (
+            f"Start bis Fenster: {self.startup_seconds:.3f}s "
+            f"(Budget {STARTUP_BUDGET_SECONDS:.1f}s)"
         )
-        # Zusätzlich in C:\PLEXport\ mit Datum/Zeit Prefix speichern
-        now_str = datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
-        backup_filename = f"{now_str}_{os.path.basename(output_file)}"
-        backup_path = os.path.join(BASE_DIR, backup_filename)
-        try:
-            # Kopie der Vergleichsdatei erstellen
-            df_in1_not_in2 = pd.read_excel(output_file, sheet_name="In1NichtIn2")
-            df_in2_not_in1 = pd.read_excel(output_file, sheet_name="In2NichtIn1")
-            df_inboth = pd.read_excel(output_file, sheet_name="InBeiden")
-
-            with pd.ExcelWriter(backup_path) as writer:
-                df_in1_not_in2.to_excel(writer, sheet_name="In1NichtIn2", index=False)
-                df_in2_not_in1.to_excel(writer, sheet_name="In2NichtIn1", index=False)
-                df_inboth.to_excel(writer, sheet_name="InBeiden", index=False)
-            logger.info(f"Backup des Vergleichs unter {backup_path}")
-        except Exception as e:
-            logger.error(f"Fehler beim Backup des Vergleichs: {e}")
+        if self.startup_seconds > STARTUP_BUDGET_SECONDS:
+            logger.warning(message + " überschritten")
+        else:
+            logger.info(message)
+        warm_up_imports()
 
-        self.set_progress(100)
+    def toggle_profiling(self):
+        self.jobs.profile = self.profile_jobs.get()
+        state = "aktiv" if self.jobs.profile else "aus"
+        logger.info(f"Profiling {state} (Berichte in {BASE_DIR})")
+
+    def start_job(
+        self, name: str, func: Callable, on_done: Callable, on_error: Callable = None
+    ) -> Job:
+        job = self.jobs.submit(name, func, on_done, on_error)
+        self.text_output.insert(tk.END, f"Job eingereiht: {name}\n")
+        self.update_job_status()
+        return job
+
+    def poll_jobs(self):
+        for kind, job, payload in self.jobs.poll():
+            if kind == "started" and self.active_job is None:
+                self.active_job = job
+                self.set_progress(0)
+            elif kind == "progress" and job is self.active_job:
+                percent, message = payload
+                self.progress_var.set(int(percent))
+                if message:
+                    self.job_message = message
+            elif kind == "done":
+                if job.on_done:
+                    job.on_done(payload)
+            elif kind == "error":
+                if job.on_error:
+                    job.on_error(payload)
+                else:
+                    messagebox.showerror("Fehler", f"{job.name} fehlgeschlagen:\n{payload}")
+            elif kind == "cancelled":
+                self.text_output.insert(tk.END, f"Job abgebrochen: {job.name}\n")
+
+            if kind in ("done", "error", "cancelled"):
+                if job is self.active_job:
+                    self.progress_var.set(100 if kind == "done" else 0)
+                    running = [j for j in self.jobs.running() if j is not job]
+                    self.active_job = running[0] if running else None
+                self.job_message = ""
+        self.update_job_status()
+        self.after(100, self.poll_jobs)
+
+    def update_job_status(self):
+        pending = len(self.jobs.pending())
+        if self.active_job is not None:
+            text = f"Läuft: {self.active_job.name}"
+            if self.job_message:
+                text += f" - {self.job_message}"
+        else:
+            text = "Bereit."
+        if pending:
+            text += f" | Wartend: {pending}"
+        self.job_status.set(text)
+
+    def cancel_job(self):
+        if self.active_job is not None:
+            logger.info(f"Abbruch angefordert: {self.active_job.name}")
+            self.active_job.cancel()
+        elif self.jobs.pending():
+            self.jobs.pending()[-1].cancel()
+
+    def on_close(self):
+        logger.info(f"Ergebnis-Cache: {self.results.summary()}")
+        self.jobs.shutdown()
+        self.release_memory_dbs()
+        for client in self.live_clients:
+            logger.info(f"Live-Zugriff {client.baseurl}: {client.summary()}")
+            client.close()
+        for path in self.scratch_files:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Arbeitskopie {path} konnte nicht gelöscht werden: {e}")
+        self.destroy()
 
     def show_help(self):
         help_text = """## Plex Datenbank herunterladen
@@ -678,6 +5192,24 @@ Copyright by sp23 feat. ChatGPT o1
         self.update_idletasks()
 
 
-if __name__ == "__main__":
+def main(argv: List[str] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    setup_environment()
     app = PlexGUI()
+    if "--startup-check" in argv:
+        # Nur Fenster zeichnen, Startzeit gegen das Budget prüfen und beenden
+        app.after_idle(lambda: app.after(0, app.destroy))
+        app.mainloop()
+        seconds = app.startup_seconds or float("inf")
+        ok = seconds <= STARTUP_BUDGET_SECONDS
+        print(
+            f"Start bis Fenster: {seconds:.3f}s "
+            f"(Budget {STARTUP_BUDGET_SECONDS:.1f}s): {'OK' if ok else 'überschritten'}"
+        )
+        return 0 if ok else 1
     app.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,645 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import quoteattr
+
+import pandas as pd
+
+import PLEXport
+
+# ---------------------------------------------------------------------------
+# Benchmark für die Export-Pfade von PLEXport
+#
+#   python benchmark.py --size 100k                 # messen, mit Baseline vergleichen
+#   python benchmark.py --size 10k 100k --save      # Baseline neu schreiben
+#   python benchmark.py --generate plex.db --size 1M  # nur Test-DB erzeugen
+#   python benchmark.py --size 100k --case write_xlsx write_csv write_jsonl write_parquet
+#   python benchmark.py --size 100k --case live --live-latency 0.05
+#
+# Die Test-DBs werden synthetisch erzeugt (Schema wie die Plex-Sicherung,
+# soweit PLEXport es liest) und im Arbeitsordner zwischengespeichert.
+# ---------------------------------------------------------------------------
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+# Ab dieser relativen Verschlechterung gilt ein Fall als Regression
+DEFAULT_TOLERANCE = 0.25
+# Bei Änderungen am Generator erhöhen, damit zwischengespeicherte DBs neu entstehen
+GENERATOR_VERSION = 1
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000}
+
+SCHEMA = """
+CREATE TABLE library_sections (
+    id INTEGER PRIMARY KEY, library_id INTEGER, name VARCHAR(255), name_sort VARCHAR(255),
+    section_type INTEGER, language VARCHAR(255), agent VARCHAR(255), scanner VARCHAR(255),
+    created_at DATETIME, updated_at DATETIME, scanned_at DATETIME, uuid VARCHAR(255)
+);
+CREATE TABLE metadata_items (
+    id INTEGER PRIMARY KEY, library_section_id INTEGER, parent_id INTEGER, metadata_type INTEGER,
+    guid VARCHAR(255), media_item_count INTEGER, title VARCHAR(255), title_sort VARCHAR(255),
+    original_title VARCHAR(255), studio VARCHAR(255), rating FLOAT, rating_count INTEGER,
+    tagline VARCHAR(255), summary TEXT, trivia TEXT, quotes TEXT, content_rating VARCHAR(255),
+    content_rating_age INTEGER, "index" INTEGER, absolute_index INTEGER, duration INTEGER,
+    user_thumb_url VARCHAR(255), user_art_url VARCHAR(255), user_banner_url VARCHAR(255),
+    user_music_url VARCHAR(255), user_fields VARCHAR(255), tags_genre VARCHAR(255),
+    tags_collection VARCHAR(255), tags_director VARCHAR(255), tags_writer VARCHAR(255),
+    tags_star VARCHAR(255), originally_available_at DATETIME, available_at DATETIME,
+    expires_at DATETIME, refreshed_at DATETIME, year INTEGER, added_at DATETIME,
+    created_at DATETIME, updated_at DATETIME, deleted_at DATETIME, tags_country VARCHAR(255),
+    extra_data VARCHAR(255), hash VARCHAR(255), audience_rating FLOAT, changed_at INTEGER(8),
+    resources_changed_at INTEGER(8), remote INTEGER, edition_title VARCHAR(255)
+);
+CREATE INDEX index_metadata_items_on_library_section_id ON metadata_items (library_section_id);
+CREATE INDEX index_metadata_items_on_parent_id ON metadata_items (parent_id);
+CREATE INDEX index_metadata_items_on_metadata_type ON metadata_items (metadata_type);
+CREATE INDEX index_metadata_items_on_guid ON metadata_items (guid);
+CREATE INDEX index_metadata_items_on_added_at ON metadata_items (added_at);
+CREATE TABLE tags (
+    id INTEGER PRIMARY KEY, metadata_item_id INTEGER, tag VARCHAR(255), tag_type INTEGER,
+    user_thumb_url VARCHAR(255), user_art_url VARCHAR(255), user_music_url VARCHAR(255),
+    created_at DATETIME, updated_at DATETIME, tag_value INTEGER, extra_data VARCHAR(255),
+    key VARCHAR(255), parent_id INTEGER
+);
+CREATE INDEX index_tags_on_tag ON tags (tag);
+CREATE INDEX index_tags_on_tag_type ON tags (tag_type);
+CREATE TABLE taggings (
+    id INTEGER PRIMARY KEY, metadata_item_id INTEGER, tag_id INTEGER, "index" INTEGER,
+    text VARCHAR(255), time_offset INTEGER, end_time_offset INTEGER, thumb_url VARCHAR(255),
+    created_at DATETIME, extra_data VARCHAR(255)
+);
+CREATE INDEX index_taggings_on_metadata_item_id ON taggings (metadata_item_id);
+CREATE INDEX index_taggings_on_tag_id ON taggings (tag_id);
+CREATE TABLE media_items (
+    id INTEGER PRIMARY KEY, library_section_id INTEGER, section_location_id INTEGER,
+    metadata_item_id INTEGER, type_id INTEGER, width INTEGER, height INTEGER, size INTEGER(8),
+    duration INTEGER, bitrate INTEGER, container VARCHAR(255), video_codec VARCHAR(255),
+    audio_codec VARCHAR(255), display_aspect_ratio FLOAT, frames_per_second FLOAT,
+    audio_channels INTEGER, interlaced BOOLEAN, source VARCHAR(255), hints VARCHAR(255),
+    display_offset INTEGER, settings VARCHAR(255), created_at DATETIME, updated_at DATETIME,
+    optimized_for_streaming BOOLEAN, deleted_at DATETIME, media_analysis_version INTEGER,
+    sample_aspect_ratio FLOAT, extra_data VARCHAR(255), proxy_type INTEGER,
+    channel_id INTEGER, begins_at DATETIME, ends_at DATETIME, color_trc VARCHAR(255)
+);
+CREATE INDEX index_media_items_on_library_section_id ON media_items (library_section_id);
+CREATE INDEX index_media_items_on_metadata_item_id ON media_items (metadata_item_id);
+CREATE TABLE media_parts (
+    id INTEGER PRIMARY KEY, media_item_id INTEGER, directory_id INTEGER, hash VARCHAR(255),
+    open_subtitle_hash VARCHAR(255), file VARCHAR(255), "index" INTEGER, size INTEGER(8),
+    duration INTEGER, created_at DATETIME, updated_at DATETIME, deleted_at DATETIME,
+    extra_data VARCHAR(255)
+);
+CREATE INDEX index_media_parts_on_media_item_id ON media_parts (media_item_id);
+CREATE INDEX index_media_parts_on_file ON media_parts (file);
+"""
+
+# Tag-Bestand und Tags je Eintrag (tag_type, Anzahl Tags, Tags je Eintrag)
+TAG_POOLS = [
+    (1, 30, 3),  # Genre
+    (4, 20_000, 1),  # Regie
+    (5, 200, 2),  # Land
+    (6, 200_000, 10),  # Darsteller
+]
+
+
+# ---------------------------------------------------------------------------
+# Generator
+# ---------------------------------------------------------------------------
+def generate_db(path: str, items: int, seed: int = 1) -> str:
+    # Bibliothek 1: `items` Filme; Bibliothek 2: Serien mit ca. items/10
+    # Episoden (3 Staffeln à 10 Episoden je Serie). Alles per SQL erzeugt,
+    # damit auch 1M Einträge in vertretbarer Zeit entstehen.
+    if os.path.exists(path):
+        os.remove(path)
+    shows = max(items // 300, 1)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.executescript(SCHEMA)
+    # random() von SQLite ist nicht seedbar; ein LCG über die id hält die
+    # Daten reproduzierbar
+    conn.create_function("h", 2, lambda i, k: ((i * 2654435761 + k * 40503 + seed) % 4294967296), deterministic=True)
+    conn.executescript(
+        f"""
+        INSERT INTO library_sections (id, library_id, name, section_type, agent, scanner, created_at, updated_at)
+        VALUES (1, 1, 'Filme', 1, 'tv.plex.agents.movie', 'Plex Movie', '2020-01-01 00:00:00', '2024-01-01 00:00:00'),
+               (2, 2, 'Serien', 2, 'tv.plex.agents.series', 'Plex TV Series', '2020-01-01 00:00:00', '2024-01-01 00:00:00');
+
+        WITH RECURSIVE s(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM s WHERE i < {items})
+        INSERT INTO metadata_items (
+            id, library_section_id, parent_id, metadata_type, guid, media_item_count, title,
+            title_sort, studio, summary, duration, year, added_at, created_at, updated_at,
+            audience_rating, content_rating
+        )
+        SELECT i, 1, NULL, 1, 'plex://movie/' || printf('%024x', h(i, 1)), 1, 'Film ' || i,
+               'film ' || i,
+               CASE WHEN h(i, 2) % 10 = 0 THEN NULL ELSE 'Studio ' || (h(i, 2) % 500) END,
+               'Zusammenfassung ' || i || ' lorem ipsum dolor sit amet, consectetur adipiscing elit.',
+               CASE WHEN h(i, 3) % 20 = 0 THEN NULL ELSE 3600000 + h(i, 3) % 7200000 END,
+               CASE WHEN h(i, 4) % 25 = 0 THEN NULL ELSE 1950 + h(i, 4) % 75 END,
+               1262304000 + h(i, 5) % 470000000, 1262304000, 1700000000 + h(i, 6) % 10000000,
+               CASE WHEN h(i, 7) % 8 = 0 THEN NULL ELSE (h(i, 7) % 100) / 10.0 END,
+               'FSK ' || (h(i, 8) % 4 * 6)
+        FROM s;
+
+        WITH RECURSIVE s(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM s WHERE i < {shows} - 1)
+        INSERT INTO metadata_items (id, library_section_id, metadata_type, guid, title, title_sort, studio, year, added_at, updated_at, audience_rating)
+        SELECT {items} + 1 + i * 34, 2, 2, 'plex://show/' || printf('%024x', h(i, 11)), 'Serie ' || i,
+               'serie ' || i, 'Sender ' || (i % 40), 1990 + i % 35, 1262304000 + h(i, 12) % 470000000,
+               1700000000, (h(i, 13) % 100) / 10.0
+        FROM s;
+
+        WITH RECURSIVE s(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM s WHERE i < {shows} * 3 - 1)
+        INSERT INTO metadata_items (id, library_section_id, parent_id, metadata_type, title, "index", added_at, updated_at)
+        SELECT {items} + 1 + (i / 3) * 34 + 1 + (i % 3) * 11, 2, {items} + 1 + (i / 3) * 34, 3,
+               'Staffel ' || (i % 3 + 1), i % 3 + 1, 1262304000, 1700000000
+        FROM s;
+
+        WITH RECURSIVE s(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM s WHERE i < {shows} * 30 - 1)
+        INSERT INTO metadata_items (id, library_section_id, parent_id, metadata_type, title, "index", duration, year, added_at, updated_at, audience_rating)
+        SELECT {items} + 1 + (i / 30) * 34 + 1 + ((i / 10) % 3) * 11 + 1 + i % 10, 2,
+               {items} + 1 + (i / 30) * 34 + 1 + ((i / 10) % 3) * 11, 4,
+               'Episode ' || (i % 10 + 1), i % 10 + 1, 1200000 + h(i, 14) % 2400000,
+               1990 + (i / 30) % 35, 1262304000 + h(i, 15) % 470000000, 1700000000,
+               CASE WHEN h(i, 16) % 3 = 0 THEN NULL ELSE (h(i, 16) % 100) / 10.0 END
+        FROM s;
+        """
+    )
+
+    first_tag = 1
+    for tag_type, count, _ in TAG_POOLS:
+        conn.execute(
+            f"""
+            WITH RECURSIVE s(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM s WHERE i < {count} - 1)
+            INSERT INTO tags (id, tag, tag_type, created_at)
+            SELECT {first_tag} + i, 'Tag {tag_type}-' || i, {tag_type}, '2020-01-01 00:00:00' FROM s
+            """
+        )
+        first_tag += count
+    # Taggings wie bei Plex eintragsweise, Filme und Serien (nicht Staffeln/Episoden)
+    first_tag = 1
+    for tag_type, count, per_item in TAG_POOLS:
+        conn.execute(
+            f"""
+            WITH RECURSIVE k(j) AS (SELECT 0 UNION ALL SELECT j + 1 FROM k WHERE j < {per_item} - 1)
+            INSERT INTO taggings (metadata_item_id, tag_id, "index", created_at)
+            SELECT mi.id, {first_tag} + h(mi.id, 100 + {tag_type} * 16 + k.j) % {count}, k.j, '2020-01-01 00:00:00'
+            FROM metadata_items mi, k
+            WHERE mi.metadata_type IN (1, 2)
+            """
+        )
+        first_tag += count
+
+    conn.executescript(
+        """
+        INSERT INTO media_items (
+            id, library_section_id, metadata_item_id, type_id, width, height, size, duration,
+            bitrate, container, video_codec, audio_codec, audio_channels, created_at, updated_at
+        )
+        SELECT mi.id, mi.library_section_id, mi.id, 1,
+               CASE h(mi.id, 20) % 6 WHEN 0 THEN 3840 WHEN 1 THEN 3840 WHEN 2 THEN 1920
+                    WHEN 3 THEN 1920 WHEN 4 THEN 1280 ELSE 720 END,
+               CASE h(mi.id, 20) % 6 WHEN 0 THEN 2160 WHEN 1 THEN 1600 WHEN 2 THEN 1080
+                    WHEN 3 THEN 800 WHEN 4 THEN 720 ELSE 576 END,
+               NULL, mi.duration,
+               CASE WHEN h(mi.id, 21) % 1000 = 0 THEN 150000
+                    ELSE 1500 + h(mi.id, 21) % 20000 END,
+               CASE h(mi.id, 22) % 3 WHEN 0 THEN 'mp4' ELSE 'mkv' END,
+               CASE h(mi.id, 23) % 4 WHEN 0 THEN 'hevc' WHEN 1 THEN 'mpeg4' ELSE 'h264' END,
+               CASE h(mi.id, 24) % 3 WHEN 0 THEN 'aac' WHEN 1 THEN 'ac3' ELSE 'dca' END,
+               2 + h(mi.id, 24) % 2 * 4, '2020-01-01 00:00:00', '2024-01-01 00:00:00'
+        FROM metadata_items mi
+        WHERE mi.metadata_type IN (1, 4);
+
+        INSERT INTO media_parts (media_item_id, file, "index", size, duration, created_at)
+        SELECT m.id, '/media/' || m.library_section_id || '/' || m.id || '/' || p.part || '.mkv',
+               p.part, COALESCE(m.duration, 5400000) * m.bitrate / 8 / p.parts,
+               COALESCE(m.duration, 5400000) / p.parts, '2020-01-01 00:00:00'
+        FROM media_items m
+        JOIN (SELECT 1 AS parts, 0 AS part UNION ALL SELECT 2, 0 UNION ALL SELECT 2, 1) p
+          ON p.parts = CASE WHEN h(m.id, 25) % 20 = 0 THEN 2 ELSE 1 END
+        ORDER BY m.id, p.part;
+
+        UPDATE media_items SET size = (
+            SELECT SUM(size) FROM media_parts WHERE media_item_id = media_items.id
+        );
+        ANALYZE;
+        """
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def cached_db(work_dir: str, size: str, seed: int = 1) -> str:
+    path = os.path.join(work_dir, f"plexport_bench_{size}_s{seed}_v{GENERATOR_VERSION}.db")
+    if not os.path.exists(path):
+        print(f"Erzeuge Test-DB {size} ({SIZES[size]} Filme) ...", flush=True)
+        start = time.perf_counter()
+        generate_db(path + ".tmp", SIZES[size], seed)
+        os.replace(path + ".tmp", path)
+        print(f"  fertig in {time.perf_counter() - start:.1f}s: {path}", flush=True)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Plex-Ersatzserver für die Live-Fälle
+# ---------------------------------------------------------------------------
+# Verzögerung je Antwort in Sekunden (etwa ein Plex-Server im Heimnetz)
+DEFAULT_LIVE_LATENCY = 0.02
+LIVE_TOKEN = "benchmark"
+TAG_ELEMENTS = {1: "Genre", 4: "Director", 5: "Country"}
+
+
+class StandInPlex:
+    # Beantwortet /identity, /library/sections und /library/sections/<n>/all
+    # (seitenweise, wie Plex) mit XML aus Bibliothek 1 der Test-DB. Jede
+    # Antwort wird um `latency` verzögert, jede `fail_every`-te mit 503
+    # abgelehnt (auf Wunsch mit Retry-After), damit die Wiederholungen des
+    # Clients mitgemessen werden. Für die Tests außerdem: nur ein Ausschnitt
+    # der Einträge (`items`), aufgeteilt auf `sections` Mediatheken, eigener
+    # Name und Token. self.sections hält je Mediathek die Liste aus
+    # (updatedAt, XML); Tests ändern oder löschen darin Einträge.
+    def __init__(
+        self,
+        db_path: str,
+        latency: float = DEFAULT_LIVE_LATENCY,
+        fail_every: int = 0,
+        name: str = "Benchmark",
+        token: str = LIVE_TOKEN,
+        items: slice = None,
+        sections: int = 1,
+        retry_after: int = None,
+    ):
+        self.items = self._render_items(db_path)[items or slice(None)]
+        self.name = name
+        self.token = token
+        self.sections = [
+            self.items[len(self.items) * n // sections : len(self.items) * (n + 1) // sections]
+            for n in range(sections)
+        ]
+        self.latency = latency
+        self.fail_every = fail_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.paths = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def handle(self):
+                # Client hat die Verbindung getrennt (z. B. abgebrochener Test)
+                try:
+                    super().handle()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def do_GET(self):
+                with server.lock:
+                    server.requests += 1
+                    server.paths.append(self.path)
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                    fail = server.fail_every and server.requests % server.fail_every == 0
+                try:
+                    time.sleep(server.latency)
+                    if self.headers.get("X-Plex-Token") != server.token:
+                        return self._send(401, b"")
+                    if fail:
+                        return self._send(503, b"")
+                    url = urlsplit(self.path)
+                    body = server.route(url.path, {k: v[0] for k, v in parse_qs(url.query).items()})
+                    self._send(200, body) if body is not None else self._send(404, b"")
+                finally:
+                    with server.lock:
+                        server.active -= 1
+
+            def _send(self, status: int, body: bytes):
+                self.send_response(status)
+                self.send_header("Content-Type", "text/xml;charset=utf-8")
+                if status == 503 and server.retry_after is not None:
+                    self.send_header("Retry-After", str(server.retry_after))
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def _render_items(self, db_path: str) -> list:
+        # Jeder Eintrag einmal vorab als XML, damit der Server kaum CPU braucht;
+        # als (updatedAt, XML) für den Filter "updatedAt>>"
+        conn = sqlite3.connect(db_path)
+        try:
+            tags = {}
+            for item_id, tag_type, tag in conn.execute(
+                "SELECT tg.metadata_item_id, t.tag_type, t.tag FROM taggings tg "
+                "JOIN tags t ON t.id = tg.tag_id JOIN metadata_items m ON m.id = tg.metadata_item_id "
+                "WHERE m.library_section_id = 1 AND t.tag_type IN (1, 4, 5)"
+            ):
+                tags.setdefault(item_id, []).append(f"<{TAG_ELEMENTS[tag_type]} tag={quoteattr(tag)}/>")
+            items = []
+            for row in conn.execute(
+                "SELECT id, guid, title, studio, summary, duration, year, added_at, updated_at, "
+                "audience_rating FROM metadata_items WHERE library_section_id = 1 "
+                "AND metadata_type = 1 ORDER BY id"
+            ):
+                names = ("ratingKey", "guid", "title", "studio", "summary", "duration", "year",
+                         "addedAt", "updatedAt", "audienceRating")
+                attrs = " ".join(f"{k}={quoteattr(str(v))}" for k, v in zip(names, row) if v is not None)
+                body = f"<Video {attrs}>{''.join(tags.get(row[0], ()))}</Video>".encode()
+                items.append((row[8], body))
+            return items
+        finally:
+            conn.close()
+
+    def route(self, path: str, params: dict):
+        if path in ("/", "/identity"):
+            return (
+                f'<MediaContainer size="0" machineIdentifier={quoteattr(self.name)} '
+                f"friendlyName={quoteattr(self.name)}/>"
+            ).encode()
+        if path == "/library/sections":
+            directories = "".join(
+                f'<Directory key="{n + 1}" type="movie" title="Filme {n + 1}"/>'
+                for n in range(len(self.sections))
+            )
+            return f'<MediaContainer size="{len(self.sections)}">{directories}</MediaContainer>'.encode()
+        parts = path.split("/")
+        if len(parts) == 5 and parts[1:3] == ["library", "sections"] and parts[4] == "all":
+            number = int(parts[3]) if parts[3].isdigit() else 0
+            if not 1 <= number <= len(self.sections):
+                return None
+            items = self.sections[number - 1]
+            if "updatedAt>>" in params:
+                since = int(params["updatedAt>>"])
+                items = [item for item in items if item[0] > since]
+            start = int(params.get("X-Plex-Container-Start", 0))
+            size = int(params.get("X-Plex-Container-Size", len(items)))
+            page = items[start : start + size]
+            head = f'<MediaContainer size="{len(page)}" totalSize="{len(items)}" offset="{start}">'
+            return head.encode() + b"".join(body for _, body in page) + b"</MediaContainer>"
+        return None
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _percentile(values: list, share: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+# ---------------------------------------------------------------------------
+# Messfälle
+# ---------------------------------------------------------------------------
+def _timed(func, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"best": min(times), "median": statistics.median(times)}
+
+
+def run_cases(
+    db_path: str,
+    work_dir: str,
+    repeat: int,
+    only=None,
+    live_latency: float = DEFAULT_LIVE_LATENCY,
+    live_fail_every: int = 0,
+) -> dict:
+    out_dir = tempfile.mkdtemp(prefix="plexport_bench_", dir=work_dir)
+    export_a = os.path.join(out_dir, "a.xlsx")
+    export_b = os.path.join(out_dir, "b.xlsx")
+    conn = PLEXport.open_db(db_path)
+
+    def details():
+        PLEXport.get_library_details(conn, 1, 1)
+
+    def stats():
+        PLEXport.get_library_statistics(conn)
+
+    def series():
+        PLEXport.get_series_rollup(conn, 2)
+
+    def storage():
+        PLEXport.get_storage_report(conn, 1)
+
+    def excel_write():
+        PLEXport.export_library_details_streaming(conn, 1, 1, export_a)
+
+    def compare():
+        PLEXport.compare_excel_files(export_a, export_b, os.path.join(out_dir, "cmp.xlsx"))
+
+    # Schreibdurchsatz je Exportformat: gleiche, vorab formatierte Blöcke
+    formatted = []
+
+    def write_format(ext):
+        rows = sum(len(chunk) for chunk in formatted)
+        PLEXport.write_export(os.path.join(out_dir, "w" + ext), iter(formatted), rows)
+
+    cases = {
+        "details": details,
+        "stats": stats,
+        "series": series,
+        "storage": storage,
+        "excel_write": excel_write,
+        "compare": compare,
+    }
+    for ext in PLEXport.available_export_formats():
+        cases["write_" + ext[1:]] = lambda ext=ext: write_format(ext)
+
+    # Live-Fall: ganze Bibliothek 1 vom Ersatzserver über den PlexHttpClient
+    live = {}
+
+    def fetch_live():
+        if "client" not in live:
+            live["client"] = PLEXport.PlexHttpClient(live["server"].url, LIVE_TOKEN)
+        live["rows"] = len(live["client"].fetch_section_items("1", 1))
+
+    if PLEXport.REQUESTS_AVAILABLE:
+        cases["live"] = fetch_live
+    results = {}
+    try:
+        for name, func in cases.items():
+            if only and name not in only:
+                continue
+            if name == "live" and "server" not in live:
+                live["server"] = StandInPlex(db_path, live_latency, live_fail_every)
+            if name == "compare":
+                _prepare_compare(conn, export_a, export_b)
+            if name.startswith("write_") and not formatted:
+                formatted.extend(PLEXport.iter_library_details(conn, 1, 1))
+            print(f"  {name} ...", end="", flush=True)
+            try:
+                results[name] = _timed(func, repeat)
+            except Exception as e:
+                # Scheitert der Live-Fall trotz Wiederholungen (z. B.
+                # --live-fail-every 1), laufen die übrigen Fälle weiter
+                if name != "live":
+                    raise
+                print(f" Fehler: {e}", flush=True)
+                continue
+            print(f" {results[name]['best']:.3f}s", end="", flush=True)
+            if name.startswith("write_"):
+                rows = sum(len(chunk) for chunk in formatted)
+                print(f" ({rows / results[name]['best']:,.0f} Zeilen/s)", end="")
+            if name == "live":
+                latencies = list(live["client"].latencies)
+                print(
+                    f" ({live['rows'] / results[name]['best']:,.0f} Zeilen/s,"
+                    f" Anfrage p50 {_percentile(latencies, 0.5) * 1000:.0f} ms"
+                    f" / p95 {_percentile(latencies, 0.95) * 1000:.0f} ms)",
+                    end="",
+                )
+            print(flush=True)
+    finally:
+        conn.close()
+        if "client" in live:
+            live["client"].close()
+        if "server" in live:
+            live["server"].stop()
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return results
+
+
+def _prepare_compare(conn, export_a: str, export_b: str):
+    # Zweiter Stand: 1 % entfernt, 1 % neu, 2 % mit geändertem Titel/Rating
+    if not os.path.exists(export_a):
+        PLEXport.export_library_details_streaming(conn, 1, 1, export_a)
+    df = PLEXport.read_snapshot(export_a)
+    n = len(df)
+    df = df.iloc[n // 100 :].copy()
+    changed = df.index[:: 50]
+    df.loc[changed, "title"] = df.loc[changed, "title"] + " (neu)"
+    added = df.iloc[: n // 100].copy()
+    added["id"] = added["id"] + 10 * n
+    df = pd.concat([df, added], ignore_index=True)
+    chunks = (df.iloc[i : i + PLEXport.READ_CHUNK_SIZE] for i in range(0, len(df), PLEXport.READ_CHUNK_SIZE))
+    with PLEXport.SnapshotSidecar(export_b) as sidecar:
+        PLEXport.write_excel_chunks(export_b, sidecar.tee(chunks), len(df))
+    # Ohne Snapshot misst "compare" den langsamen Excel-Weg
+    for path in (export_a, export_b):
+        if PLEXport.PYARROW_AVAILABLE and not os.path.exists(PLEXport.snapshot_sidecar_path(path)):
+            raise RuntimeError(f"Snapshot {PLEXport.snapshot_sidecar_path(path)} wurde nicht geschrieben")
+
+
+# ---------------------------------------------------------------------------
+# Baseline
+# ---------------------------------------------------------------------------
+def machine_info() -> dict:
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "pandas": pd.__version__,
+        "pyarrow": PLEXport.PYARROW_AVAILABLE,
+        "cpus": os.cpu_count(),
+    }
+
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float) -> list:
+    # Liefert die Regressionen als (Größe, Fall, Baseline, aktuell)
+    regressions = []
+    for size, cases in results.items():
+        for name, timing in cases.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if not base:
+                status = "neu"
+            else:
+                ratio = timing["best"] / base["best"]
+                status = f"{ratio:5.2f}x"
+                if ratio > 1 + tolerance:
+                    status += "  REGRESSION"
+                    regressions.append((size, name, base["best"], timing["best"]))
+            base_text = f"{base['best']:.3f}s" if base else "-"
+            print(f"{size:>5} {name:<14} {timing['best']:8.3f}s  (Baseline {base_text:>8})  {status}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark der PLEXport-Exportpfade")
+    parser.add_argument("--size", nargs="+", choices=list(SIZES), default=["10k"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--case", nargs="+", help="nur diese Fälle messen")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "plexport_bench"))
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save", action="store_true", help="Ergebnis als neue Baseline speichern")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--generate", metavar="DB", help="nur eine Test-DB erzeugen (erste --size)")
+    parser.add_argument(
+        "--live-latency", type=float, default=DEFAULT_LIVE_LATENCY,
+        help="Verzögerung je Antwort des Plex-Ersatzservers in Sekunden",
+    )
+    parser.add_argument(
+        "--live-fail-every", type=int, default=0, metavar="N",
+        help="jede N-te Antwort des Ersatzservers mit 503 ablehnen",
+    )
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        start = time.perf_counter()
+        generate_db(args.generate, SIZES[args.size[0]], args.seed)
+        print(f"{args.generate} erzeugt in {time.perf_counter() - start:.1f}s")
+        return 0
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    results = {}
+    for size in args.size:
+        db_path = cached_db(args.work_dir, size, args.seed)
+        print(f"Messe {size} ({args.repeat}x, bester Lauf zählt):", flush=True)
+        results[size] = run_cases(
+            db_path, args.work_dir, args.repeat, args.case, args.live_latency, args.live_fail_every
+        )
+
+    baseline = load_baseline(args.baseline)
+    if baseline and baseline.get("machine") != machine_info():
+        print("Hinweis: Baseline stammt von einer anderen Umgebung:", baseline.get("machine"))
+    print()
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+
+    if args.save:
+        merged = baseline.get("results", {}) if baseline.get("machine") == machine_info() else {}
+        for size, cases in results.items():
+            merged.setdefault(size, {}).update(cases)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"machine": machine_info(), "results": merged}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline gespeichert: {args.baseline}")
+        return 0
+    if regressions:
+        print(f"{len(regressions)} Regression(en) über {args.tolerance:.0%} Toleranz.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -64,14 +64,14 @@ echo [OK] PLEXport.py wurde erfolgreich heruntergeladen. >> "%LOGFILE%"
 echo.
 
 echo Schritt 2 abgeschlossen.
-echo Als nächstes: Schritt 3 - Installiere Python-Abhängigkeiten (pandas, plexapi, openpyxl).
+echo Als nächstes: Schritt 3 - Installiere Python-Abhängigkeiten (pandas, requests, openpyxl, pyarrow).
 echo Drücken Sie Enter, um mit Schritt 3 fortzufahren.
 pause >nul
 
 REM Schritt 3: Python-Abhängigkeiten installieren
 echo [%DATE% %TIME%] Installiere Python-Abhängigkeiten >> "%LOGFILE%"
 echo Installiere Python-Abhängigkeiten...
-pip install pandas plexapi openpyxl >> "%LOGFILE%" 2>&1
+pip install pandas requests openpyxl >> "%LOGFILE%" 2>&1
 if errorlevel 1 (
     echo [FEHLER] Fehler beim Installieren der Python-Abhängigkeiten. >> "%LOGFILE%"
     echo [FEHLER] Fehler beim Installieren der Python-Abhängigkeiten. Details stehen in "%LOGFILE%".
@@ -82,6 +82,13 @@ if errorlevel 1 (
 )
 echo [OK] Python-Abhängigkeiten wurden erfolgreich installiert.
 echo [OK] Python-Abhängigkeiten wurden erfolgreich installiert. >> "%LOGFILE%"
+
+REM Empfohlen: pyarrow (schneller Vergleich, Parquet-Export); PLEXport läuft auch ohne
+pip install pyarrow >> "%LOGFILE%" 2>&1
+if errorlevel 1 (
+    echo [WARNUNG] pyarrow konnte nicht installiert werden. PLEXport läuft trotzdem, nur ohne Parquet-Export und Schnellvergleich. >> "%LOGFILE%"
+    echo [WARNUNG] pyarrow konnte nicht installiert werden. PLEXport läuft trotzdem, nur ohne Parquet-Export und Schnellvergleich.
+)
 echo.
 
 echo Schritt 3 abgeschlossen.
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+# PLEXport.py und benchmark.py liegen im Projektverzeichnis, nicht als Paket
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark  # noqa: E402
+
+# Filme in Bibliothek 1 der Test-DB
+TEST_ITEMS = 2000
+
+
+@pytest.fixture(scope="session")
+def plex_db(tmp_path_factory):
+    return benchmark.generate_db(str(tmp_path_factory.mktemp("db") / "plex.db"), TEST_ITEMS)
+
+
+@pytest.fixture
+def stand_in(plex_db):
+    # Startet benchmark.StandInPlex-Server (ohne Verzögerung, sofern nicht
+    # angegeben) und beendet sie nach dem Test
+    servers = []
+
+    def start(**options):
+        options.setdefault("latency", 0)
+        server = benchmark.StandInPlex(plex_db, **options)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
@@ -0,0 +1,72 @@
+import json
+import os
+
+import pytest
+
+import PLEXport
+
+
+@pytest.fixture
+def export(tmp_path):
+    path = tmp_path / "export" / "Filme.csv"
+    path.parent.mkdir()
+    path.write_text("id;title\n1;Film 1\n", encoding="utf-8")
+    return str(path)
+
+
+def store(export, backup_dir, name, index, entries):
+    return PLEXport._store_backup(
+        export, str(backup_dir / name), PLEXport.export_content_hash(export), index, entries
+    )
+
+
+def test_copy_then_hardlink(export, tmp_path):
+    backup_dir = tmp_path / "backup"
+    backup_dir.mkdir()
+    index, entries = {}, []
+    first = store(export, backup_dir, "1_Filme.csv", index, entries)
+    second = store(export, backup_dir, "2_Filme.csv", index, entries)
+
+    assert [e["mode"] for e in entries] == ["copy", "link"]
+    assert os.path.samefile(first, second)
+    # Nie ein Link auf die Datei des Benutzers
+    assert not os.path.samefile(first, export)
+
+    with open(export, "a", encoding="utf-8") as f:
+        f.write("2;Film 2\n")
+    third = store(export, backup_dir, "3_Filme.csv", index, entries)
+    assert entries[-1]["mode"] == "copy"
+    assert not os.path.samefile(first, third)
+    assert len(index) == 2
+
+
+def test_reuse_when_links_fail(export, tmp_path, monkeypatch):
+    backup_dir = tmp_path / "backup"
+    backup_dir.mkdir()
+    index, entries = {}, []
+    first = store(export, backup_dir, "1_Filme.csv", index, entries)
+
+    def no_link(src, dst):
+        raise OSError("keine Hardlinks")
+
+    monkeypatch.setattr(os, "link", no_link)
+    second = store(export, backup_dir, "2_Filme.csv", index, entries)
+    assert second == first
+    assert entries[-1]["mode"] == "reuse"
+    assert entries[-1]["file"] == "1_Filme.csv"
+    assert sorted(os.listdir(backup_dir)) == ["1_Filme.csv"]
+
+
+def test_index_survives_restart(export, tmp_path):
+    index_path = str(tmp_path / "backup" / "backup_index.jsonl")
+    first = PLEXport.backup_to_base_dir(export, index_path=index_path)
+    index = PLEXport.load_backup_index(index_path)
+    assert index == {PLEXport.export_content_hash(export): os.path.basename(first)}
+
+    with open(index_path, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    assert [e["mode"] for e in entries] == ["copy"]
+
+    # Gelöschte Sicherungen fallen aus dem Index
+    os.remove(first)
+    assert PLEXport.load_backup_index(index_path) == {}
@@ -0,0 +1,97 @@
+import os
+
+import pandas as pd
+import pytest
+
+import PLEXport
+
+SERIES_LIBRARY = 2  # Test-DB: Bibliothek 2 enthält die Serien
+
+
+def single_export(db_path: str, path: str):
+    # Wie der Export-Knopf im Hauptfenster
+    conn = PLEXport.open_db(db_path)
+    try:
+        shows, seasons = PLEXport.format_series_rollup(
+            *PLEXport.get_series_rollup(conn, SERIES_LIBRARY)
+        )
+        PLEXport.export_library_details_streaming(
+            conn,
+            SERIES_LIBRARY,
+            PLEXport.PLEX_TYPE_EPISODE,
+            path,
+            extra_sheets={"Serien": shows, "Staffeln": seasons},
+            fmt=PLEXport.export_format(path),
+        )
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("fmt", [".xlsx", ".csv"])
+def test_bulk_export_of_series_matches_single_export(plex_db, tmp_path, fmt):
+    single = str(tmp_path / f"single{fmt}")
+    single_export(plex_db, single)
+    result = PLEXport.export_libraries_bulk(
+        plex_db, [(SERIES_LIBRARY, "Serien")], PLEXport.PLEX_TYPE_EPISODE, str(tmp_path), fmt=fmt
+    )
+    (section,) = result["sections"]
+    bulk = section["path"]
+    assert section["extra_paths"] == PLEXport.export_extra_paths(bulk, {"Serien": 1, "Staffeln": 1})
+
+    if fmt == ".xlsx":
+        single_sheets = pd.read_excel(single, sheet_name=None)
+        bulk_sheets = pd.read_excel(bulk, sheet_name=None)
+        assert list(bulk_sheets) == list(single_sheets)
+        assert {"Serien", "Staffeln"} <= set(bulk_sheets)
+        for name in single_sheets:
+            pd.testing.assert_frame_equal(bulk_sheets[name], single_sheets[name])
+    else:
+        for name in ("Serien", "Staffeln"):
+            bulk_extra = PLEXport.extra_sheet_path(bulk, name)
+            assert os.path.exists(bulk_extra)
+            with open(bulk_extra, "rb") as a, open(PLEXport.extra_sheet_path(single, name), "rb") as b:
+                assert a.read() == b.read()
+        with open(bulk, "rb") as a, open(single, "rb") as b:
+            assert a.read() == b.read()
+
+
+class CancelAfter:
+    # Wie multiprocessing.Event, aber nach `checks` Abfragen gesetzt
+    def __init__(self, checks: int):
+        self.checks = checks
+
+    def is_set(self) -> bool:
+        self.checks -= 1
+        return self.checks < 0
+
+
+@pytest.mark.parametrize("fmt", [".xlsx", ".csv"])
+def test_cancelled_section_leaves_no_files(plex_db, tmp_path, fmt):
+    tags_path = PLEXport.build_bulk_tag_table(
+        plex_db, [SERIES_LIBRARY], PLEXport.PLEX_TYPE_EPISODE, str(tmp_path / "tags.db")
+    )
+    path = str(tmp_path / f"Serien{fmt}")
+    # Erste Abfrage vor dem Start, zweite vor dem ersten Block
+    PLEXport._bulk_worker_init(plex_db, tags_path, CancelAfter(1))
+    try:
+        with pytest.raises(PLEXport.JobCancelled):
+            PLEXport._bulk_export_section(SERIES_LIBRARY, PLEXport.PLEX_TYPE_EPISODE, path)
+        assert sorted(os.listdir(tmp_path)) == ["tags.db"]
+    finally:
+        PLEXport._bulk_conn.close()
+        PLEXport._bulk_cancel = None
+
+
+def test_cancel_stops_bulk_export(plex_db, tmp_path):
+    def progress(percent, message):
+        if "exportiert" in message:
+            raise PLEXport.JobCancelled()
+
+    with pytest.raises(PLEXport.JobCancelled):
+        PLEXport.export_libraries_bulk(
+            plex_db,
+            [(1, "Filme")],
+            1,  # Filme
+            str(tmp_path),
+            progress,
+        )
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+import PLEXport
+
+
+def frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"id": np.arange(rows, dtype="int64")})
+
+
+def test_evicts_least_recently_used_by_bytes():
+    size = PLEXport.result_bytes(frame(1000))
+    cache = PLEXport.ResultCache(max_bytes=3 * size)
+    for name in "abc":
+        cache.put((name,), frame(1000))
+    assert cache.bytes == 3 * size
+
+    # "a" wird benutzt, also verdrängt "d" zuerst "b"
+    assert cache.get(("a",)) is not None
+    cache.put(("d",), frame(1000))
+    assert list(cache.entries) == [("c",), ("a",), ("d",)]
+    assert cache.bytes == 3 * size
+
+    # Ein doppelt so großes Ergebnis verdrängt zwei Einträge
+    cache.put(("e",), frame(2000))
+    assert list(cache.entries) == [("d",), ("e",)]
+    assert cache.bytes <= cache.max_bytes
+    stats = cache.stats()
+    assert stats["evictions"] == 3
+    assert stats["hits"] == 1
+
+
+def test_oversized_results_are_not_kept():
+    cache = PLEXport.ResultCache(max_bytes=PLEXport.result_bytes(frame(100)))
+    cache.put(("klein",), frame(100))
+    cache.put(("groß",), frame(10000))
+    assert list(cache.entries) == [("klein",)]
+    # Ersetzen durch ein zu großes Ergebnis entfernt den alten Eintrag
+    cache.put(("klein",), frame(10000))
+    assert cache.entries == {}
+    assert cache.bytes == 0
+
+
+def test_load_calls_loader_once():
+    cache = PLEXport.ResultCache()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return frame(10)
+
+    first = cache.load(("stats", 1), loader)
+    second = cache.load(("stats", 1), loader)
+    assert first is second
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
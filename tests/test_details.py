@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+import PLEXport
+
+
+@pytest.fixture(scope="module")
+def conn(plex_db):
+    conn = PLEXport.open_db(plex_db)
+    yield conn
+    conn.close()
+
+
+def tag_sets(values: pd.Series) -> list:
+    # GROUP_CONCAT über den Join hat keine feste Reihenfolge
+    return [frozenset(v.split("|")) if isinstance(v, str) else None for v in values]
+
+
+@pytest.mark.parametrize("library_id, metadata_type", [(1, 1), (2, 4)])
+def test_matches_legacy_join(conn, library_id, metadata_type):
+    legacy = pd.read_sql_query(
+        PLEXport.LEGACY_LIBRARY_DETAILS_QUERY,
+        conn,
+        params=PLEXport.library_params(library_id, metadata_type),
+    )
+    legacy = legacy.sort_values("id").reset_index(drop=True)
+    details = PLEXport.load_library_details(conn, library_id, metadata_type)
+    frame = details.to_frame().sort_values("id").reset_index(drop=True)
+
+    assert len(details) == len(legacy) > 0
+    assert list(frame.columns) == list(legacy.columns)
+    for column in legacy.columns:
+        if column in PLEXport.TAG_COLUMNS.values():
+            assert tag_sets(frame[column]) == tag_sets(legacy[column]), column
+        else:
+            pd.testing.assert_series_equal(
+                frame[column], legacy[column], check_dtype=False, obj=column
+            )
+
+
+def test_tags_keep_plex_order(conn):
+    details = PLEXport.load_library_details(conn, 1, 1)
+    frame = details.to_frame().set_index("id")
+    rows = conn.execute(
+        """
+        SELECT tg.metadata_item_id, t.tag FROM taggings tg
+        JOIN tags t ON t.id = tg.tag_id
+        WHERE t.tag_type = 1 AND tg.metadata_item_id IN (1, 2, 3)
+        ORDER BY tg.metadata_item_id, tg.id
+        """
+    ).fetchall()
+    for item_id in (1, 2, 3):
+        expected = [tag for item, tag in rows if item == item_id]
+        assert frame.at[item_id, "tags_genre"] == ("|".join(expected) or None)
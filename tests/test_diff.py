@@ -0,0 +1,68 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import PLEXport
+
+
+@pytest.fixture(scope="module")
+def export(plex_db):
+    conn = sqlite3.connect(plex_db)
+    try:
+        return PLEXport.get_library_details(conn, 1, 1)
+    finally:
+        conn.close()
+
+
+def later_export(df: pd.DataFrame) -> pd.DataFrame:
+    # 10 entfernt, 3 neu, 5 Titel und 2 Ratings geändert
+    df = df.iloc[10:].reset_index(drop=True).copy()
+    df.loc[:4, "title"] = df.loc[:4, "title"] + " (neu)"
+    df.loc[100:101, "audience_rating"] = "9,9"
+    added = df.iloc[:3].copy()
+    added["id"] = added["id"] + 100000
+    return pd.concat([df, added], ignore_index=True)
+
+
+def test_diff_by_id(export):
+    result = PLEXport.diff_snapshots(export, later_export(export))
+    assert result["key"] == "id"
+    assert result["removed"]["id"].tolist() == export["id"].iloc[:10].tolist()
+    assert len(result["added"]) == 3
+    assert len(result["in_both"]) == len(export) - 10
+    assert len(result["changed"]) == 7
+    changes = result["changes"]
+    assert (changes["Spalte"] == "title").sum() == 5
+    assert (changes["Spalte"] == "audience_rating").sum() == 2
+    assert changes["Nachher"].str.endswith("(neu)").sum() == 5
+
+
+def test_key_falls_back_to_guid_then_title(export):
+    with_guid = export.assign(guid="plex://movie/" + export["id"].astype(str))
+    later = later_export(with_guid)
+    by_guid = PLEXport.diff_snapshots(with_guid.drop(columns="id"), later.drop(columns="id"))
+    assert by_guid["key"] == "guid"
+    assert len(by_guid["removed"]) == 10
+    assert len(by_guid["changed"]) == 7
+
+    by_title = PLEXport.diff_snapshots(
+        with_guid.drop(columns=["id", "guid"]), later.drop(columns=["id", "guid"])
+    )
+    assert by_title["key"] == "title"
+    # Geänderte Titel erscheinen als entfernt und neu
+    assert len(by_title["removed"]) == 15
+    assert len(by_title["changed"]) == 2
+
+    with pytest.raises(ValueError):
+        PLEXport.diff_snapshots(export[["year"]], later[["year"]])
+
+
+def test_duplicate_keys_use_the_first_row(export, caplog):
+    first = export.iloc[:5].reset_index(drop=True)
+    doubled = pd.concat([first, first.iloc[[2]].assign(title="Doppelt")], ignore_index=True)
+    result = PLEXport.diff_snapshots(first, doubled)
+    assert result["added"].empty
+    assert result["changed"].empty
+    assert len(result["in_both"]) == 5
+    assert "doppelte Schlüssel" in caplog.text
@@ -0,0 +1,62 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import PLEXport
+
+
+@pytest.fixture(scope="module")
+def raw(plex_db):
+    # Filme und Episoden: Lücken bei Dauer und Rating, viele Datumswerte
+    conn = sqlite3.connect(plex_db)
+    try:
+        return pd.read_sql_query(
+            "SELECT duration, added_at, audience_rating FROM metadata_items "
+            "WHERE metadata_type IN (1, 4) ORDER BY id",
+            conn,
+        )
+    finally:
+        conn.close()
+
+
+def test_duration_matches_apply(raw):
+    expected = raw["duration"].apply(
+        lambda ms: PLEXport.convert_ms_to_hhmm(ms) if pd.notnull(ms) else ""
+    )
+    assert raw["duration"].isna().any()
+    assert PLEXport.format_duration_hhmm(raw["duration"]).tolist() == expected.tolist()
+
+
+def test_datetime_matches_apply(raw):
+    expected = raw["added_at"].apply(
+        lambda x: PLEXport.unix_to_datetime_str(x) if pd.notnull(x) else ""
+    )
+    assert PLEXport.format_datetime_de(raw["added_at"]).tolist() == expected.tolist()
+
+
+def test_rating_matches_apply(raw):
+    expected = raw["audience_rating"].apply(
+        lambda r: f"{r:.1f}".replace(".", ",") if pd.notnull(r) else ""
+    )
+    assert raw["audience_rating"].isna().any()
+    assert PLEXport.format_decimal_comma(raw["audience_rating"]).tolist() == expected.tolist()
+
+
+def test_datetime_outside_four_digit_years():
+    # Vor 1000 gibt es keinen 19-stelligen ISO-Text mehr: dann formatiert strftime
+    values = pd.Series(
+        pd.array(["0999-12-31T23:59:59", "1000-01-01T00:00:00", None], dtype="datetime64[s]")
+    )
+    result = PLEXport.format_datetime_de(values).tolist()
+    assert result == values.dt.strftime("%d.%m.%Y %H:%M:%S").fillna("").tolist()
+    assert result[1:] == ["01.01.1000 00:00:00", ""]
+
+
+def test_datetime_before_1970():
+    seconds = pd.Series([-2208988800, 0, None])  # 1900-01-01, 1970-01-01
+    assert PLEXport.format_datetime_de(seconds).tolist() == [
+        "01.01.1900 00:00:00",
+        "01.01.1970 00:00:00",
+        "",
+    ]
@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+
+import PLEXport
+from benchmark import LIVE_TOKEN
+from conftest import TEST_ITEMS
+
+pytest.importorskip("requests")
+
+
+@pytest.fixture
+def synced(stand_in, tmp_path):
+    # Server und Client nach dem ersten (vollständigen) Abgleich
+    server = stand_in()
+    client = PLEXport.PlexHttpClient(server.url, LIVE_TOKEN)
+    cache_path = str(tmp_path / "live_cache.db")
+    first = PLEXport.sync_live_section(client, "1", 1, cache_path)
+    yield server, client, cache_path, first
+    client.close()
+
+
+def cached_items(cache_path: str) -> dict:
+    conn = sqlite3.connect(cache_path)
+    try:
+        return dict(conn.execute("SELECT id, title FROM live_items"))
+    finally:
+        conn.close()
+
+
+def test_first_sync_loads_everything(synced):
+    server, client, cache_path, first = synced
+    assert first == {"full": True, "fetched": TEST_ITEMS, "deleted": 0}
+    assert len(cached_items(cache_path)) == TEST_ITEMS
+
+
+def id_listings(server, since: int = 0) -> int:
+    # Ungeteilte Abrufe der ganzen Mediathek (section_ids) statt Seiten
+    return sum(
+        "/all" in path and "X-Plex-Container-Start" not in path for path in server.paths[since:]
+    )
+
+
+def test_unchanged_section_fetches_only_the_overlap(synced):
+    server, client, cache_path, _ = synced
+    watermark = max(updated for updated, _ in server.sections[0])
+    before = len(server.paths)
+    result = PLEXport.sync_live_section(client, "1", 1, cache_path)
+    assert not result["full"]
+    assert result["deleted"] == 0
+    # Nur Einträge aus der letzten Sekunde vor dem Stand (Überlappung)
+    assert result["fetched"] == sum(
+        updated > watermark - 1 for updated, _ in server.sections[0]
+    )
+    # Anzahl passt zu totalSize, also keine ID-Liste
+    assert id_listings(server, before) == 0
+
+
+def test_changes_and_deletions(synced):
+    server, client, cache_path, _ = synced
+    items = server.sections[0]
+    updated = max(updated for updated, _ in items) + 100
+    items[0] = (updated, f'<Video ratingKey="1" title="Neu" updatedAt="{updated}"/>'.encode())
+    del items[10:15]
+    before = len(server.paths)
+    result = PLEXport.sync_live_section(client, "1", 1, cache_path)
+    assert id_listings(server, before) == 1
+    assert result["full"] is False
+    assert result["deleted"] == 5
+    cached = cached_items(cache_path)
+    assert len(cached) == TEST_ITEMS - 5
+    assert cached[1] == "Neu"
+    assert 11 not in cached and 16 in cached
+    # Ohne weitere Änderung bleibt es beim inkrementellen Abgleich
+    again = PLEXport.sync_live_section(client, "1", 1, cache_path)
+    assert again == {"full": False, "fetched": 1, "deleted": 0}
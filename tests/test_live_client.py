@@ -0,0 +1,177 @@
+import sqlite3
+import time
+
+import pytest
+
+import PLEXport
+from benchmark import LIVE_TOKEN
+from conftest import TEST_ITEMS
+
+requests = pytest.importorskip("requests")
+
+
+@pytest.fixture
+def clients():
+    opened = []
+
+    def connect(url, token=LIVE_TOKEN, **options):
+        client = PLEXport.PlexHttpClient(url, token, **options)
+        opened.append(client)
+        return client
+
+    yield connect
+    for client in opened:
+        client.close()
+
+
+def page_requests(server) -> int:
+    return sum("/library/sections/1/all" in path for path in server.paths)
+
+
+def test_pages_are_joined_in_order(stand_in, clients):
+    # Die Seiten-Threads liefern in beliebiger Reihenfolge
+    server = stand_in(latency=0.01)
+    rows = clients(server.url).fetch_section_items("1", 1, page_size=300)
+    ids = [row["id"] for row in rows]
+    assert len(ids) == TEST_ITEMS
+    assert ids == sorted(ids)
+
+
+@pytest.mark.parametrize(
+    "page_size, pages",
+    [(300, 7), (500, 4), (TEST_ITEMS, 1), (5000, 1)],
+)
+def test_total_size_decides_the_pages(stand_in, clients, page_size, pages):
+    server = stand_in()
+    rows = clients(server.url).fetch_section_items("1", 1, page_size=page_size)
+    assert len(rows) == TEST_ITEMS
+    assert page_requests(server) == pages
+
+
+def test_empty_section(stand_in, clients):
+    server = stand_in(items=slice(0, 0))
+    assert clients(server.url).fetch_section_items("1", 1) == []
+    assert page_requests(server) == 1
+
+
+def test_progress_reaches_total(stand_in, clients):
+    calls = []
+    clients(stand_in().url).fetch_section_items(
+        "1", 1, lambda percent, message=None: calls.append((percent, message)), page_size=300
+    )
+    assert calls[-1] == (100, f"{TEST_ITEMS}/{TEST_ITEMS} Einträge geladen")
+
+
+def test_cancel_between_pages(stand_in, clients):
+    server = stand_in(latency=0.05)
+    calls = []
+
+    def progress(percent, message=None):
+        calls.append(percent)
+        if len(calls) == 2:
+            raise PLEXport.JobCancelled()
+
+    client = clients(server.url, max_workers=2)
+    with pytest.raises(PLEXport.JobCancelled):
+        client.fetch_section_items("1", 1, progress, page_size=100)
+    time.sleep(0.2)
+    assert page_requests(server) < TEST_ITEMS // 100 // 2
+    # Die abgebrochenen Anfragen haben ihre Verbindungen wieder freigegeben
+    assert len(client.fetch_section_items("1", 1, page_size=100)) == TEST_ITEMS
+
+
+def test_retries_server_errors(stand_in, clients):
+    server = stand_in(fail_every=4)
+    client = clients(server.url, backoff=0.01)
+    rows = client.fetch_section_items("1", 1, page_size=100)
+    assert len(rows) == TEST_ITEMS
+    assert server.requests > TEST_ITEMS // 100
+    assert client.stats["retries"] == server.requests - client.stats["requests"]
+
+
+def test_gives_up_after_retries(stand_in, clients):
+    server = stand_in(fail_every=1)
+    with pytest.raises(requests.HTTPError) as error:
+        clients(server.url, retries=2, backoff=0.01).server_id()
+    assert error.value.response.status_code == 503
+    assert server.requests == 3
+
+
+def test_sections_are_cached_for_the_session(stand_in, clients):
+    server = stand_in(sections=2)
+    client = clients(server.url)
+    expected = [
+        {"key": "1", "type": "movie", "title": "Filme 1"},
+        {"key": "2", "type": "movie", "title": "Filme 2"},
+    ]
+    assert client.sections() == expected
+    assert client.sections() == expected
+    assert server.paths.count("/library/sections") == 1
+    client.sections(refresh=True)
+    assert server.paths.count("/library/sections") == 2
+
+
+def test_keep_alive_reuses_connections(stand_in, clients):
+    client = clients(stand_in().url, max_workers=2)
+    client.fetch_section_items("1", 1, page_size=100)
+    assert client.stats["requests"] == TEST_ITEMS // 100
+    assert client.connections() <= 2
+
+
+def test_concurrency_is_bounded(stand_in, clients):
+    server = stand_in(latency=0.02)
+    clients(server.url, max_workers=2).fetch_section_items("1", 1, page_size=100)
+    assert server.max_active == 2
+
+
+def test_retry_after_is_honoured(stand_in, clients):
+    server = stand_in(fail_every=2, retry_after=1)
+    client = clients(server.url, backoff=0.01)
+    client.server_id()  # Anfrage 1
+    started = time.perf_counter()
+    assert client.server_name() == "Benchmark"  # Anfrage 2 scheitert, 3 klappt
+    assert time.perf_counter() - started >= 0.95
+    assert client.stats["retries"] == 1
+
+
+def test_wrong_token_is_not_retried(stand_in, clients):
+    server = stand_in()
+    with pytest.raises(requests.HTTPError) as error:
+        clients(server.url, token="falsch", backoff=0.01).server_id()
+    assert error.value.response.status_code == 401
+    assert server.requests == 1
+
+
+def test_timeout(stand_in, clients):
+    client = clients(stand_in(latency=0.5).url, timeout=0.1, retries=0)
+    with pytest.raises(requests.ConnectionError):
+        client.get_xml("/identity")
+
+
+def test_streamed_stats(stand_in, clients, plex_db):
+    client = clients(stand_in().url)
+    stats = client.section_stats("1", 1)
+    conn = sqlite3.connect(plex_db)
+    try:
+        count, duration, rating = conn.execute(
+            "SELECT COUNT(*), SUM(duration), AVG(NULLIF(audience_rating, 0)) FROM metadata_items "
+            "WHERE library_section_id = 1 AND metadata_type = 1"
+        ).fetchone()
+    finally:
+        conn.close()
+    assert stats["count"] == count == TEST_ITEMS
+    assert stats["total_duration"] == duration
+    assert stats["avg_rating"] == pytest.approx(rating)
+    assert client.section_ids("1", 1) == {row["id"] for row in client.fetch_section_items("1", 1)}
+
+
+def test_cancel_stream(stand_in, clients):
+    client = clients(stand_in().url, max_workers=1)
+
+    def progress(percent, message=None):
+        raise PLEXport.JobCancelled()
+
+    with pytest.raises(PLEXport.JobCancelled):
+        client.section_stats("1", 1, progress)
+    # Die Verbindung des abgebrochenen Streams ist wieder frei
+    assert client.section_stats("1", 1)["count"] == TEST_ITEMS
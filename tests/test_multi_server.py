@@ -0,0 +1,33 @@
+import PLEXport
+from benchmark import LIVE_TOKEN
+from conftest import TEST_ITEMS
+
+
+def test_catalogue_of_several_servers(stand_in):
+    # Alpha: Einträge 0-1199 in zwei Mediatheken, Beta: 800-1999, also
+    # 400 auf beiden; Gamma verlangt ein anderes Token
+    alpha = stand_in(name="Alpha", items=slice(0, 1200), sections=2, latency=0.05)
+    beta = stand_in(name="Beta", items=slice(800, None))
+    gamma = stand_in(name="Gamma", token="anderes")
+    servers = [(alpha.url, LIVE_TOKEN, None), (beta.url, LIVE_TOKEN, None), (gamma.url, LIVE_TOKEN, "Gamma")]
+
+    catalogue, summary = PLEXport.build_multi_server_catalogue(servers, 1)
+
+    assert len(catalogue) == TEST_ITEMS
+    assert catalogue["guid"].is_unique
+    assert catalogue["server_count"].value_counts().to_dict() == {1: 1600, 2: 400}
+    shared = catalogue[catalogue["server_count"] == 2]
+    assert set(shared["servers"]) == {"Alpha|Beta"}
+    assert shared["sources"].str.contains("Alpha:").all()
+    assert shared["sources"].str.contains("Beta:1/").all()
+    only = catalogue[catalogue["server_count"] == 1]
+    assert set(only["servers"]) == {"Alpha", "Beta"}
+    # Beide Mediatheken von Alpha kommen vor und wurden gleichzeitig geladen
+    assert catalogue["sources"].str.contains("Alpha:2/").any()
+    assert alpha.max_active >= 2
+
+    by_name = {entry["name"]: entry for entry in summary}
+    assert by_name["Alpha"]["rows"] == 1200
+    assert by_name["Beta"]["rows"] == 1200
+    assert by_name["Gamma"]["rows"] == 0
+    assert "401" in by_name["Gamma"]["error"]
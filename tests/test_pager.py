@@ -0,0 +1,67 @@
+import pytest
+
+import PLEXport
+
+
+@pytest.fixture
+def conn(plex_db):
+    conn = PLEXport.open_db(plex_db)
+    yield conn
+    conn.close()
+
+
+def expected_ids(conn, sort, descending=False):
+    direction = "DESC" if descending else "ASC"
+    rows = conn.execute(
+        f"""
+        SELECT mi.id FROM metadata_items mi
+        WHERE mi.library_section_id = 1 AND mi.metadata_type = 1
+        ORDER BY {PLEXport.BROWSER_SORT_KEYS[sort]} {direction}, mi.id {direction}
+        """
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def walk(pager, limit):
+    ids, key = [], 0
+    while True:
+        page = pager.page_after(key, limit)
+        if not page:
+            return ids
+        ids.extend(row[1] for row in page)
+        key = page[-1][0]
+
+
+@pytest.mark.parametrize("sort", sorted(PLEXport.BROWSER_SORT_KEYS))
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_follow_sql_order(conn, sort, descending):
+    pager = PLEXport.KeysetPager(conn, 1, 1)
+    total = pager.sort_by(sort, descending)
+    expected = expected_ids(conn, sort, descending)
+    assert total == len(expected)
+    assert walk(pager, 300) == expected
+
+
+def test_page_before_and_page_at(conn):
+    pager = PLEXport.KeysetPager(conn, 1, 1)
+    pager.sort_by("year")
+    expected = expected_ids(conn, "year")
+
+    page = pager.page_at(500, 100)
+    assert [row[1] for row in page] == expected[500:600]
+    before = pager.page_before(page[0][0], 100)
+    assert [row[1] for row in before] == expected[400:500]
+    assert pager.page_before(1, 100) == []
+
+    # Sprung hinter das Ende liefert die letzte volle Seite
+    last = pager.page_at(len(expected) + 50, 100)
+    assert [row[1] for row in last] == expected[-100:]
+
+
+def test_resort_and_unknown_sort(conn):
+    pager = PLEXport.KeysetPager(conn, 1, 1)
+    pager.sort_by("title")
+    pager.sort_by("added_at", descending=True)
+    assert [row[1] for row in pager.page_after(0, 50)] == expected_ids(conn, "added_at", True)[:50]
+    with pytest.raises(ValueError):
+        pager.sort_by("studio")
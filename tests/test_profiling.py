@@ -0,0 +1,37 @@
+import threading
+import time
+
+import PLEXport
+
+
+def test_overlapping_profiled_jobs_run_one_after_another(tmp_path, monkeypatch):
+    monkeypatch.setattr(PLEXport, "BASE_DIR", str(tmp_path))
+    active = []
+    overlap = []
+    errors = []
+
+    def work(job_id):
+        active.append(job_id)
+        overlap.append(len(active))
+        time.sleep(0.2)
+        active.remove(job_id)
+        return job_id
+
+    def run(job_id):
+        try:
+            assert PLEXport.run_profiled(job_id, f"Job {job_id}", work, job_id) == job_id
+        except Exception as e:  # im Haupt-Thread prüfen
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(job_id,)) for job_id in (1, 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert max(overlap) == 1
+    reports = sorted(tmp_path.glob("profile_*.txt"))
+    assert len(reports) == 2
+    assert "prozessweit" in reports[0].read_text(encoding="utf-8")
+    assert not PLEXport.tracemalloc_active()
@@ -0,0 +1,60 @@
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+import PLEXport
+
+
+@pytest.fixture
+def index(plex_db, tmp_path):
+    db_path = str(tmp_path / "library.db")
+    shutil.copy(plex_db, db_path)
+    index_path = str(tmp_path / "search_index.db")
+    assert PLEXport.build_search_index(db_path, index_path)
+    return db_path, index_path
+
+
+def test_index_is_rebuilt_only_when_db_changes(index):
+    db_path, index_path = index
+    assert PLEXport.search_index_current(db_path, index_path)
+    assert not PLEXport.build_search_index(db_path, index_path)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE metadata_items SET title = 'Zauberflöte' WHERE id = 1")
+    conn.commit()
+    conn.close()
+    os.utime(db_path, ns=(0, os.stat(db_path).st_mtime_ns + 1))
+    assert not PLEXport.search_index_current(db_path, index_path)
+    assert PLEXport.build_search_index(db_path, index_path)
+
+    total, rows = PLEXport.search_catalogue("zauberflote", index_path)
+    assert total == 1
+    assert rows[0][0] == 1
+    assert rows[0][4] == "Zauberflöte"
+
+
+def test_prefix_and_all_words(index):
+    _, index_path = index
+    total, rows = PLEXport.search_catalogue("Film 123", index_path)
+    assert rows[0][4] == "Film 123"
+    # "12" als Wortanfang trifft 12, 120-129 und 1200-1299 (auch über Tags)
+    total, rows = PLEXport.search_catalogue("film 12", index_path, limit=5000)
+    assert len(rows) == total
+    titles = {row[4] for row in rows}
+    assert {"Film 12", "Film 120", "Film 1299"} <= titles
+    assert PLEXport.search_catalogue("", index_path) == (0, [])
+
+
+@pytest.mark.parametrize("text", ["AND", "Film AND", "-Film", "title:Film", 'Film "12', "NEAR(Film)", "*"])
+def test_syntax_characters_are_quoted(index, text):
+    _, index_path = index
+    # Darf keine FTS5-Syntaxfehler auslösen
+    PLEXport.search_catalogue(text, index_path)
+
+
+def test_make_search_query():
+    assert PLEXport.make_search_query("Der Herr-der Ringe: AND") == '"Der"* "Herr"* "der"* "Ringe"* "AND"*'
+    assert PLEXport.make_search_query("a b") == '"a" "b"'
+    assert PLEXport.make_search_query(" - : ") == ""
@@ -0,0 +1,59 @@
+import shutil
+import sqlite3
+
+import pytest
+
+import PLEXport
+
+SERIES_LIBRARY = 2  # Test-DB: Bibliothek 2 enthält die Serien
+
+
+@pytest.fixture
+def orphan_db(plex_db, tmp_path):
+    # Drei Episoden ohne Staffel, eine Staffel ohne Serie
+    path = str(tmp_path / "orphans.db")
+    shutil.copy(plex_db, path)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        """
+        UPDATE metadata_items SET parent_id = NULL WHERE id IN (
+            SELECT id FROM metadata_items
+            WHERE library_section_id = ? AND metadata_type = 4
+            ORDER BY id LIMIT 3)
+        """,
+        (SERIES_LIBRARY,),
+    )
+    season_id = conn.execute(
+        "SELECT MAX(id) FROM metadata_items WHERE library_section_id = ? AND metadata_type = 3",
+        (SERIES_LIBRARY,),
+    ).fetchone()[0]
+    conn.execute("UPDATE metadata_items SET parent_id = NULL WHERE id = ?", (season_id,))
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_rollup_keeps_orphaned_episodes(orphan_db):
+    conn = PLEXport.open_db(orphan_db)
+    try:
+        episodes = PLEXport.count_items_in_library(conn, SERIES_LIBRARY, PLEXport.PLEX_TYPE_EPISODE)
+        shows, seasons = PLEXport.get_series_rollup(conn, SERIES_LIBRARY)
+    finally:
+        conn.close()
+
+    assert seasons["episodes"].sum() == episodes
+    assert shows["episodes"].sum() == episodes
+    orphans = seasons[seasons["season_title"] == PLEXport.ORPHAN_SEASON_TITLE]
+    assert orphans["episodes"].tolist() == [3]
+    assert orphans["season_id"].isna().all()
+
+    no_show = shows[shows["show_title"] == PLEXport.ORPHAN_SHOW_TITLE]
+    assert len(no_show) == 1
+    # Die Staffel ohne Serie zählt, der Sammelposten ohne Staffel nicht
+    assert no_show["seasons"].tolist() == [1]
+    assert no_show["episodes"].iloc[0] == 3 + seasons.loc[
+        seasons["show_id"].isna() & seasons["season_id"].notna(), "episodes"
+    ].sum()
+
+    # Die Formatierung kommt mit den fehlenden IDs zurecht
+    PLEXport.format_series_rollup(shows, seasons)
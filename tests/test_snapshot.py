@@ -0,0 +1,40 @@
+import os
+
+import pandas as pd
+import pytest
+
+import PLEXport
+
+pytest.importorskip("pyarrow")
+
+
+def write_sidecar(path: str, chunks) -> PLEXport.SnapshotSidecar:
+    with PLEXport.SnapshotSidecar(path) as sidecar:
+        for _ in sidecar.tee(chunks):
+            pass
+    # read_snapshot nimmt den Snapshot nur, wenn er nicht älter als die Excel-Datei ist
+    open(path, "w").close()
+    os.utime(sidecar.path)
+    return sidecar
+
+
+def test_sidecar_from_read_snapshot_frame_round_trips(tmp_path):
+    # Spalten aus read_snapshot sind (pandas 3 mit pyarrow) mehrteilige
+    # Arrow-Arrays; Ausschnitte davon müssen sich wieder schreiben lassen
+    df = pd.DataFrame(
+        {
+            "id": range(3000),
+            "title": [f"Film {i}" for i in range(3000)],
+            "audience_rating": [i / 10 for i in range(3000)],
+        }
+    )
+    first = str(tmp_path / "a.xlsx")
+    write_sidecar(first, [df.iloc[:1500], df.iloc[1500:]])
+    snapshot = PLEXport.read_snapshot(first)
+
+    second = str(tmp_path / "b.xlsx")
+    sidecar = write_sidecar(second, [snapshot.iloc[i : i + 700] for i in range(0, len(snapshot), 700)])
+
+    assert not sidecar.failed
+    assert os.path.exists(sidecar.path)
+    pd.testing.assert_frame_equal(PLEXport.read_snapshot(second), snapshot)
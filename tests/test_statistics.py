@@ -0,0 +1,56 @@
+import shutil
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import PLEXport
+
+
+@pytest.fixture
+def stats_db(plex_db, tmp_path):
+    # Ein Film mit Rating 0 und eine Mediathek 3 ohne Zeile in library_sections
+    path = str(tmp_path / "plex.db")
+    shutil.copy(plex_db, path)
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("UPDATE metadata_items SET audience_rating = 0 WHERE id = 1")
+        conn.execute(
+            "INSERT INTO metadata_items (id, library_section_id, metadata_type, title, duration, added_at) "
+            "VALUES (900001, 3, 1, 'Verwaist', 60000, 1262304000)"
+        )
+    conn.close()
+    return path
+
+
+def test_statistics_match_items(stats_db):
+    conn = PLEXport.open_db(stats_db)
+    try:
+        summary, monthly = PLEXport.get_library_statistics(conn)
+        items = pd.read_sql_query(
+            "SELECT duration, audience_rating FROM metadata_items "
+            "WHERE library_section_id = 1 AND metadata_type = 1",
+            conn,
+        )
+    finally:
+        conn.close()
+    movies = summary[(summary["library_section_id"] == 1) & (summary["metadata_type"] == 1)].iloc[0]
+    assert movies["count"] == len(items)
+    assert movies["total_duration"] == items["duration"].sum()
+    # 0 zählt wie im Detail-Export als "kein Rating"
+    ratings = items["audience_rating"].where(items["audience_rating"] != 0)
+    assert movies["avg_rating"] == pytest.approx(ratings.mean())
+    assert monthly[monthly["library_section_id"] == 1]["count"].sum() == len(items)
+
+
+def test_items_without_section_row_are_kept(stats_db):
+    conn = PLEXport.open_db(stats_db)
+    try:
+        summary, _ = PLEXport.get_library_statistics(conn)
+    finally:
+        conn.close()
+    orphan = summary[summary["library_section_id"] == 3].iloc[0]
+    assert orphan["library_name"] == "(ohne Mediathek)"
+    assert orphan["count"] == 1
+    assert orphan["total_duration"] == 60000
+    assert pd.isna(orphan["avg_rating"])